@@ -1,13 +1,33 @@
+import hmac
+import os
+
 import streamlit as st
 import pandas as pd
 import numpy as np
-import altair as alt
-from pathlib import Path
-import plotly.graph_objects as go
-import plotly.express as px
+
+from jobmarket import charts
+from jobmarket.dataset import memory_report
+from jobmarket.engine import normalize_query
+from jobmarket.metrics import RECORDER, span, timed
+from jobmarket.salary import QUANTILE_LABELS
+from jobmarket.sources import DATASETS, dataset_path
+from jobmarket.store import get_dataset, get_engine, get_result_cache
+from jobmarket.trends import FREQUENCIES, rolling
 
 # ---------- CONFIG ----------
-DATA_PATH = Path("data/AI_DATASET_CLEANED.csv")
+JOB_SEARCH_PAGE_SIZE = 50
+# Postings listed under "Similar jobs" for the selected Job Search row
+SIMILAR_JOBS = 10
+# Results per filter state, shared by all sessions (entries, seconds)
+RESULT_CACHE_SIZE = 1024
+RESULT_CACHE_TTL = 600
+# Companies and industries listed on the Companies page
+COMPANIES_TOP_N = 20
+# Layout of every chart (see jobmarket.charts.THEMES)
+CHART_THEME = "light"
+# The profiling panel is shown for ?admin=<token> when this variable is set
+ADMIN_TOKEN = os.environ.get("JOBMARKET_ADMIN_TOKEN")
+
 st.set_page_config(
     page_title="AI Job Market Dashboard", 
     layout="wide",
@@ -15,12 +35,15 @@ st.set_page_config(
     initial_sidebar_state="collapsed"  # Changed to collapsed
 )
 
+# Time this rerun's stages (see jobmarket.metrics and the admin panel below)
+RECORDER.start_run()
+
 # Initialize session state for reset functionality
 if 'reset_trigger' not in st.session_state:
     st.session_state.reset_trigger = 0
 
 # ---------- ENHANCED STYLING ----------
-st.markdown("""
+STYLE = """
 <style>
 /* Main page styling */
 .main { background-color: #f8f9fa; }
@@ -156,34 +179,12 @@ st.markdown("""
     font-weight: 600;
 }
 </style>
-""", unsafe_allow_html=True)
+"""
+with span("css"):
+    st.markdown(STYLE, unsafe_allow_html=True)
 
 
 # ---------- HELPERS ----------
-@st.cache_data
-def load_data(path: Path):
-    df = pd.read_csv(path, low_memory=False, parse_dates=True)
-    return df
-
-def first_existing_column(df, candidates):
-    for c in candidates:
-        if c in df.columns:
-            return c
-    return None
-
-def pick_defaults(options, preferred_list):
-    if not options:
-        return []
-    picks = []
-    for p in preferred_list:
-        for o in options:
-            if p.lower() == o.lower() or p.lower() in o.lower():
-                if o not in picks:
-                    picks.append(o)
-    if not picks:
-        picks = options[:2]
-    return picks
-
 def format_number(num):
     """Format large numbers with K, M suffixes"""
     if num >= 1_000_000:
@@ -192,23 +193,66 @@ def format_number(num):
         return f"{num/1_000:.1f}K"
     return str(int(num))
 
+def count_distinct(codes, rows):
+    """Number of distinct values among the selected rows, from integer codes"""
+    codes = codes if rows is None else codes[rows]
+    return int(np.count_nonzero(np.bincount(codes[codes >= 0]))) if len(codes) else 0
+
+def cached(kind, state, compute):
+    """Result of compute() shared by all sessions for this filter state and dataset version"""
+    return engine.cached(kind, state, compute)
+
+def filter_state(selected_job_titles, selected_countries, selected_exp, selected_remote, selected_skills, **extra):
+    """Filter selections keyed by role, the form the engine (and its result cache) takes"""
+    return dict(
+        job=selected_job_titles, country=selected_countries, exp=selected_exp, remote=selected_remote,
+        skills=selected_skills, **extra
+    )
+
+def show_chart(fig):
+    """Render a Plotly figure (serialization is timed separately from building it)"""
+    with span("chart.render"):
+        st.plotly_chart(fig, use_container_width=True, config={"displayModeBar": False})
+
+def show_table(frame, **kwargs):
+    """Render a dataframe through the Arrow serialization of st.dataframe"""
+    with span("table.render"):
+        return st.dataframe(frame, **kwargs)
+
+def facet_label(facets, col):
+    """Format a filter option with the number of rows it would match"""
+    counts = facets.get(col, {})
+    return lambda option: f"{option} ({counts.get(option, 0):,})"
+
 # ---------- LOAD ----------
-df = load_data(DATA_PATH)
+# One normalized frame and one set of indexes per process, shared by all sessions
+# Every source is mapped onto the cleaned dataset's columns (see jobmarket.sources)
+dataset_name = st.sidebar.selectbox("🗂️ Dataset", list(DATASETS), key="dataset")
+with span("load"):
+    data_path = dataset_path(dataset_name)
+    df = get_dataset(data_path)
+    result_cache = get_result_cache(RESULT_CACHE_SIZE, RESULT_CACHE_TTL)
+    # Filtering and aggregation live in the headless engine (also served by jobmarket.api)
+    engine = get_engine(data_path, result_cache)
 
 # Detect columns
-job_col = first_existing_column(df, ["job_title", "title", "jobTitle", "Job Title"])
-country_col = first_existing_column(df, ["country", "company_location", "location", "company_location_name"])
-exp_col = first_existing_column(df, ["experience_level", "experience", "years_experience", "exp_level"])
-skills_col = first_existing_column(df, ["required_skills", "skills", "requirements", "skillset"])
-company_col = first_existing_column(df, ["company_name", "company", "employer"])
-remote_col = first_existing_column(df, [
-    "remote_ratio", "remote", "remote_status", "work_setting", "onsite_remote_hybrid"
-])
-
-# Normalize string columns
-for c in [job_col, country_col, exp_col, remote_col, skills_col, company_col]:
-    if c and c in df.columns:
-        df[c] = df[c].astype(str).fillna("")
+columns = engine.columns
+job_col = columns["job"]
+country_col = columns["country"]
+exp_col = columns["exp"]
+skills_col = columns["skills"]
+company_col = columns["company"]
+remote_col = columns["remote"]
+salary_col = columns["salary"]
+posted_col = columns["posted"]
+deadline_col = columns["deadline"]
+
+# Only what the filter bar needs is built before routing; the sort, text and
+# salary indexes are built by the first page that uses them (engine.<name>)
+filter_index = engine.filter_index
+catalog = engine.catalog
+count_cube = engine.count_cube
+skill_index = engine.skill_index
 
 # ---------- SIDEBAR (Minimal) ----------
 st.sidebar.markdown("# 🤖 AI Job Market")
@@ -221,6 +265,10 @@ menu_choice = st.sidebar.radio(
         "🏠 Overview",
         "🔍 Job Search",
         "📊 Top Job Titles",
+        "🧠 Top Skills",
+        "🏢 Companies",
+        "💰 Salary",
+        "📈 Trends",
         # "🧭 Explorer",
     ],
     index=0
@@ -230,8 +278,15 @@ st.sidebar.markdown("---")
 st.sidebar.markdown("### 📌 Dataset Info")
 st.sidebar.metric("Total Jobs", format_number(len(df)))
 st.sidebar.caption("💡 Use filters on the main page to refine your search")
+cache_stats = result_cache.stats()
+st.sidebar.caption(
+    f"⚡ Result cache: {cache_stats['hit_rate']:.0%} hits "
+    f"({cache_stats['hits']:,} of {cache_stats['hits'] + cache_stats['misses']:,} lookups, "
+    f"{cache_stats['entries']:,} entries)"
+)
 
 # ---------- MAIN PAGE FILTERS ----------
+@timed("filters")
 def render_filters():
     """Render filters on the main page"""
     st.markdown("### 🎯 Filter Options")
@@ -239,20 +294,45 @@ def render_filters():
     # Determine if filters should be reset
     reset_filters = (st.session_state.reset_trigger > 0)
     
+    # Facet counts depend on every filter's current selection, so read them
+    # from session state before any of the widgets is drawn
+    filter_keys = {
+        col: f"{name}_{dataset_name}_{st.session_state.reset_trigger}"
+        for col, name in [(job_col, "job_titles"), (country_col, "countries"), (exp_col, "exp"), (remote_col, "remote")]
+        if col
+    }
+    current = {
+        col: st.session_state.get(key, [] if reset_filters else catalog.get_defaults(col))
+        for col, key in filter_keys.items()
+    }
+    skills_key = f"skills_{dataset_name}_{st.session_state.reset_trigger}"
+    current_skills = st.session_state.get(skills_key, [])
+    skill_mask = skill_index.mask(current_skills) if skill_index else None
+    state = dict(current, skills=current_skills)
+    if skill_mask is None:
+        facets = count_cube.facet_counts(current)
+    else:
+        # The cube has no skills dimension, so count from the bitmaps instead
+        facets = cached("facets", state, lambda: filter_index.facet_counts(list(current.items()), extra=skill_mask))
+    if skill_index:
+        skill_counts = cached(
+            "skill_counts", state,
+            lambda: skill_index.counts(filter_index.select(list(current.items()), extra=skill_mask))
+        )
+    
     # Create filter columns
     filter_col1, filter_col2, filter_col3, filter_col4, filter_col5 = st.columns([2, 2, 2, 2, 1])
     
     # Job Title filter
     with filter_col1:
         if job_col:
-            all_job_titles = sorted(df[job_col].replace("", np.nan).dropna().unique())
-            default_jobs = [] if reset_filters else pick_defaults(all_job_titles, ["Data Scientist", "Ai Research Scientist"])
             selected_job_titles = st.multiselect(
                 "💼 Job Title", 
-                all_job_titles, 
-                default=default_jobs,
+                catalog.get_options(job_col), 
+                default=[] if reset_filters else catalog.get_defaults(job_col),
                 help="Select one or more job titles",
-                key=f"job_titles_{st.session_state.reset_trigger}"
+                format_func=facet_label(facets, job_col),
+                key=filter_keys[job_col]
             )
         else:
             selected_job_titles = []
@@ -260,15 +340,13 @@ def render_filters():
     # Location filter
     with filter_col2:
         if country_col:
-            all_countries = sorted(df[country_col].replace("", np.nan).dropna().unique())
-            germany_matches = [c for c in all_countries if "germany" in c.lower()]
-            default_locations = [] if reset_filters else (germany_matches if germany_matches else (all_countries[:1] if all_countries else []))
             selected_countries = st.multiselect(
                 "🌍 Location", 
-                all_countries, 
-                default=default_locations,
+                catalog.get_options(country_col), 
+                default=[] if reset_filters else catalog.get_defaults(country_col),
                 help="Filter by country",
-                key=f"countries_{st.session_state.reset_trigger}"
+                format_func=facet_label(facets, country_col),
+                key=filter_keys[country_col]
             )
         else:
             selected_countries = []
@@ -276,15 +354,13 @@ def render_filters():
     # Experience filter
     with filter_col3:
         if exp_col:
-            all_exp = sorted(df[exp_col].replace("", np.nan).dropna().unique())
-            mi_matches = [e for e in all_exp if "mi" in e.lower()]
-            default_exp = [] if reset_filters else (mi_matches if mi_matches else (all_exp[:1] if all_exp else []))
             selected_exp = st.multiselect(
                 "🎓 Experience Level", 
-                all_exp, 
-                default=default_exp,
+                catalog.get_options(exp_col), 
+                default=[] if reset_filters else catalog.get_defaults(exp_col),
                 help="Select experience levels",
-                key=f"exp_{st.session_state.reset_trigger}"
+                format_func=facet_label(facets, exp_col),
+                key=filter_keys[exp_col]
             )
         else:
             selected_exp = []
@@ -292,14 +368,13 @@ def render_filters():
     # Remote filter
     with filter_col4:
         if remote_col:
-            all_remote = sorted(df[remote_col].dropna().unique().tolist())
-            default_remote = [] if reset_filters else ([r for r in all_remote if r != 0][:1] or all_remote[:1])
             selected_remote = st.multiselect(
                 "🏡 Remote Ratio (%)", 
-                all_remote, 
-                default=default_remote,
+                catalog.get_options(remote_col), 
+                default=[] if reset_filters else catalog.get_defaults(remote_col),
                 help="0=Onsite, 50=Hybrid, 100=Remote",
-                key=f"remote_{st.session_state.reset_trigger}"
+                format_func=facet_label(facets, remote_col),
+                key=filter_keys[remote_col]
             )
         else:
             selected_remote = []
@@ -311,36 +386,40 @@ def render_filters():
             st.session_state.reset_trigger += 1
             st.rerun()
     
-    return selected_job_titles, selected_countries, selected_exp, selected_remote
+    # Skills filter
+    if skill_index:
+        selected_skills = st.multiselect(
+            "🧠 Required Skills",
+            sorted(skill_index.vocabulary),
+            default=[],
+            help="Show jobs that require all of the selected skills",
+            format_func=lambda skill: f"{skill} ({skill_counts.get(skill, 0):,})",
+            key=skills_key
+        )
+    else:
+        selected_skills = []
+    
+    return selected_job_titles, selected_countries, selected_exp, selected_remote, selected_skills
 
 # ---------- FILTERING ----------
-def apply_filters(selected_job_titles, selected_countries, selected_exp, selected_remote):
-    """Apply filters to the dataframe"""
-    mask = pd.Series(True, index=df.index)
-    
-    if job_col and selected_job_titles:
-        mask &= df[job_col].astype(str).isin(selected_job_titles)
-    
-    if country_col and selected_countries:
-        mask &= df[country_col].astype(str).isin(selected_countries)
-    
-    if exp_col and selected_exp:
-        mask &= df[exp_col].astype(str).isin(selected_exp)
-    
-    if remote_col and selected_remote:
-        mask &= df[remote_col].isin(selected_remote)
-    
-    return df[mask].copy()
+def select_rows(selected_job_titles, selected_countries, selected_exp, selected_remote, selected_skills, query=""):
+    """Row positions matching the filters (and search query), or None when nothing is filtered"""
+    return engine.select(filter_state(
+        selected_job_titles, selected_countries, selected_exp, selected_remote, selected_skills, query=query
+    ))
 
 # ---------- PAGES ----------
 
+@timed("page")
 def page_overview():
     st.markdown("<h1 class='page-title'>AI Job Market Dashboard</h1>", unsafe_allow_html=True)
     st.markdown("<p class='page-subtitle'>Explore AI and Data Science job opportunities with powerful filtering and insights</p>", unsafe_allow_html=True)
     
     # Render filters
-    selected_job_titles, selected_countries, selected_exp, selected_remote = render_filters()
-    filtered = apply_filters(selected_job_titles, selected_countries, selected_exp, selected_remote)
+    selected_job_titles, selected_countries, selected_exp, selected_remote, selected_skills = render_filters()
+    kpis = engine.overview(filter_state(
+        selected_job_titles, selected_countries, selected_exp, selected_remote, selected_skills
+    ))
     
     st.markdown("---")
     
@@ -350,29 +429,27 @@ def page_overview():
     with col1:
         st.metric(
             label="📋 Filtered Jobs",
-            value=format_number(len(filtered)),
-            delta=f"{len(filtered)/len(df)*100:.1f}% of total"
+            value=format_number(kpis["rows"]),
+            delta=f"{kpis['rows']/len(df)*100:.1f}% of total"
         )
     
     with col2:
-        unique_titles = int(filtered[job_col].nunique()) if job_col and not filtered.empty else 0
         st.metric(
             label="💼 Unique Titles",
-            value=unique_titles
+            value=kpis["titles"]
         )
     
     with col3:
-        unique_companies = int(filtered[company_col].nunique()) if company_col and not filtered.empty else 0
         st.metric(
             label="🏢 Companies",
-            value=unique_companies
+            value=kpis["companies"],
+            help="Estimated from the pre-aggregated KPI cube" if kpis["from_cube"] else None
         )
     
     with col4:
-        unique_locations = int(filtered[country_col].nunique()) if country_col and not filtered.empty else 0
         st.metric(
             label="🌎 Locations",
-            value=unique_locations
+            value=kpis["locations"]
         )
     
     st.markdown("<br>", unsafe_allow_html=True)
@@ -393,35 +470,43 @@ def page_overview():
         st.markdown(f"""
         <div class='info-box'>
             <strong>Experience:</strong> {', '.join(selected_exp) if selected_exp else 'All'}<br>
-            <strong>Remote Ratio:</strong> {', '.join(map(str, selected_remote)) if selected_remote else 'All'}
+            <strong>Remote Ratio:</strong> {', '.join(map(str, selected_remote)) if selected_remote else 'All'}<br>
+            <strong>Skills:</strong> {', '.join(selected_skills) if selected_skills else 'Any'}
         </div>
         """, unsafe_allow_html=True)
     
     # Quick insights
-    if not filtered.empty:
+    if kpis["rows"]:
         st.markdown("### 📈 Quick Insights")
         
         insight_col1, insight_col2 = st.columns(2)
         
         with insight_col1:
-            if job_col:
-                top_job = filtered[job_col].value_counts().head(1)
-                if not top_job.empty:
-                    st.info(f"🔥 **Most Common Role:** {top_job.index[0]} ({top_job.values[0]} listings)")
+            if kpis["top_job"]:
+                top_job, top_job_count = kpis["top_job"]
+                st.info(f"🔥 **Most Common Role:** {top_job} ({top_job_count} listings)")
         
         with insight_col2:
-            if country_col:
-                top_country = filtered[country_col].value_counts().head(1)
-                if not top_country.empty:
-                    st.info(f"📍 **Top Location:** {top_country.index[0]} ({top_country.values[0]} jobs)")
+            if kpis["top_country"]:
+                top_country, top_country_count = kpis["top_country"]
+                st.info(f"📍 **Top Location:** {top_country} ({top_country_count} jobs)")
 
+@timed("page")
 def page_job_search():
     st.markdown("<h1 class='page-title'>Job Search</h1>", unsafe_allow_html=True)
     st.markdown("<p class='page-subtitle'>Browse through available positions</p>", unsafe_allow_html=True)
     
     # Render filters
-    selected_job_titles, selected_countries, selected_exp, selected_remote = render_filters()
-    filtered = apply_filters(selected_job_titles, selected_countries, selected_exp, selected_remote)
+    selected_job_titles, selected_countries, selected_exp, selected_remote, selected_skills = render_filters()
+    query = st.text_input("🔎 Search", placeholder="Search job titles or companies", key="job_search_query")
+    rows = select_rows(selected_job_titles, selected_countries, selected_exp, selected_remote, selected_skills, query)
+    n_rows = len(df) if rows is None else len(rows)
+    state = filter_state(selected_job_titles, selected_countries, selected_exp, selected_remote, selected_skills,
+                         query=normalize_query(query))
+    n_titles, n_companies = cached("search_summary", state, lambda: (
+        count_distinct(engine.text_index.codes[job_col], rows) if job_col else 0,
+        count_distinct(engine.text_index.codes[company_col], rows) if company_col else 0,
+    ))
     
     st.markdown("---")
     st.markdown("<h6>Historical job market data for AI and Data Science roles (2024-2025)</h6>", unsafe_allow_html=True)
@@ -429,42 +514,83 @@ def page_job_search():
     col1, col2, col3 = st.columns(3)
     
     with col1:
-        st.metric("📋 Total Listings", format_number(len(filtered)))
+        st.metric("📋 Total Listings", format_number(n_rows))
     with col2:
-        st.metric("💼 Unique Titles", int(filtered[job_col].nunique()) if job_col and not filtered.empty else 0)
+        st.metric("💼 Unique Titles", n_titles)
     with col3:
-        st.metric("🏢 Unique Companies", int(filtered[company_col].nunique()) if company_col and not filtered.empty else 0)
+        st.metric("🏢 Unique Companies", n_companies)
     
     st.markdown("---")
     
-    st.markdown(f"### 📄 Job Listings ({len(filtered)} results)")
+    st.markdown(f"### 📄 Job Listings ({n_rows} results)")
+    
+    display_cols = [c for c in [job_col, company_col, country_col, exp_col, remote_col] if c in df.columns]
     
-    display_cols = [c for c in [job_col, company_col, country_col, exp_col, remote_col] if c in filtered.columns]
+    # Sorting and paging controls
+    n_pages = max(1, -(-n_rows // JOB_SEARCH_PAGE_SIZE))
+    sort_col1, sort_col2, sort_col3 = st.columns([2, 2, 1])
+    with sort_col1:
+        sort_by = st.selectbox("↕️ Sort by", display_cols, key="job_search_sort")
+    with sort_col2:
+        order = st.radio("Order", ["Ascending", "Descending"], horizontal=True, key="job_search_order")
+    with sort_col3:
+        page = min(int(st.number_input(f"Page (of {n_pages})", min_value=1, step=1, key="job_search_page")), n_pages)
+    
+    # Only the visible page is ever taken out of the frame
+    page_rows = engine.sort_index.page(
+        rows, sort_by, ascending=(order == "Ascending"),
+        offset=(page - 1) * JOB_SEARCH_PAGE_SIZE, limit=JOB_SEARCH_PAGE_SIZE
+    )
+    page_table = df.iloc[page_rows, [df.columns.get_loc(c) for c in display_cols]].reset_index(drop=True)
+    if salary_col and engine.salary_model.informative:
+        # Precomputed when the salary model was trained or the rows were ingested
+        page_table["Est. Salary"] = engine.salary_estimates(page_rows)
+    event = show_table(
+        page_table, 
+        use_container_width=True,
+        height=600,
+        column_config={"Est. Salary": st.column_config.NumberColumn(format="$%d")},
+        on_select="rerun",
+        selection_mode="single-row",
+        key="job_search_table"
+    )
     
-    st.dataframe(
-        filtered[display_cols].head(50).reset_index(drop=True), 
+    # Similar jobs of the selected row, from the MinHash/LSH index (see jobmarket.similar)
+    selected = [i for i in event.selection.rows if i < len(page_rows)]
+    if not selected or engine.similar_index is None:
+        st.caption("👆 Select a row to see similar postings")
+        return
+    row = int(page_rows[selected[0]])
+    similar_rows, similarity = engine.similar(row, SIMILAR_JOBS)
+    st.markdown(f"### 🔗 Similar to {df.iloc[row][job_col]}" + (f" at {df.iloc[row][company_col]}" if company_col else ""))
+    if len(similar_rows) == 0:
+        st.info("No similar postings found.")
+        return
+    similar_cols = display_cols + [skills_col]
+    similar_jobs = df.iloc[similar_rows, [df.columns.get_loc(c) for c in similar_cols]].reset_index(drop=True)
+    similar_jobs.insert(0, "Similarity", similarity)
+    show_table(
+        similar_jobs,
         use_container_width=True,
-        height=600
+        hide_index=True,
+        column_config={"Similarity": st.column_config.ProgressColumn(format="percent", min_value=0, max_value=1)}
     )
 
+@timed("page")
 def page_top_job_titles():
     st.markdown("<h1 class='page-title'>Top Job Titles</h1>", unsafe_allow_html=True)
     st.markdown("<p class='page-subtitle'>Most in-demand positions in the current market</p>", unsafe_allow_html=True)
     
     # Render filters
-    selected_job_titles, selected_countries, selected_exp, selected_remote = render_filters()
-    filtered = apply_filters(selected_job_titles, selected_countries, selected_exp, selected_remote)
+    selected_job_titles, selected_countries, selected_exp, selected_remote, selected_skills = render_filters()
     
     st.markdown("---")
 
-    if not job_col or filtered.empty:
+    state = filter_state(selected_job_titles, selected_countries, selected_exp, selected_remote, selected_skills)
+    top_counts = engine.top(state, "job", 20).rename(columns={"Value": "Job Title"}) if job_col else None
+    if top_counts is None or top_counts.empty:
         st.info("No job-title data available.")
         return
-
-    counts = filtered[job_col].astype(str).value_counts()
-    top_n = min(20, len(counts))
-    top_counts = counts.head(top_n).reset_index()
-    top_counts.columns = ["Job Title", "Count"]
     
     # Summary metrics
     col1, col2, col3 = st.columns(3)
@@ -480,119 +606,282 @@ def page_top_job_titles():
 
     # Table first
     st.markdown("### 📋 Job Title Rankings")
-    st.dataframe(top_counts.reset_index(drop=True), use_container_width=True, height=400)
+    show_table(top_counts.reset_index(drop=True), use_container_width=True, height=400)
 
     st.markdown("<br>", unsafe_allow_html=True)
 
     # Chart
     st.markdown("### 📊 Visual Distribution")
-    hc = top_counts[::-1].reset_index(drop=True)
-
-    vals = hc["Count"].values.astype(float)
-    norm = (vals - vals.min()) / (vals.max() - vals.min() + 1e-9)
-    base_rgb = np.array([102, 126, 234])
-    light_rgb = np.array([118, 75, 162])
-    colors = [
-        "rgb({},{},{})".format(
-            int(base_rgb[0] * (1 - v) + light_rgb[0] * v),
-            int(base_rgb[1] * (1 - v) + light_rgb[1] * v),
-            int(base_rgb[2] * (1 - v) + light_rgb[2] * v),
-        )
-        for v in norm
-    ]
-
-    height_px = max(400, hc.shape[0] * 48)
-    fig = go.Figure()
-
-    fig.add_trace(go.Bar(
-        x=hc["Count"],
-        y=hc["Job Title"],
-        orientation='h',
-        marker=dict(color=colors, line=dict(width=0)),
-        hovertemplate="<b>%{y}</b><br>Count: %{x}<extra></extra>",
-        text=hc["Count"].astype(int),
-        textposition='inside',
-        textfont=dict(color='white', size=12, family='Arial'),
-        showlegend=False
-    ))
+    with span("chart.build"):
+        fig = charts.figure("top_titles", top_counts, theme=CHART_THEME)
+    show_chart(fig)
 
-    fig.add_trace(go.Scatter(
-        x=hc["Count"],
-        y=hc["Job Title"],
-        mode='markers',
-        marker=dict(size=28, color=colors, line=dict(width=0)),
-        hoverinfo='skip',
-        showlegend=False
-    ))
+@timed("page")
+def page_top_skills():
+    st.markdown("<h1 class='page-title'>Top Skills</h1>", unsafe_allow_html=True)
+    st.markdown("<p class='page-subtitle'>Skills most often required by the matching positions</p>", unsafe_allow_html=True)
+    
+    # Render filters
+    selected_job_titles, selected_countries, selected_exp, selected_remote, selected_skills = render_filters()
+    rows = select_rows(selected_job_titles, selected_countries, selected_exp, selected_remote, selected_skills)
+    n_rows = len(df) if rows is None else len(rows)
+    
+    st.markdown("---")
 
-    fig.update_layout(
-        height=height_px,
-        margin=dict(l=240, r=24, t=40, b=40),
-        paper_bgcolor='rgba(0,0,0,0)',
-        plot_bgcolor='rgba(248,249,250,1)',
-        bargap=0.22,
-        xaxis=dict(
-            title="Number of Listings", 
-            showgrid=True, 
-            gridcolor="rgba(200,200,200,0.2)", 
-            zeroline=False,
-            title_font=dict(size=14, family='Arial')
-        ),
-        yaxis=dict(automargin=True, title_font=dict(size=14, family='Arial')),
-        showlegend=False,
-        font=dict(family='Arial', size=12)
-    )
+    if not skill_index or n_rows == 0:
+        st.info("No skills data available.")
+        return
+
+    def skill_rankings():
+        top_skills = skill_index.top(rows, n=20)
+        top_skills["Share of Listings"] = (top_skills["Count"] / n_rows * 100).round(1).astype(str) + "%"
+        return top_skills
 
-    st.plotly_chart(fig, use_container_width=True, config={"displayModeBar": False})
+    state = filter_state(selected_job_titles, selected_countries, selected_exp, selected_remote, selected_skills)
+    top_skills = cached("top_skills", state, skill_rankings)
+    
+    # Summary metrics
+    col1, col2, col3 = st.columns(3)
+    with col1:
+        st.metric("🧠 Top Skill", top_skills.iloc[0]["Skill"])
+    with col2:
+        st.metric("🔢 Listings", int(top_skills.iloc[0]["Count"]))
+    with col3:
+        st.metric("📋 Matching Jobs", format_number(n_rows))
+    
+    st.markdown("---")
+
+    # Table first
+    st.markdown("### 📋 Skill Rankings")
+    show_table(top_skills, use_container_width=True, height=400)
+
+    st.markdown("<br>", unsafe_allow_html=True)
+
+    # Chart
+    st.markdown("### 📊 Visual Distribution")
+    with span("chart.build"):
+        fig = charts.figure("ranking", top_skills[["Skill", "Count"]], theme=CHART_THEME, label="Skill")
+    show_chart(fig)
+
+@timed("page")
+def page_companies():
+    st.markdown("<h1 class='page-title'>Companies</h1>", unsafe_allow_html=True)
+    st.markdown("<p class='page-subtitle'>Who is hiring, and in which industries</p>", unsafe_allow_html=True)
+    
+    # Render filters
+    selected_job_titles, selected_countries, selected_exp, selected_remote, selected_skills = render_filters()
+    
+    st.markdown("---")
 
-# def page_explorer():
-#     st.markdown("<h1 class='page-title'>Data Explorer</h1>", unsafe_allow_html=True)
-#     st.markdown("<p class='page-subtitle'>Dive deep into the dataset with custom views</p>", unsafe_allow_html=True)
+    rankings = [(label, heading, role) for label, heading, role in
+                [("Company", "🏢 Top Companies", "company"), ("Industry", "🏭 Top Industries", "industry")]
+                if columns[role]]
+    state = filter_state(selected_job_titles, selected_countries, selected_exp, selected_remote, selected_skills)
+    if not rankings:
+        st.info("No company data available.")
+        return
+    if engine.count(state) == 0:
+        st.info("No postings match the current filters.")
+        return
+    results = {role: engine.heavy_hitters(state, role, COMPANIES_TOP_N) for _, _, role in rankings}
     
-#     # Render filters
-#     selected_job_titles, selected_countries, selected_exp, selected_remote = render_filters()
-#     filtered = apply_filters(selected_job_titles, selected_countries, selected_exp, selected_remote)
+    # Summary metrics
+    top_companies = results["company"][0] if "company" in results else None
+    col1, col2, col3 = st.columns(3)
+    with col1:
+        st.metric("🏢 Top Company", top_companies.iloc[0]["Value"] if top_companies is not None else "—")
+    with col2:
+        st.metric("🔢 Listings", int(top_companies.iloc[0]["Count"]) if top_companies is not None else "—")
+    with col3:
+        st.metric("🏭 Hiring Companies", format_number(engine.overview(state)["companies"]))
+    
+    for label, heading, role in rankings:
+        table, approximate, unlisted = results[role]
+        st.markdown("---")
+        st.markdown(f"### {heading}")
+        if approximate:
+            capacity = engine.heavy_hitter_cube.capacity
+            st.caption(
+                f"Approximate, from the top-{capacity} {label.lower()}s kept per filter combination: each true count "
+                f"lies between Listings and Listings + Error, and no unlisted {label.lower()} has more than "
+                f"{unlisted:,} listings"
+            )
+        col1, col2 = st.columns([2, 3])
+        with col1:
+            shown = table.rename(columns={"Value": label, "Count": "Listings"})
+            show_table(shown if approximate else shown.drop(columns="Error"),
+                       use_container_width=True, hide_index=True, height=400)
+        with col2:
+            with span("chart.build"):
+                fig = charts.figure("ranking", table.rename(columns={"Value": label}), theme=CHART_THEME, label=label)
+            show_chart(fig)
+
+@timed("page")
+def page_salary():
+    st.markdown("<h1 class='page-title'>Salary Insights</h1>", unsafe_allow_html=True)
+    st.markdown("<p class='page-subtitle'>Salary percentiles by role, location and experience</p>", unsafe_allow_html=True)
     
-#     st.markdown("---")
+    # Render filters
+    selected_job_titles, selected_countries, selected_exp, selected_remote, selected_skills = render_filters()
+    rows = select_rows(selected_job_titles, selected_countries, selected_exp, selected_remote, selected_skills)
     
-#     col1, col2 = st.columns([3, 1])
+    st.markdown("---")
+
+    if not salary_col or (rows is not None and len(rows) == 0):
+        st.info("No salary data available.")
+        return
+
+    group_options = {
+        label: role for label, role in [("💼 Job Title", "job"), ("🌍 Location", "country"), ("🎓 Experience Level", "exp")]
+        if columns[role]
+    }
+    group_label = st.radio("Group salaries by", list(group_options), horizontal=True)
+    table, overall, approximate = engine.salary(filter_state(
+        selected_job_titles, selected_countries, selected_exp, selected_remote, selected_skills
+    ), group_options[group_label])
+    table = table.rename(columns={"Group": group_label.split(" ", 1)[1]})
+    
+    # Summary metrics
+    col1, col2, col3 = st.columns(3)
+    with col1:
+        st.metric("💵 Median Salary", f"${overall[1]:,.0f}")
+    with col2:
+        st.metric("📈 90th Percentile", f"${overall[3]:,.0f}")
+    with col3:
+        st.metric("📋 Postings", format_number(len(df) if rows is None else len(rows)))
+    if approximate:
+        st.caption(f"Percentiles estimated from salary histograms (within ±${engine.salary_cube.bin_width:,})")
+    
+    st.markdown("---")
+
+    # Table first
+    st.markdown("### 📋 Salary Percentiles")
+    show_table(
+        table,
+        use_container_width=True,
+        height=400,
+        column_config={label: st.column_config.NumberColumn(format="$%d") for label in QUANTILE_LABELS}
+    )
+
+    st.markdown("<br>", unsafe_allow_html=True)
+
+    # Chart: median with the interquartile range as whiskers
+    st.markdown("### 📊 Median Salary (P25–P75)")
+    with span("chart.build"):
+        fig = charts.figure("salary", table, theme=CHART_THEME)
+    show_chart(fig)
+
+    # What-if estimate from the salary model (see jobmarket.salary_model)
+    model = engine.salary_model
+    st.markdown("---")
+    st.markdown("### 🧮 Salary Estimator")
+    if not model.informative:
+        st.warning(
+            f"Estimates are not shown: on held-out postings the salary model does worse than "
+            f"the mean salary (R² {model.metrics['r2']:.2f})."
+        )
+        return
+    st.caption(
+        f"Log-linear model trained on {model.metrics['train_rows']:,} postings "
+        f"(held-out R² {model.metrics['r2']:.2f}, mean error ±${model.metrics['mae']:,.0f})"
+    )
+    with st.form("salary_estimator"):
+        values = {}
+        form_cols = st.columns(3)
+        for i, col in enumerate(model.categorical):
+            with form_cols[i % 3]:
+                values[col] = st.selectbox(col.replace("_", " ").title(), sorted(model.values[col]), key=f"estimate_{col}")
+        for col in model.numeric:
+            top = df[col].max()
+            top = max(int(top), 1) if pd.notna(top) else 40
+            values[col] = st.slider(col.replace("_", " ").title(), 0, top, min(5, top), key=f"estimate_{col}")
+        skills = st.multiselect("Skills", model.vocabulary, key="estimate_skills") if model.skills else []
+        submitted = st.form_submit_button("Estimate salary")
+    if submitted:
+        st.metric("💵 Estimated Salary", f"${engine.estimate_salary(values, skills):,.0f}")
+
+@timed("page")
+def page_trends():
+    st.markdown("<h1 class='page-title'>Market Trends</h1>", unsafe_allow_html=True)
+    st.markdown("<p class='page-subtitle'>Posting volume, salaries and remote work over time</p>", unsafe_allow_html=True)
     
-#     with col1:
-#         st.metric("📊 Rows in View", format_number(len(filtered)))
-#     with col2:
-#         st.metric("🔢 Columns", len(filtered.columns))
+    # Render filters
+    selected_job_titles, selected_countries, selected_exp, selected_remote, selected_skills = render_filters()
     
-#     st.markdown("---")
+    st.markdown("---")
+
+    if not engine.trend_cube:
+        st.info("No posting dates available.")
+        return
+
+    control1, control2 = st.columns(2)
+    with control1:
+        granularity = st.radio("Granularity", list(FREQUENCIES), index=1, horizontal=True, key="trend_granularity")
+    with control2:
+        window = st.slider("Rolling window (periods)", 1, 12, 3, key="trend_window")
+
+    cube, cube_selections = engine.trend_source(filter_state(
+        selected_job_titles, selected_countries, selected_exp, selected_remote, selected_skills
+    ))
+    trend = cube.trend(cube_selections, FREQUENCIES[granularity])
+    if trend.empty:
+        st.info("No postings match the current filters.")
+        return
+    smooth = rolling(trend, window)
+    durations = cube.durations(cube_selections)
     
-#     default_cols = [job_col, company_col, country_col, exp_col, remote_col] if job_col else filtered.columns.tolist()[:6]
-#     cols_to_show = st.multiselect(
-#         "📋 Select Columns to Display", 
-#         options=filtered.columns.tolist(),
-#         default=default_cols,
-#         help="Choose which columns to view and export"
-#     )
+    # Summary metrics
+    col1, col2, col3, col4 = st.columns(4)
+    with col1:
+        st.metric("📋 Postings", format_number(int(trend["Postings"].sum())))
+    with col2:
+        st.metric(f"📅 Per {granularity} (avg)", f"{trend['Postings'].mean():,.1f}")
+    with col3:
+        latest = smooth["Median Salary"].dropna()
+        st.metric("💵 Median Salary (latest)", f"${latest.iloc[-1]:,.0f}" if len(latest) else "—")
+    with col4:
+        if durations.sum():
+            median_days = durations.index[np.searchsorted(durations.cumsum().to_numpy(), durations.sum() / 2)]
+            st.metric("⏳ Median Days to Deadline", int(median_days))
+        else:
+            st.metric("⏳ Median Days to Deadline", "—")
+    st.caption(f"Median salaries estimated from salary histograms (within ±${cube.bin_width:,})")
     
-#     if cols_to_show:
-#         st.markdown(f"### 📄 Dataset Preview ({len(filtered)} rows)")
-#         st.dataframe(
-#             filtered[cols_to_show].reset_index(drop=True), 
-#             use_container_width=True,
-#             height=500
-#         )
-        
-#         @st.cache_data
-#         def to_csv(df_):
-#             return df_.to_csv(index=False).encode("utf-8")
-        
-#         st.download_button(
-#             "⬇️ Download Filtered Data (CSV)", 
-#             to_csv(filtered[cols_to_show]), 
-#             file_name="ai_jobs_filtered.csv", 
-#             mime="text/csv",
-#             help="Download the current filtered view as CSV"
-#         )
-#     else:
-#         st.warning("⚠️ Please select at least one column to display")
+    st.markdown("---")
+
+    rolling_name = f"{window}-period rolling" if window > 1 else None
+
+    def trend_chart(column, name, hovertemplate, **options):
+        with span("chart.build"):
+            fig = charts.figure("trend", trend, smooth, theme=CHART_THEME, column=column, name=name,
+                                hovertemplate=hovertemplate, rolling_name=rolling_name, **options)
+        show_chart(fig)
+
+    # Posting volume
+    st.markdown(f"### 📈 Postings per {granularity}")
+    trend_chart("Postings", "Postings", "%{x|%Y-%m-%d}<br>Postings: %{y}<extra></extra>", bars=True)
+
+    # Median salary and remote share
+    chart1, chart2 = st.columns(2)
+    with chart1:
+        st.markdown("### 💵 Median Salary")
+        trend_chart("Median Salary", "Median", "%{x|%Y-%m-%d}<br>Median: $%{y:,.0f}<extra></extra>")
+    with chart2:
+        st.markdown("### 🏡 Fully Remote Share")
+        if "Remote Share" in trend:
+            trend_chart("Remote Share", "Share", "%{x|%Y-%m-%d}<br>Remote: %{y:.0%}<extra></extra>", tickformat=".0%")
+            st.caption("Share of postings under the other filters (the remote filter is ignored here)")
+        else:
+            st.info("No remote-work data available.")
+
+    # Posting-to-deadline durations
+    st.markdown("### ⏳ Days from Posting to Application Deadline")
+    if durations.empty:
+        st.info("No application deadlines available.")
+        return
+    with span("chart.build"):
+        fig = charts.figure("durations", durations, theme=CHART_THEME)
+    show_chart(fig)
 
 # Route to pages
 if menu_choice == "🏠 Overview":
@@ -601,9 +890,68 @@ elif menu_choice == "🔍 Job Search":
     page_job_search()
 elif menu_choice == "📊 Top Job Titles":
     page_top_job_titles()
+elif menu_choice == "🧠 Top Skills":
+    page_top_skills()
+elif menu_choice == "🏢 Companies":
+    page_companies()
+elif menu_choice == "💰 Salary":
+    page_salary()
+elif menu_choice == "📈 Trends":
+    page_trends()
 # elif menu_choice == "🧭 Explorer":
 #     page_explorer()
 
+# ---------- ADMIN ----------
+
+def is_admin():
+    """Whether the URL carries the admin token"""
+    token = st.query_params.get("admin", "")
+    return bool(ADMIN_TOKEN) and hmac.compare_digest(token.encode(), ADMIN_TOKEN.encode())
+
+def render_profiling_panel():
+    """Stage timings of this session's last rerun and process-wide aggregates"""
+    last_run = st.session_state.get("last_run")
+    stats = result_cache.stats()
+    with st.expander("🛠️ Profiling (admin)"):
+        col1, col2, col3, col4 = st.columns(4)
+        with col1:
+            st.metric("⏱️ Last Rerun", f"{last_run['ms']:,.0f} ms" if last_run else "—")
+        with col2:
+            st.metric("🧮 RSS", f"{last_run['rss_mb']:,.0f} MB" if last_run else "—")
+        with col3:
+            st.metric("⚡ Cache Hit Rate", f"{stats['hit_rate']:.0%}")
+        with col4:
+            st.metric("🔁 Reruns Recorded", len(RECORDER.runs))
+
+        st.markdown("**Last rerun of this session**")
+        if last_run:
+            st.dataframe(pd.DataFrame(last_run["spans"]), use_container_width=True, hide_index=True)
+        else:
+            st.caption("Interact with the page to record a rerun.")
+
+        st.markdown("**All sessions since start**")
+        summary = pd.DataFrame(RECORDER.summary())
+        if not summary.empty:
+            st.dataframe(summary.sort_values("total_s", ascending=False).round(2),
+                         use_container_width=True, hide_index=True)
+        memory = memory_report(df)
+        st.markdown(f"**Dataset memory: {memory['MB'].sum():,.1f} MB "
+                    f"({memory['Bytes/Row'].sum():,.1f} bytes per row)**")
+        st.dataframe(memory.round(2), use_container_width=True, hide_index=True)
+        figures = charts.FIGURE_CACHE.stats()
+        st.caption(f"📊 Figure cache: {figures['entries']:,} figures, {figures['hit_rate']:.0%} of "
+                   f"{figures['hits'] + figures['misses']:,} chart builds reused")
+
+        st.download_button("⬇️ Prometheus metrics", RECORDER.prometheus_text(stats),
+                           file_name="jobmarket.prom", mime="text/plain")
+        exports = [f"{label}: `{path}`" for label, path in
+                   [("JSON lines", RECORDER.jsonl_path), ("Prometheus", RECORDER.prometheus_path)] if path]
+        st.caption(" · ".join(exports) if exports else
+                   "Set JOBMARKET_METRICS_JSONL / JOBMARKET_METRICS_PROM to export every rerun.")
+
+if is_admin():
+    render_profiling_panel()
+
 # Footer
 st.markdown("---")
 st.markdown("""
@@ -611,4 +959,6 @@ st.markdown("""
     <p>🤖 <strong>AI Job Market Dashboard</strong></p>
     <p>Historical data from 2024-2025</p>
 </div>
-""", unsafe_allow_html=True)
\ No newline at end of file
+""", unsafe_allow_html=True)
+
+st.session_state["last_run"] = RECORDER.end_run(page=menu_choice, cache=result_cache.stats())
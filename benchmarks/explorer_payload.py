@@ -0,0 +1,59 @@
+"""Payload size and serialization latency of the Data Explorer table.
+
+Compares the old path (the whole frame handed to ``st.dataframe``) with the
+windowed viewer, on the real dataset and on a tiled copy of it::
+
+    python benchmarks/explorer_payload.py [--tile 20]
+"""
+import argparse
+import sys
+import time
+from pathlib import Path
+
+import pandas as pd
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from jobmarket import DATA_PATH, read_dataset  # noqa: E402
+from jobmarket.viewer import WINDOW_SIZES, arrow_payload_bytes, sample, window  # noqa: E402
+
+
+def measure(frame, repeat=3):
+    best = float("inf")
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        size = arrow_payload_bytes(frame)
+        best = min(best, time.perf_counter() - t0)
+    return size, best * 1000
+
+
+def report(df, label):
+    print(f"\n{label}: {len(df):,} rows x {df.shape[1]} columns")
+    print(f"{'view':<32}{'payload':>14}{'serialize ms':>16}")
+    rows = [("full frame (old path)", lambda: df)]
+    for size in WINDOW_SIZES:
+        rows.append((f"window {size}", lambda size=size: window(df, len(df) // 2, size)))
+    rows.append((f"sample {WINDOW_SIZES[0]}", lambda: sample(df, WINDOW_SIZES[0])))
+    rows.append((f"window {WINDOW_SIZES[0]}, 3 columns", lambda: window(df, 0, WINDOW_SIZES[0], df.columns[:3])))
+    for name, make in rows:
+        t0 = time.perf_counter()
+        frame = make()
+        slice_ms = (time.perf_counter() - t0) * 1000
+        size, ms = measure(frame)
+        print(f"{name:<32}{size / 1024:>11,.1f} KB{slice_ms + ms:>16.2f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--data", type=Path, default=DATA_PATH)
+    parser.add_argument("--tile", type=int, default=20, help="copies of the dataset for the scaled run")
+    args = parser.parse_args()
+
+    df = read_dataset(args.data)
+    report(df, "dataset")
+    if args.tile > 1:
+        report(pd.concat([df] * args.tile, ignore_index=True), f"dataset x{args.tile}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,89 @@
+"""Memory budget of one dashboard process at a given dataset size.
+
+Loads a synthetic dataset (see :mod:`synthetic`) the way the dataset store
+does, builds the shared indexes and reports the bytes of every frame column
+and every index, plus the process RSS.  Sizes are projected linearly to
+``--target`` rows and checked against ``--budget-mb``::
+
+    python benchmarks/memory_budget.py --rows 1000000 --target 10000000 --budget-mb 1024
+
+The exit status is 1 when the projected total is over budget.
+"""
+import argparse
+import sys
+import tempfile
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+from jobmarket.columns import normalize_text_columns  # noqa: E402
+from jobmarket.dataset import memory_report, read_dataset  # noqa: E402
+from jobmarket.engine import BUILDERS, Engine  # noqa: E402
+from jobmarket.metrics import rss_bytes  # noqa: E402
+from synthetic import generate  # noqa: E402
+
+
+def deep_nbytes(obj, seen=None):
+    """Bytes held by the numpy arrays and pandas objects reachable from ``obj``."""
+    seen = set() if seen is None else seen
+    if id(obj) in seen:
+        return 0
+    seen.add(id(obj))
+    if isinstance(obj, np.ndarray):
+        return obj.nbytes
+    if isinstance(obj, (pd.Series, pd.Index)):
+        return int(obj.memory_usage(deep=True))
+    if isinstance(obj, pd.DataFrame):
+        return 0  # the shared frame is reported separately
+    if isinstance(obj, dict):
+        return sum(deep_nbytes(k, seen) + deep_nbytes(v, seen) for k, v in obj.items())
+    if isinstance(obj, (list, tuple, set, frozenset)):
+        return sum(deep_nbytes(v, seen) for v in obj)
+    if hasattr(obj, "__dict__"):
+        return deep_nbytes(vars(obj), seen)
+    return sys.getsizeof(obj) if isinstance(obj, (str, bytes)) else 0
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Report the memory of the frame and indexes at scale.")
+    parser.add_argument("--rows", type=int, default=1_000_000, help="rows of the synthetic dataset to load")
+    parser.add_argument("--target", type=int, default=10_000_000, help="rows to project the budget to")
+    parser.add_argument("--budget-mb", type=float, default=1024)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    path = generate(args.rows, args.seed)
+    with tempfile.TemporaryDirectory() as cache_dir:
+        read_dataset(path, cache_dir)  # write the Arrow cache, then load it the way the app does
+        base_rss = rss_bytes()
+        df = normalize_text_columns(read_dataset(path, cache_dir))
+
+        report = memory_report(df)
+        pd.set_option("display.width", 120)
+        print(f"Frame: {len(df):,} rows")
+        print(report.round(2).to_string(index=False))
+
+        engine = Engine(df)
+        sizes = {}
+        for name in BUILDERS:
+            obj = getattr(engine, name)
+            sizes[name] = deep_nbytes(obj) / 2**20 if obj is not None else 0.0
+        print("\nIndexes (MB):")
+        for name, mb in sorted(sizes.items(), key=lambda item: -item[1]):
+            print(f"  {name:<14}{mb:>10.1f}")
+
+        frame_mb, index_mb = report["MB"].sum(), sum(sizes.values())
+        scale = args.target / len(df)
+        projected = (frame_mb + index_mb) * scale
+        print(f"\nframe {frame_mb:,.1f} MB + indexes {index_mb:,.1f} MB "
+              f"(RSS grew {(rss_bytes() - base_rss) / 2**20:,.0f} MB while loading and indexing)")
+        print(f"projected to {args.target:,} rows: {projected:,.0f} MB (budget {args.budget_mb:,.0f} MB)")
+    sys.exit(1 if projected > args.budget_mb else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,210 @@
+"""Latency and memory benchmarks for the load, filter and aggregation hot paths.
+
+Each dataset size runs in its own process (so peak RSS is per size) against
+a synthetic dataset from :mod:`synthetic`, replaying a filter workload
+through the same code the pages use:
+
+* ``load``: CSV parse + Arrow cache write (cold), memory-mapped cache (warm)
+  and text normalization, as ``get_dataset`` does
+* ``build``: every shared index and cube of ``engine.BUILDERS``
+* ``filters``: the facet counts ``render_filters`` shows next to each option
+* ``select``/``subset``: the engine filter (row positions, then the frame view)
+* ``top_titles``/``top_skills``/``overview``/``salary``/``companies``: page aggregates
+* ``similar``: the "similar jobs" of a random posting
+* ``salary_estimate``: a what-if estimate of the salary model
+* ``explorer``: a Data Explorer window serialized to Arrow
+
+The result cache is disabled so every sample measures the computation.
+Results are p50/p90/p99 in milliseconds plus the peak RSS of each size, and
+are compared with a stored baseline::
+
+    python benchmarks/run.py --rows 100000 1000000            # compare with benchmarks/baseline.json
+    python benchmarks/run.py --rows 100000 --save-baseline    # record a new baseline
+
+Baselines only make sense on the machine that recorded them.  The exit status
+is 1 when a p50 is more than ``--tolerance`` slower than the baseline.
+"""
+import argparse
+import json
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+from jobmarket.cache import ResultCache  # noqa: E402
+from jobmarket.columns import normalize_text_columns  # noqa: E402
+from jobmarket.dataset import read_dataset  # noqa: E402
+from jobmarket.engine import BUILDERS, Engine  # noqa: E402
+from jobmarket.viewer import WINDOW_SIZES, arrow_payload_bytes, window  # noqa: E402
+from synthetic import generate, workload  # noqa: E402
+
+BASELINE_PATH = Path(__file__).resolve().parent / "baseline.json"
+PERCENTILES = (50, 90, 99)
+
+
+def timed(fn):
+    t0 = time.perf_counter()
+    fn()
+    return (time.perf_counter() - t0) * 1000
+
+
+def summarize(samples):
+    samples = np.asarray(samples, dtype=np.float64)
+    stats = {f"p{p}": float(np.percentile(samples, p)) for p in PERCENTILES}
+    stats.update(mean=float(samples.mean()), n=len(samples))
+    return stats
+
+
+def peak_rss_mb():
+    # ru_maxrss is in kilobytes on Linux and in bytes on macOS
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return rss / (1024 * 1024) if sys.platform == "darwin" else rss / 1024
+
+
+def run_size(path, repeat, n_states, seed):
+    """All benchmark cases for one dataset file; ``{case: stats}``."""
+    results = {}
+
+    def record(case, samples):
+        results[case] = summarize(samples)
+
+    def cold_load():
+        with tempfile.TemporaryDirectory() as cache_dir:
+            return timed(lambda: read_dataset(path, cache_dir))
+
+    record("load/csv_cold", [cold_load() for _ in range(min(repeat, 3))])
+    with tempfile.TemporaryDirectory() as cache_dir:
+        read_dataset(path, cache_dir)
+        record("load/arrow_warm", [timed(lambda: read_dataset(path, cache_dir)) for _ in range(repeat)])
+        df = read_dataset(path, cache_dir)
+        record("load/normalize", [timed(lambda: normalize_text_columns(df.copy(deep=False)))
+                                  for _ in range(min(repeat, 3))])
+        df = normalize_text_columns(df)
+
+    engine = Engine(df, version="bench", cache=ResultCache(maxsize=0))
+    build = {
+        "catalog": lambda: engine.catalog, "count_cube": lambda: engine.count_cube,
+        "filter_index": lambda: engine.filter_index, "heavy_hitter_cube": lambda: engine.heavy_hitter_cube,
+        "kpi_cube": lambda: engine.kpi_cube, "salary_cube": lambda: engine.salary_cube,
+        "salary_model": lambda: engine.salary_model, "similar_index": lambda: engine.similar_index,
+        "skill_index": lambda: engine.skill_index, "sort_index": lambda: engine.sort_index,
+        "text_index": lambda: engine.text_index, "trend_cube": lambda: engine.trend_cube,
+    }
+    for name in BUILDERS:
+        record(f"build/{name}", [timed(build[name])])
+
+    states = workload(engine, n_states, seed)
+    dims = dict(zip(["job", "country", "exp", "remote"], engine.dims))
+
+    def selections(state):
+        return {dims[role]: state[role] for role in dims if dims[role] and role in state}
+
+    def facets(state):
+        skill_mask = engine.skill_index.mask(state["skills"]) if engine.skill_index else None
+        if skill_mask is None:
+            return engine.count_cube.facet_counts(selections(state))
+        return engine.filter_index.facet_counts(list(selections(state).items()), extra=skill_mask)
+
+    cases = {
+        "filters/facets": facets,
+        "select": engine.select,
+        "subset": engine.subset,
+        "overview": engine.overview,
+        "top_titles": lambda state: engine.top(state, "job", 20),
+        "top_skills": lambda state: engine.top(state, "skills", 20) if engine.skill_index else None,
+        "salary": lambda state: engine.salary(state, "job") if engine.column("salary") else None,
+        "companies": lambda state: engine.heavy_hitters(state, "company", 20) if engine.column("company") else None,
+    }
+    for case, fn in cases.items():
+        record(case, [timed(lambda state=state: fn(state)) for state in states])
+
+    starts = np.random.default_rng(seed).integers(0, len(df), repeat)
+    if engine.similar_index is not None:
+        record("similar", [timed(lambda start=start: engine.similar(int(start), 10)) for start in starts])
+    if engine.salary_model is not None:
+        model = engine.salary_model
+        postings = df.iloc[starts]
+        record("salary_estimate", [
+            timed(lambda i=i: engine.estimate_salary(
+                {c: postings[c].iloc[i] for c in model.categorical + model.numeric},
+                str(postings[model.skills].iloc[i]).split(",") if model.skills else ()))
+            for i in range(len(postings))
+        ])
+    record("explorer/window", [
+        timed(lambda start=start: arrow_payload_bytes(window(df, int(start), WINDOW_SIZES[1])))
+        for start in starts
+    ])
+    return {"rows": len(df), "peak_rss_mb": peak_rss_mb(), "cases": results}
+
+
+def compare(results, baseline, tolerance):
+    """Cases whose p50 regressed by more than ``tolerance``: ``[(size, case, base, now)]``."""
+    regressions = []
+    for size, result in results.items():
+        base = baseline.get(size)
+        if not base:
+            continue
+        for case, stats in result["cases"].items():
+            old = base["cases"].get(case)
+            if old and stats["p50"] > old["p50"] * (1 + tolerance) and stats["p50"] - old["p50"] > 0.05:
+                regressions.append((size, case, old["p50"], stats["p50"]))
+    return regressions
+
+
+def report(results, baseline):
+    for size, result in results.items():
+        base = baseline.get(size, {}).get("cases", {})
+        print(f"\n{int(size):,} rows, peak RSS {result['peak_rss_mb']:,.0f} MB")
+        print(f"{'case':<22}{'p50 ms':>11}{'p90 ms':>11}{'p99 ms':>11}{'baseline p50':>15}")
+        for case, stats in result["cases"].items():
+            old = f"{base[case]['p50']:.2f}" if case in base else "-"
+            print(f"{case:<22}{stats['p50']:>11.2f}{stats['p90']:>11.2f}{stats['p99']:>11.2f}{old:>15}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the dashboard's hot paths on synthetic data.")
+    parser.add_argument("--rows", type=int, nargs="+", default=[100_000], help="dataset sizes (1e5 to 1e7)")
+    parser.add_argument("--repeat", type=int, default=20, help="samples of the per-call cases")
+    parser.add_argument("--states", type=int, default=200, help="filter states replayed per case")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--baseline", type=Path, default=BASELINE_PATH)
+    parser.add_argument("--save-baseline", action="store_true", help="store these results as the baseline")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="allowed p50 slowdown (0.25 = 25%%)")
+    parser.add_argument("--worker", type=Path, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.worker:
+        print(json.dumps(run_size(args.worker, args.repeat, args.states, args.seed)))
+        return
+
+    results = {}
+    for n_rows in args.rows:
+        path = generate(n_rows, args.seed)
+        out = subprocess.run(
+            [sys.executable, __file__, "--worker", str(path), "--repeat", str(args.repeat),
+             "--states", str(args.states), "--seed", str(args.seed)],
+            check=True, capture_output=True, text=True,
+        ).stdout
+        results[str(n_rows)] = json.loads(out.strip().splitlines()[-1])
+
+    baseline = json.loads(args.baseline.read_text()) if args.baseline.exists() else {}
+    report(results, baseline)
+    if args.save_baseline:
+        args.baseline.write_text(json.dumps({**baseline, **results}, indent=1))
+        print(f"\nBaseline saved to {args.baseline}")
+        return
+    regressions = compare(results, baseline, args.tolerance)
+    for size, case, old, new in regressions:
+        print(f"REGRESSION {int(size):,} rows {case}: p50 {old:.2f} -> {new:.2f} ms")
+    sys.exit(1 if regressions else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,119 @@
+"""Host memory of N server workers, each loading the data vs all attaching one snapshot.
+
+Publishes a synthetic dataset (see :mod:`synthetic`) with
+:mod:`jobmarket.shared`, then starts ``--workers`` processes twice: once
+loading the frame and indexes themselves (as without ``JOBMARKET_SHARED_DIR``)
+and once attaching the snapshot (plus a ``baseline`` run that only imports
+the engine).  Every worker builds its engine with all indexes and answers one
+filtered count; while all of them are alive each reports its RSS and PSS
+(resident memory with shared pages split between the processes mapping them,
+so the PSS of all workers adds up to their share of host memory)::
+
+    python benchmarks/shared_memory.py --rows 1000000 --workers 4
+
+The exit status is 1 when attaching takes more than ``--attach-ms``.
+"""
+import argparse
+import multiprocessing
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+from jobmarket.dataset import read_dataset  # noqa: E402
+from jobmarket.metrics import rss_bytes  # noqa: E402
+from jobmarket.shared import SharedDataset, build_snapshot, publish, shared_path_for  # noqa: E402
+from synthetic import generate  # noqa: E402
+
+FILTERS = {"job": [], "country": [], "exp": ["Senior-Level"], "remote": [], "skills": ["python"], "query": ""}
+
+
+def pss_bytes():
+    """Proportional set size of this process (Linux), else its RSS."""
+    try:
+        with open("/proc/self/smaps_rollup") as f:
+            for line in f:
+                if line.startswith("Pss:"):
+                    return int(line.split()[1]) * 1024
+    except OSError:
+        pass
+    return rss_bytes()
+
+
+def _worker(mode, path, snapshot_file, barrier, results):
+    from jobmarket.engine import Engine
+
+    start = time.perf_counter()
+    if mode == "baseline":
+        barrier.wait()
+        results.put((mode, 0.0, rss_bytes(), pss_bytes()))
+        barrier.wait()
+        return
+    if mode == "shared":
+        dataset = SharedDataset(snapshot_file)
+        snapshot = dataset.refresh()
+        engine = Engine(snapshot.frame, snapshot.version, lambda name, *args: dataset.derived(snapshot, name, args))
+    else:
+        engine = Engine.from_path(path)
+    engine.warm()
+    ready = time.perf_counter() - start
+    engine.count(FILTERS)
+    barrier.wait()  # every worker is resident before anyone measures
+    results.put((mode, ready, rss_bytes(), pss_bytes()))
+    barrier.wait()
+
+
+def run_workers(mode, n, path, snapshot_file):
+    context = multiprocessing.get_context("spawn")
+    barrier, results = context.Barrier(n), context.Queue()
+    procs = [context.Process(target=_worker, args=(mode, path, snapshot_file, barrier, results)) for _ in range(n)]
+    for p in procs:
+        p.start()
+    rows = [results.get() for _ in procs]
+    for p in procs:
+        p.join()
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare per-worker and host memory with and without a shared snapshot.")
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--out", type=Path, default=Path("/dev/shm") if Path("/dev/shm").is_dir() else None,
+                        help="directory for the snapshot (a tmpfs keeps it in memory)")
+    parser.add_argument("--attach-ms", type=float, default=100.0)
+    args = parser.parse_args()
+
+    path = generate(args.rows, args.seed)
+    read_dataset(path)  # Arrow cache, so private workers load it the way the app does
+    with tempfile.TemporaryDirectory(dir=args.out) as out:
+        start = time.perf_counter()
+        snapshot_file = shared_path_for(out, path)
+        size = publish(build_snapshot(path), snapshot_file)
+        print(f"Published {args.rows:,} rows: {size / 2**20:.1f} MB in {time.perf_counter() - start:.1f}s")
+
+        start = time.perf_counter()
+        SharedDataset(snapshot_file).refresh()
+        attach_ms = (time.perf_counter() - start) * 1e3
+        print(f"Attach: {attach_ms:.1f} ms\n")
+
+        print(f"{'mode':<9}{'workers':>8}{'ready s':>10}{'RSS MB':>10}{'PSS MB':>10}{'host MB':>10}")
+        for mode in ["baseline", "private", "shared"]:
+            rows = run_workers(mode, args.workers, path, snapshot_file)
+            ready = max(r[1] for r in rows)
+            rss = sum(r[2] for r in rows) / len(rows) / 2**20
+            pss = sum(r[3] for r in rows) / len(rows) / 2**20
+            host = sum(r[3] for r in rows) / 2**20
+            print(f"{mode:<9}{len(rows):>8}{ready:>10.2f}{rss:>10.1f}{pss:>10.1f}{host:>10.1f}")
+        print("\nhost MB: summed PSS of the workers (snapshot pages they never touch stay in the tmpfs, "
+              f"at most {size / 2**20:.1f} MB)")
+
+    return 1 if attach_ms > args.attach_ms else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,121 @@
+"""Startup-time budget of the dashboard.
+
+Two numbers decide how fast a freshly started (scaled-from-zero) process
+paints its first page:
+
+* ``imports``: the module-level imports of ``app.py``, measured in a fresh
+  interpreter with ``python -X importtime``;
+* ``first run``: one complete script run of the default page in a fresh
+  process (dataset load from the Arrow cache plus the filter-bar indexes),
+  through Streamlit's ``AppTest``.
+
+Both are checked against a budget, and modules that only some pages (or no
+page) need must not be imported at startup::
+
+    python benchmarks/startup.py                       # default budgets
+    python benchmarks/startup.py --imports-ms 800 --first-run-ms 2000
+
+The exit status is 1 when a budget is exceeded or a deferred module shows up.
+"""
+import argparse
+import ast
+import re
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+APP_PATH = ROOT / "app.py"
+
+# Modules the dashboard does not import at startup
+DEFERRED_MODULES = ["altair", "plotly.express", "scipy", "sklearn", "matplotlib"]
+
+_IMPORTTIME = re.compile(r"import time:\s+(\d+) \|\s+(\d+) \|( *)(\S+)")
+
+_FIRST_RUN = """
+import time
+from streamlit.testing.v1 import AppTest
+t0 = time.perf_counter()
+at = AppTest.from_file({app!r}, default_timeout=600)
+at.run()
+assert not at.exception, at.exception
+print(time.perf_counter() - t0)
+"""
+
+
+def startup_imports(app_path=APP_PATH):
+    """Modules imported at the top level of ``app_path``, in order."""
+    modules = []
+    for node in ast.parse(Path(app_path).read_text()).body:
+        if isinstance(node, ast.Import):
+            modules += [alias.name for alias in node.names]
+        elif isinstance(node, ast.ImportFrom) and node.level == 0:
+            modules.append(node.module)
+    return modules
+
+
+def import_times(modules):
+    """``{module: (self_us, cumulative_us, depth)}`` for importing ``modules`` in a fresh interpreter."""
+    out = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "; ".join(f"import {m}" for m in modules)],
+        cwd=ROOT, check=True, capture_output=True, text=True,
+    ).stderr
+    times = {}
+    for line in out.splitlines():
+        match = _IMPORTTIME.match(line)
+        if match:
+            own, cumulative, indent, name = match.groups()
+            times[name] = (int(own), int(cumulative), len(indent) // 2)
+    return times
+
+
+def first_run_seconds(app_path=APP_PATH):
+    out = subprocess.run(
+        [sys.executable, "-c", _FIRST_RUN.format(app=str(app_path))],
+        cwd=ROOT, check=True, capture_output=True, text=True,
+    ).stdout
+    return float(out.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Check the dashboard's startup time against a budget.")
+    parser.add_argument("--imports-ms", type=float, default=1500, help="budget for the module-level imports")
+    parser.add_argument("--first-run-ms", type=float, default=3000, help="budget for the first script run")
+    parser.add_argument("--top", type=int, default=10, help="slowest top-level imports to list")
+    parser.add_argument("--skip-run", action="store_true", help="only measure the imports")
+    args = parser.parse_args()
+
+    modules = startup_imports()
+    t0 = time.perf_counter()
+    times = import_times(modules)
+    wall_ms = (time.perf_counter() - t0) * 1000
+    # Top-level entries other than app.py's own imports belong to interpreter startup (site, encodings)
+    packages = {m.split(".")[0] for m in modules}
+    roots = {name: cumulative for name, (_, cumulative, depth) in times.items()
+             if depth == 0 and name.split(".")[0] in packages}
+    imports_ms = sum(roots.values()) / 1000
+    print(f"imports: {imports_ms:,.0f} ms ({len(times):,} modules, {wall_ms:,.0f} ms with interpreter start)")
+    for name, cumulative in sorted(roots.items(), key=lambda item: -item[1])[:args.top]:
+        print(f"  {name:<40}{cumulative / 1000:>10.1f} ms")
+
+    failures = []
+    if imports_ms > args.imports_ms:
+        failures.append(f"imports took {imports_ms:,.0f} ms (budget {args.imports_ms:,.0f} ms)")
+    loaded = [m for m in DEFERRED_MODULES if m in times]
+    if loaded:
+        failures.append(f"imported at startup: {', '.join(loaded)}")
+
+    if not args.skip_run:
+        run_ms = first_run_seconds() * 1000
+        print(f"first run: {run_ms:,.0f} ms")
+        if run_ms > args.first_run_ms:
+            failures.append(f"first run took {run_ms:,.0f} ms (budget {args.first_run_ms:,.0f} ms)")
+
+    for failure in failures:
+        print(f"OVER BUDGET: {failure}")
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,121 @@
+"""Synthetic datasets and filter workloads at production scale.
+
+``generate`` scales ``AI_DATASET_CLEANED.csv`` to any number of rows with the
+same columns and value formats: rows are bootstrapped from the real file (so
+titles, countries, levels and skills keep their joint distribution), salaries
+get multiplicative noise, dates are shifted by a few weeks and company names
+gain a numeric suffix so their cardinality grows with the row count.  The
+result is written as a CSV that :func:`~jobmarket.dataset.read_dataset`
+loads like the real one::
+
+    python benchmarks/synthetic.py 1000000        # -> benchmarks/.data/synthetic-1000000-s0.csv
+
+``workload`` draws filter states the way users pick them on the dashboard:
+most sessions keep the default selection, others pick a few frequent values
+per filter, sometimes skills or a search query.
+"""
+import argparse
+import sys
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from jobmarket.dataset import DATA_PATH, DATE_FORMAT  # noqa: E402
+
+DATA_DIR = Path(__file__).resolve().parent / ".data"
+CHUNK_ROWS = 500_000  # rows generated and written per chunk
+
+
+def synthetic_path(n_rows, seed=0, data_dir=DATA_DIR):
+    return Path(data_dir) / f"synthetic-{n_rows}-s{seed}.csv"
+
+
+def _chunk(seed_df, n_rows, rng):
+    rows = seed_df.iloc[rng.integers(0, len(seed_df), n_rows)].reset_index(drop=True)
+    if "salary_usd" in rows.columns:
+        noise = rng.lognormal(0.0, 0.08, n_rows)
+        rows["salary_usd"] = (rows["salary_usd"] * noise).round().astype("int64")
+    shift = pd.to_timedelta(rng.integers(-30, 31, n_rows), unit="D")
+    for col in ["posting_date", "application_deadline"]:
+        if col in rows.columns:
+            rows[col] = (rows[col] + shift).dt.strftime(DATE_FORMAT)
+    if "company_name" in rows.columns:
+        n_companies = max(1, int(np.sqrt(n_rows)) // 10)
+        suffix = pd.Series(rng.integers(0, n_companies, n_rows)).astype(str)
+        rows["company_name"] = rows["company_name"].astype(str) + " " + suffix
+    return rows
+
+
+def generate(n_rows, seed=0, source=DATA_PATH, data_dir=DATA_DIR):
+    """Write (once) a ``n_rows`` synthetic copy of ``source``; returns its path."""
+    out = synthetic_path(n_rows, seed, data_dir)
+    if out.exists():
+        return out
+    out.parent.mkdir(parents=True, exist_ok=True)
+    seed_df = pd.read_csv(source, low_memory=False)
+    for col in ["posting_date", "application_deadline"]:
+        if col in seed_df.columns:
+            seed_df[col] = pd.to_datetime(seed_df[col], format=DATE_FORMAT, errors="coerce")
+
+    rng = np.random.default_rng(seed)
+    tmp = out.with_suffix(".tmp")
+    for start in range(0, n_rows, CHUNK_ROWS):
+        chunk = _chunk(seed_df, min(CHUNK_ROWS, n_rows - start), rng)
+        chunk.to_csv(tmp, mode="w" if start == 0 else "a", header=start == 0, index=False)
+    tmp.replace(out)
+    return out
+
+
+def _pick(rng, counts, k):
+    """``k`` distinct values drawn with probability proportional to their counts."""
+    counts = counts[counts > 0]
+    k = min(k, len(counts))
+    return list(rng.choice(counts.index.to_numpy(), size=k, replace=False, p=(counts / counts.sum()).to_numpy()))
+
+
+def workload(engine, n_states=200, seed=0):
+    """``n_states`` engine filter states: the default state about half the time, else random picks."""
+    rng = np.random.default_rng(seed)
+    df, columns, catalog = engine.df, engine.columns, engine.catalog
+    roles = [role for role in ["job", "country", "exp", "remote"] if columns[role]]
+    value_counts = {role: df[columns[role]].astype(str).value_counts() for role in roles}
+    skill_counts = engine.skill_index.counts(None) if engine.skill_index else None
+    titles = value_counts["job"].index.to_numpy() if "job" in value_counts else np.array([])
+    defaults = {role: list(catalog.get_defaults(columns[role])) for role in roles}
+
+    states = []
+    for _ in range(n_states):
+        if rng.random() < 0.5:
+            states.append(dict(defaults, skills=[], query=""))
+            continue
+        state = {role: [] for role in roles}
+        for role, p in zip(roles, [0.6, 0.5, 0.4, 0.3]):
+            if rng.random() < p:
+                state[role] = _pick(rng, value_counts[role], int(rng.integers(1, 4)))
+        state["skills"] = []
+        if skill_counts is not None and rng.random() < 0.2:
+            state["skills"] = _pick(rng, pd.Series(skill_counts), int(rng.integers(1, 3)))
+        state["query"] = ""
+        if len(titles) and rng.random() < 0.1:
+            title = str(rng.choice(titles)).lower()
+            start = int(rng.integers(0, max(1, len(title) - 4)))
+            state["query"] = title[start:start + 4]
+        states.append(state)
+    return states
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Write a synthetic copy of the cleaned dataset.")
+    parser.add_argument("rows", type=int, nargs="+", help="number of rows (one file per value)")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--source", type=Path, default=DATA_PATH)
+    args = parser.parse_args()
+    for n_rows in args.rows:
+        print(generate(n_rows, args.seed, args.source))
+
+
+if __name__ == "__main__":
+    main()
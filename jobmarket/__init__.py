@@ -0,0 +1,12 @@
+"""Data layer for the AI Job Market Dashboard.
+
+Everything in this package is plain pandas/numpy so it can be imported by the
+Streamlit pages and offline scripts alike.
+"""
+from .catalog import Catalog
+from .dataset import DATA_PATH, read_dataset
+from .facets import CountCube
+from .index import FilterIndex
+from .skills import SkillIndex
+
+__all__ = ["DATA_PATH", "Catalog", "CountCube", "FilterIndex", "SkillIndex", "read_dataset"]
@@ -0,0 +1,325 @@
+"""JSON API over the query engine, for services that need the numbers, not the UI.
+
+A plain ASGI application (no web framework required) serving the same
+filtering and aggregates as the dashboard from one process-wide
+:class:`~jobmarket.engine.Engine`::
+
+    GET /health                      dataset version and row count
+    GET /count                       rows matching the filters
+    GET /kpis                        Overview page KPIs
+    GET /top?by=job&n=20             most frequent titles/countries/skills/...
+    GET /salary?by=job               salary percentiles per group and overall
+    GET /companies?by=company&n=20   most frequent companies/industries, with error bounds
+    GET /rows?columns=&sort=&order=asc&offset=0&limit=1000
+                                     matching rows as newline-delimited JSON
+    GET /metrics                     stage timings in the Prometheus text format
+
+Filters are repeated query parameters named after the column roles:
+``job``, ``country``, ``exp``, ``remote``, ``skills`` (all required) and
+``q`` (free-text search), e.g. ``/count?country=GERMANY&country=JAPAN&q=data``.
+Results are shared with other requests through the engine's result cache, and
+the engine is reloaded when the dataset changes.  Every JSON key is lower case
+(``value``, ``count``, ``p25``, ...).  Errors are JSON objects with an
+``error`` key (400 for invalid parameters, 500 otherwise); a ``/rows`` stream
+that fails after its first chunk ends with such an object as its last line.
+Serve it with any ASGI server, for instance::
+
+    python -m jobmarket.api --port 8000      # needs uvicorn
+"""
+import argparse
+import asyncio
+import json
+import logging
+import math
+import threading
+from pathlib import Path
+from urllib.parse import parse_qs
+
+import numpy as np
+
+from .cache import ResultCache
+from .columns import FILTER_ROLES, normalize_text_columns
+from .dataset import DATA_PATH, dataset_version
+from .engine import HEAVY_HITTER_ROLES, UPDATERS, Engine, persisted_builders
+from .metrics import RECORDER
+from .partitions import LiveDataset, has_partitions
+from .salary import QUANTILE_LABELS
+from .shared import SharedDataset, shared_dir, shared_path_for
+
+ROWS_CHUNK = 1_000   # rows per streamed NDJSON body chunk
+MAX_ROWS = 100_000   # upper bound of /rows?limit=
+MAX_TOP = 1_000      # upper bound of /top?n=
+
+logger = logging.getLogger(__name__)
+
+
+class BadRequest(ValueError):
+    """Invalid query parameters; answered with a 400."""
+
+
+class EngineLoader:
+    """Current engine for ``path``, rebuilt when its dataset version changes.
+
+    A partitioned store next to ``path`` (see :mod:`jobmarket.partitions`)
+    is followed through a :class:`~jobmarket.partitions.LiveDataset`, and a
+    snapshot published for ``path`` (see :mod:`jobmarket.shared`) is mapped
+    through a :class:`~jobmarket.shared.SharedDataset`, as in the dashboard.
+    """
+
+    def __init__(self, path=DATA_PATH, cache=None):
+        self.path = Path(path)
+        self.cache = cache if cache is not None else ResultCache()
+        root = self.path.parent / "partitions"
+        shared_file = shared_path_for(shared_dir(), self.path) if shared_dir() is not None else None
+        if shared_file is not None and shared_file.exists():
+            self.live = SharedDataset(shared_file, persisted_builders(self.path))
+        elif has_partitions(root):
+            self.live = LiveDataset(root, persisted_builders(root), UPDATERS, prepare=normalize_text_columns)
+        else:
+            self.live = None
+        self._engine = None
+        self._lock = threading.Lock()
+
+    def get(self):
+        with self._lock:
+            if self.live is not None:
+                snapshot = self.live.refresh()
+                if self._engine is None or self._engine.version != snapshot.version:
+                    self._engine = Engine(
+                        snapshot.frame, snapshot.version,
+                        lambda name, *args: self.live.derived(snapshot, name, args), cache=self.cache,
+                    )
+            elif self._engine is None or self._engine.version != dataset_version(self.path):
+                self._engine = Engine.from_path(self.path, self.cache)
+            return self._engine
+
+
+# ----- request parsing -----
+
+def parse_filters(params):
+    """Engine filter state from parsed query parameters."""
+    filters = {role: params.get(role, []) for role in FILTER_ROLES}
+    filters["skills"] = [s.strip().lower() for s in params.get("skills", [])]
+    filters["query"] = " ".join(params.get("q", []))
+    return filters
+
+
+def _one(params, name, default=None):
+    values = params.get(name)
+    return values[-1] if values else default
+
+
+def _int(params, name, default, low=0, high=None):
+    value = _one(params, name)
+    if value is None:
+        return default
+    try:
+        value = int(value)
+    except ValueError:
+        raise BadRequest(f"{name} must be an integer") from None
+    if value < low or (high is not None and value > high):
+        raise BadRequest(f"{name} must be between {low} and {high}" if high else f"{name} must be >= {low}")
+    return value
+
+
+def _json_default(value):
+    if isinstance(value, np.integer):
+        return int(value)
+    if isinstance(value, np.floating):
+        return None if np.isnan(value) else float(value)
+    if isinstance(value, (np.ndarray, tuple)):
+        return list(value)
+    return str(value)
+
+
+def _clean(value):
+    """``value`` with NaN floats replaced by ``None`` (JSON has no NaN)."""
+    if isinstance(value, float) and math.isnan(value):
+        return None
+    if isinstance(value, dict):
+        return {k: _clean(v) for k, v in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [_clean(v) for v in value]
+    return value
+
+
+def _records(frame):
+    """Rows of ``frame`` as dicts keyed by its lower-cased column names (the API's key casing)."""
+    return json.loads(frame.rename(columns=str.lower).to_json(orient="records", date_format="iso"))
+
+
+# ----- endpoints (blocking; run in a worker thread) -----
+
+def health(engine, params):
+    return {"status": "ok", "version": engine.version, "rows": len(engine.df)}
+
+
+def count(engine, params):
+    return {"count": engine.count(parse_filters(params)), "total": len(engine.df)}
+
+
+def kpis(engine, params):
+    return engine.overview(parse_filters(params))
+
+
+def top(engine, params):
+    role = _one(params, "by", "job")
+    n = _int(params, "n", 20, low=1, high=MAX_TOP)
+    try:
+        table = engine.top(parse_filters(params), role, n)
+    except KeyError:
+        raise BadRequest(f"unknown or missing column role: {role}") from None
+    return {"by": role, "values": _records(table)}
+
+
+def salary(engine, params):
+    role = _one(params, "by", "job")
+    try:
+        table, overall, approximate = engine.salary(parse_filters(params), role)
+    except KeyError:
+        raise BadRequest(f"cannot group salaries by: {role}") from None
+    return {
+        "by": role,
+        "approximate": approximate,
+        "overall": {label.lower(): float(v) for label, v in zip(QUANTILE_LABELS, overall)},
+        "groups": _records(table.rename(columns={"Group": "Value"})),
+    }
+
+
+def companies(engine, params):
+    role = _one(params, "by", "company")
+    n = _int(params, "n", 20, low=1, high=MAX_TOP)
+    if role not in HEAVY_HITTER_ROLES or not engine.columns.get(role):
+        raise BadRequest(f"cannot rank: {role}")
+    table, approximate, unlisted = engine.heavy_hitters(parse_filters(params), role, n)
+    return {
+        "by": role,
+        "approximate": approximate,
+        "unlisted_max": unlisted,
+        "values": _records(table),
+    }
+
+
+ENDPOINTS = {
+    "/health": health,
+    "/count": count,
+    "/kpis": kpis,
+    "/top": top,
+    "/salary": salary,
+    "/companies": companies,
+}
+
+
+def rows_plan(engine, params):
+    """Row positions and columns of a ``/rows`` request."""
+    columns = [c for value in params.get("columns", []) for c in value.split(",") if c]
+    unknown = [c for c in columns + params.get("sort", []) if c not in engine.df.columns]
+    if unknown:
+        raise BadRequest(f"unknown columns: {', '.join(unknown)}")
+    order = _one(params, "order", "asc")
+    if order not in ("asc", "desc"):
+        raise BadRequest("order must be asc or desc")
+    rows = engine.page(
+        parse_filters(params), _one(params, "sort"), order == "asc",
+        _int(params, "offset", 0), _int(params, "limit", MAX_ROWS, low=1, high=MAX_ROWS),
+    )
+    return rows, columns or list(engine.df.columns)
+
+
+def rows_chunk(engine, rows, columns):
+    text = engine.df.iloc[rows][columns].to_json(orient="records", lines=True, date_format="iso")
+    return text if text.endswith("\n") else text + "\n"
+
+
+# ----- ASGI -----
+
+async def _send_json(send, status, payload):
+    body = json.dumps(_clean(payload), default=_json_default).encode()
+    await send({"type": "http.response.start", "status": status,
+                "headers": [(b"content-type", b"application/json"), (b"content-length", str(len(body)).encode())]})
+    await send({"type": "http.response.body", "body": body})
+
+
+async def _lifespan(receive, send, loader):
+    while True:
+        message = await receive()
+        if message["type"] == "lifespan.startup":
+            try:
+                await asyncio.to_thread(loader.get)
+            except Exception as exc:
+                await send({"type": "lifespan.startup.failed", "message": str(exc)})
+                return
+            await send({"type": "lifespan.startup.complete"})
+        elif message["type"] == "lifespan.shutdown":
+            await send({"type": "lifespan.shutdown.complete"})
+            return
+
+
+def create_app(path=DATA_PATH, cache=None):
+    """ASGI application serving the dataset at ``path``."""
+    loader = EngineLoader(path, cache)
+
+    async def app(scope, receive, send):
+        if scope["type"] == "lifespan":
+            return await _lifespan(receive, send, loader)
+        if scope["type"] != "http":
+            return
+        route = scope["path"].rstrip("/") or "/"
+        if route not in ("/rows", "/metrics") and route not in ENDPOINTS:
+            return await _send_json(send, 404, {"error": f"not found: {scope['path']}"})
+        if scope["method"] != "GET":
+            return await _send_json(send, 405, {"error": "method not allowed"})
+        if route == "/metrics":
+            body = RECORDER.prometheus_text(loader.cache.stats()).encode()
+            await send({"type": "http.response.start", "status": 200,
+                        "headers": [(b"content-type", b"text/plain; version=0.0.4")]})
+            return await send({"type": "http.response.body", "body": body})
+        params = parse_qs(scope.get("query_string", b"").decode("latin-1"))
+        try:
+            engine = await asyncio.to_thread(loader.get)
+            if route != "/rows":
+                return await _send_json(send, 200, await asyncio.to_thread(ENDPOINTS[route], engine, params))
+            rows, columns = await asyncio.to_thread(rows_plan, engine, params)
+        except BadRequest as exc:
+            return await _send_json(send, 400, {"error": str(exc)})
+        except Exception:
+            logger.exception("%s failed", scope["path"])
+            return await _send_json(send, 500, {"error": "internal server error"})
+
+        # Stream the rows a chunk at a time so large pages never sit in memory as one body
+        await send({"type": "http.response.start", "status": 200,
+                    "headers": [(b"content-type", b"application/x-ndjson")]})
+        try:
+            for start in range(0, len(rows), ROWS_CHUNK):
+                chunk = await asyncio.to_thread(rows_chunk, engine, rows[start:start + ROWS_CHUNK], columns)
+                await send({"type": "http.response.body", "body": chunk.encode(), "more_body": True})
+            tail = b""
+        except Exception:
+            # The status is already sent: end the stream with an error line instead of leaving it open
+            logger.exception("%s failed after streaming started", scope["path"])
+            tail = json.dumps({"error": "internal server error"}).encode() + b"\n"
+        await send({"type": "http.response.body", "body": tail})
+
+    app.loader = loader
+    return app
+
+
+app = create_app()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Serve the job-market query API.")
+    parser.add_argument("--data", type=Path, default=DATA_PATH, help="dataset CSV or Arrow file")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8000)
+    args = parser.parse_args()
+    try:
+        import uvicorn
+    except ImportError:
+        raise SystemExit("The API server needs uvicorn: pip install uvicorn (or run jobmarket.api:app "
+                         "with any other ASGI server)") from None
+    uvicorn.run(create_app(args.data), host=args.host, port=args.port)
+
+
+if __name__ == "__main__":
+    main()
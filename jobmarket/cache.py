@@ -0,0 +1,106 @@
+"""Bounded result cache shared by every session of the dashboard.
+
+Most traffic asks for the same few filter states (above all the default
+one), so the row selections and page aggregates computed for a filter state
+are kept and reused across users.  Keys are a hash of the dataset version,
+the kind of result and the *normalized* filter state: the order in which
+columns or values were picked does not matter, and empty filters are dropped.
+
+Entries are evicted least-recently-used first once ``maxsize`` is reached and
+expire ``ttl`` seconds after they were stored.  Cached values are shared:
+treat them as read-only (arrays are stored with the write flag cleared).
+"""
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+
+import numpy as np
+
+
+def normalize_state(state):
+    """Canonical, order-independent form of a ``{name: values}`` filter state."""
+    items = []
+    for name, values in state.items():
+        if values is None or values == "":
+            continue
+        if isinstance(values, (str, int, float, bool)):
+            items.append((str(name), repr(values)))
+        elif len(values):
+            items.append((str(name), tuple(sorted({repr(v) for v in values}))))
+    return tuple(sorted(items))
+
+
+def state_key(version, kind, state):
+    """Stable hash of a result kind and filter state for one dataset version."""
+    payload = repr((str(version), kind, normalize_state(state))).encode()
+    return hashlib.blake2b(payload, digest_size=16).hexdigest()
+
+
+def _freeze(value):
+    if isinstance(value, np.ndarray):
+        value.flags.writeable = False
+    return value
+
+
+class ResultCache:
+    """Thread-safe LRU cache with a per-entry time to live and hit/miss counters."""
+
+    def __init__(self, maxsize=1024, ttl=600.0):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    def get(self, key, default=None):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                stored_at, value = entry
+                if time.monotonic() - stored_at <= self.ttl:
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return value
+                del self._entries[key]
+                self.expirations += 1
+            self.misses += 1
+            return default
+
+    def put(self, key, value):
+        with self._lock:
+            self._entries[key] = (time.monotonic(), _freeze(value))
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def get_or_compute(self, key, compute):
+        """Cached value for ``key``, calling ``compute()`` (outside the lock) on a miss."""
+        missing = object()
+        value = self.get(key, missing)
+        if value is missing:
+            value = compute()
+            self.put(key, value)
+        return value
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self):
+        """Counters and size, for the sidebar and monitoring."""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "maxsize": self.maxsize,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+                "evictions": self.evictions,
+                "expirations": self.expirations,
+            }
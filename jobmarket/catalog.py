@@ -0,0 +1,80 @@
+"""Filter-option catalog computed once per dataset.
+
+Rendering the filter bar only needs the sorted distinct values of a handful
+of columns, their counts and the default picks.  None of that changes between
+reruns, so it is gathered here once and shared by every session.
+"""
+
+
+class Catalog:
+    """Sorted options, per-option counts and default picks for filter columns."""
+
+    def __init__(self, df, columns):
+        self.options = {}
+        self.counts = {}
+        self.defaults = {}
+        for col in columns:
+            if not col or col in self.options or col not in df.columns:
+                continue
+            counts = df[col].value_counts(dropna=True)
+            counts = counts[counts > 0]
+            counts = counts[counts.index.astype(str) != ""]
+            self.counts[col] = {value: int(n) for value, n in counts.items()}
+            self.options[col] = sorted(self.counts[col])
+
+    def append(self, df):
+        """Count the rows of ``df`` in as well; the default picks are kept."""
+        counts = {}
+        for col, col_counts in self.counts.items():
+            merged = dict(col_counts)
+            for value, n in df[col].value_counts(dropna=True).items():
+                if n > 0 and str(value) != "":
+                    merged[value] = merged.get(value, 0) + int(n)
+            counts[col] = merged
+        self.counts = counts
+        self.options = {col: sorted(col_counts) for col, col_counts in counts.items()}
+
+    def get_options(self, col):
+        return self.options.get(col, [])
+
+    def get_defaults(self, col):
+        return self.defaults.get(col, [])
+
+    def set_defaults(self, col, values):
+        """Remember the default selection for ``col`` (restricted to known options)."""
+        known = self.counts.get(col, {})
+        self.defaults[col] = [v for v in values if v in known]
+
+
+def pick_defaults(options, preferred_list):
+    if not options:
+        return []
+    picks = []
+    for p in preferred_list:
+        for o in options:
+            if p.lower() == o.lower() or p.lower() in o.lower():
+                if o not in picks:
+                    picks.append(o)
+    if not picks:
+        picks = options[:2]
+    return picks
+
+
+def build_catalog(df, columns):
+    """Catalog of the filter columns ``(job, country, exp, remote)`` with the dashboard's default picks."""
+    job, country, exp, remote = columns
+    catalog = Catalog(df, columns)
+
+    catalog.set_defaults(job, pick_defaults(catalog.get_options(job), ["Data Scientist", "Ai Research Scientist"]))
+
+    all_countries = catalog.get_options(country)
+    germany_matches = [c for c in all_countries if "germany" in c.lower()]
+    catalog.set_defaults(country, germany_matches if germany_matches else all_countries[:1])
+
+    all_exp = catalog.get_options(exp)
+    mi_matches = [e for e in all_exp if "mi" in e.lower()]
+    catalog.set_defaults(exp, mi_matches if mi_matches else all_exp[:1])
+
+    all_remote = catalog.get_options(remote)
+    catalog.set_defaults(remote, [r for r in all_remote if r != 0][:1] or all_remote[:1])
+    return catalog
@@ -0,0 +1,180 @@
+"""Plotly figures of the dashboard pages, built once per distinct aggregate.
+
+Building a figure (trace validation above all) costs several times more than
+serializing it, and most reruns redraw a chart whose data did not change.
+:func:`figure` therefore memoizes every built figure by the chart kind, its
+options, the theme and a content hash of the aggregate frames it is drawn
+from; a rerun with the same aggregate (from any session or filter state) gets
+the same figure object back and only Streamlit's JSON serialization is left.
+Shared figures are read-only.
+
+All charts start from the layout of their theme in :data:`THEMES`, plus a
+ranking (horizontal bars) or time-series layout.  Gradient bars are coloured
+through a colorscale over the counts, so no per-bar colour strings are built.
+"""
+import hashlib
+
+import numpy as np
+import pandas as pd
+import plotly.graph_objects as go
+
+from .cache import ResultCache
+
+PRIMARY = "rgb(102,126,234)"
+ACCENT = "rgb(118,75,162)"
+GRID = "rgba(200,200,200,0.2)"
+
+# Base layout of every chart per theme
+THEMES = {
+    "light": dict(
+        paper_bgcolor="rgba(0,0,0,0)",
+        plot_bgcolor="rgba(248,249,250,1)",
+        margin=dict(l=60, r=24, t=40, b=40),
+        font=dict(family="Arial", size=12),
+    ),
+}
+
+RANKING_LAYOUT = dict(
+    xaxis=dict(showgrid=True, gridcolor=GRID, zeroline=False),
+    yaxis=dict(automargin=True),
+    showlegend=False,
+)
+SERIES_LAYOUT = dict(
+    height=320,
+    xaxis=dict(showgrid=False, zeroline=False),
+    yaxis=dict(showgrid=True, gridcolor=GRID, zeroline=False),
+    legend=dict(orientation="h", yanchor="bottom", y=1.02, x=0),
+)
+
+# Built figures shared by every session of the process
+FIGURE_CACHE = ResultCache(maxsize=256, ttl=float("inf"))
+
+
+def frame_hash(frame):
+    """Content hash of a frame or series (values, index and column names)."""
+    frame = frame.to_frame() if isinstance(frame, pd.Series) else frame
+    digest = hashlib.blake2b(digest_size=16)
+    digest.update(repr((list(frame.columns), list(frame.dtypes.astype(str)))).encode())
+    digest.update(pd.util.hash_pandas_object(frame, index=True).to_numpy().tobytes())
+    return digest.hexdigest()
+
+
+def _base(theme, *layouts, **overrides):
+    fig = go.Figure()
+    fig.update_layout(THEMES[theme])
+    for layout in layouts:
+        fig.update_layout(layout)
+    fig.update_layout(**overrides)
+    return fig
+
+
+def gradient(values):
+    """Marker colours running from PRIMARY (smallest value) to ACCENT (largest)."""
+    values = np.asarray(values, dtype=np.float64)
+    return dict(color=values, colorscale=[[0, PRIMARY], [1, ACCENT]],
+                cmin=values.min() if len(values) else 0, cmax=values.max() + 1e-9 if len(values) else 1)
+
+
+# ----- figure builders: builder(*frames, theme, **options) -----
+
+def top_titles_figure(counts, theme):
+    """Lollipop bars of ``counts`` (``Job Title``/``Count``, largest first)."""
+    hc = counts[::-1].reset_index(drop=True)
+    colors = gradient(hc["Count"])
+    fig = _base(theme, RANKING_LAYOUT, height=max(400, len(hc) * 48), margin=dict(l=240), bargap=0.22,
+                xaxis=dict(title="Number of Listings", title_font=dict(size=14, family="Arial")),
+                yaxis=dict(title_font=dict(size=14, family="Arial")))
+    fig.add_trace(go.Bar(
+        x=hc["Count"], y=hc["Job Title"], orientation="h",
+        marker=dict(colors, line=dict(width=0)),
+        hovertemplate="<b>%{y}</b><br>Count: %{x}<extra></extra>",
+        text=hc["Count"].astype(int), textposition="inside",
+        textfont=dict(color="white", size=12, family="Arial"),
+    ))
+    fig.add_trace(go.Scatter(
+        x=hc["Count"], y=hc["Job Title"], mode="markers",
+        marker=dict(colors, size=28, line=dict(width=0)), hoverinfo="skip",
+    ))
+    return fig
+
+
+def ranking_figure(frame, theme, label):
+    """Horizontal bars of ``frame[label]``/``Count`` (largest first).
+
+    An ``Error`` column (upper error bounds of approximate counts) is drawn
+    as one-sided whiskers.
+    """
+    hc = frame[::-1].reset_index(drop=True)
+    fig = _base(theme, RANKING_LAYOUT, height=max(400, len(hc) * 36), margin=dict(l=200),
+                xaxis=dict(title="Number of Listings"))
+    error = None
+    if "Error" in hc and hc["Error"].any():
+        error = dict(type="data", symmetric=False, array=hc["Error"], arrayminus=np.zeros(len(hc)),
+                     color="rgba(118,75,162,0.8)", thickness=1.5)
+    fig.add_trace(go.Bar(
+        x=hc["Count"], y=hc[label].astype(str), orientation="h",
+        marker=dict(color=PRIMARY, line=dict(width=0)), error_x=error,
+        hovertemplate="<b>%{y}</b><br>Listings: %{x}<extra></extra>",
+        text=hc["Count"].astype(int), textposition="inside",
+        textfont=dict(color="white", size=12, family="Arial"),
+    ))
+    return fig
+
+
+def salary_figure(table, theme):
+    """Median salary per group with the P25-P75 range as whiskers (first column = group)."""
+    hc = table.head(20)[::-1].reset_index(drop=True)
+    fig = _base(theme, RANKING_LAYOUT, height=max(400, len(hc) * 36), margin=dict(l=200),
+                xaxis=dict(title="Salary (USD)"))
+    fig.add_trace(go.Bar(
+        x=hc["Median"], y=hc[hc.columns[0]].astype(str), orientation="h",
+        marker=dict(color=PRIMARY, line=dict(width=0)),
+        error_x=dict(type="data", symmetric=False,
+                     array=hc["P75"] - hc["Median"], arrayminus=hc["Median"] - hc["P25"],
+                     color="rgba(118,75,162,0.8)", thickness=1.5),
+        hovertemplate="<b>%{y}</b><br>Median: $%{x:,.0f}<extra></extra>",
+    ))
+    return fig
+
+
+def trend_figure(trend, smooth, theme, column, name, hovertemplate, rolling_name=None, bars=False,
+                 tickformat=None):
+    """``trend[column]`` per period (bars or markers) with ``smooth[column]`` as a rolling line."""
+    fig = _base(theme, SERIES_LAYOUT)
+    if bars:
+        fig.add_trace(go.Bar(x=trend.index, y=trend[column], name=name, hovertemplate=hovertemplate,
+                             marker=dict(color="rgba(102,126,234,0.55)", line=dict(width=0))))
+    else:
+        fig.add_trace(go.Scatter(x=trend.index, y=trend[column], name=name, mode="lines+markers",
+                                 line=dict(color="rgba(102,126,234,0.5)", width=1.5), hovertemplate=hovertemplate))
+    if rolling_name:
+        fig.add_trace(go.Scatter(x=smooth.index, y=smooth[column], name=rolling_name,
+                                 mode="lines", line=dict(color=ACCENT, width=2.5)))
+    if tickformat:
+        fig.update_yaxes(tickformat=tickformat)
+    return fig
+
+
+def durations_figure(durations, theme):
+    """Postings per number of days from posting to deadline."""
+    fig = _base(theme, SERIES_LAYOUT, xaxis=dict(title="Days"))
+    fig.add_trace(go.Bar(x=durations.index, y=durations.to_numpy(), marker=dict(color=PRIMARY, line=dict(width=0)),
+                         hovertemplate="%{x} days<br>Postings: %{y}<extra></extra>"))
+    return fig
+
+
+BUILDERS = {
+    "top_titles": top_titles_figure,
+    "ranking": ranking_figure,
+    "salary": salary_figure,
+    "trend": trend_figure,
+    "durations": durations_figure,
+}
+
+
+def figure(kind, *frames, theme="light", **options):
+    """Figure ``kind`` of ``frames``, built on the first request for this content and theme."""
+    key = hashlib.blake2b(
+        repr((kind, theme, sorted(options.items()), [frame_hash(f) for f in frames])).encode(), digest_size=16
+    ).hexdigest()
+    return FIGURE_CACHE.get_or_compute(key, lambda: BUILDERS[kind](*frames, theme=theme, **options))
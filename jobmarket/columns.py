@@ -0,0 +1,57 @@
+"""Detection of the dashboard's columns in a loaded dataset.
+
+Column names are flexible (see the README); every role lists the names it
+accepts in order of preference.
+"""
+import pandas as pd
+
+from .dataset import TEXT_DTYPE, compact_text
+
+COLUMN_CANDIDATES = {
+    "job": ["job_title", "title", "jobTitle", "Job Title"],
+    "country": ["country", "company_location", "location", "company_location_name"],
+    "exp": ["experience_level", "experience", "years_experience", "exp_level"],
+    "skills": ["required_skills", "skills", "requirements", "skillset"],
+    "company": ["company_name", "company", "employer"],
+    "industry": ["industry", "sector"],
+    "remote": ["remote_ratio", "remote", "remote_status", "work_setting", "onsite_remote_hybrid"],
+    "salary": ["salary_usd", "salary_in_usd", "salary"],
+    "posted": ["posting_date", "posted_date", "date_posted"],
+    "deadline": ["application_deadline", "deadline"],
+}
+
+# Roles used as filter dimensions, in filter-bar order
+FILTER_ROLES = ["job", "country", "exp", "remote"]
+
+# Text roles given a compact dtype by the dataset store
+TEXT_ROLES = ["job", "country", "exp", "remote", "skills", "company", "industry"]
+
+
+def first_existing_column(df, candidates):
+    for c in candidates:
+        if c in df.columns:
+            return c
+    return None
+
+
+def detect_columns(df):
+    """Map every role in :data:`COLUMN_CANDIDATES` to a column of ``df`` (or ``None``)."""
+    return {role: first_existing_column(df, candidates) for role, candidates in COLUMN_CANDIDATES.items()}
+
+
+def normalize_text_columns(df):
+    """Give the text role columns a compact dtype, in place.
+
+    Columns of other sources may arrive as Python objects; they become
+    categoricals or Arrow strings like the typed columns of
+    :func:`~jobmarket.dataset.read_dataset`, which are left alone.  Missing
+    values stay missing (they are never turned into ``"nan"``).
+    """
+    columns = detect_columns(df)
+    for c in [columns[role] for role in TEXT_ROLES]:
+        if c and c in df.columns and not isinstance(df[c].dtype, pd.CategoricalDtype):
+            values = df[c]
+            if not pd.api.types.is_string_dtype(values.dtype):
+                values = values.astype(TEXT_DTYPE)
+            df[c] = compact_text(values)
+    return df
@@ -0,0 +1,45 @@
+"""ISO 3166-1 alpha-2 country codes in the cleaned dataset's vocabulary.
+
+The cleaned postings name countries in full and in upper case
+(``UNITED STATES``, ``SOUTH KOREA``); sources that use two-letter codes are
+mapped onto those names so a country has one value across a union.
+"""
+
+COUNTRY_NAMES = {
+    "AD": "ANDORRA", "AE": "UNITED ARAB EMIRATES", "AF": "AFGHANISTAN", "AG": "ANTIGUA AND BARBUDA",
+    "AL": "ALBANIA", "AM": "ARMENIA", "AO": "ANGOLA", "AR": "ARGENTINA", "AT": "AUSTRIA", "AU": "AUSTRALIA",
+    "AZ": "AZERBAIJAN", "BA": "BOSNIA AND HERZEGOVINA", "BB": "BARBADOS", "BD": "BANGLADESH", "BE": "BELGIUM",
+    "BF": "BURKINA FASO", "BG": "BULGARIA", "BH": "BAHRAIN", "BI": "BURUNDI", "BJ": "BENIN", "BN": "BRUNEI",
+    "BO": "BOLIVIA", "BR": "BRAZIL", "BS": "BAHAMAS", "BT": "BHUTAN", "BW": "BOTSWANA", "BY": "BELARUS",
+    "BZ": "BELIZE", "CA": "CANADA", "CD": "DR CONGO", "CF": "CENTRAL AFRICAN REPUBLIC", "CG": "CONGO",
+    "CH": "SWITZERLAND", "CI": "IVORY COAST", "CL": "CHILE", "CM": "CAMEROON", "CN": "CHINA", "CO": "COLOMBIA",
+    "CR": "COSTA RICA", "CU": "CUBA", "CV": "CAPE VERDE", "CY": "CYPRUS", "CZ": "CZECHIA", "DE": "GERMANY",
+    "DJ": "DJIBOUTI", "DK": "DENMARK", "DM": "DOMINICA", "DO": "DOMINICAN REPUBLIC", "DZ": "ALGERIA",
+    "EC": "ECUADOR", "EE": "ESTONIA", "EG": "EGYPT", "ER": "ERITREA", "ES": "SPAIN", "ET": "ETHIOPIA",
+    "FI": "FINLAND", "FJ": "FIJI", "FM": "MICRONESIA", "FR": "FRANCE", "GA": "GABON", "GB": "UNITED KINGDOM",
+    "GD": "GRENADA", "GE": "GEORGIA", "GH": "GHANA", "GM": "GAMBIA", "GN": "GUINEA", "GQ": "EQUATORIAL GUINEA",
+    "GR": "GREECE", "GT": "GUATEMALA", "GW": "GUINEA-BISSAU", "GY": "GUYANA", "HK": "HONG KONG",
+    "HN": "HONDURAS", "HR": "CROATIA", "HT": "HAITI", "HU": "HUNGARY", "ID": "INDONESIA", "IE": "IRELAND",
+    "IL": "ISRAEL", "IN": "INDIA", "IQ": "IRAQ", "IR": "IRAN", "IS": "ICELAND", "IT": "ITALY", "JM": "JAMAICA",
+    "JO": "JORDAN", "JP": "JAPAN", "KE": "KENYA", "KG": "KYRGYZSTAN", "KH": "CAMBODIA", "KI": "KIRIBATI",
+    "KM": "COMOROS", "KN": "SAINT KITTS AND NEVIS", "KP": "NORTH KOREA", "KR": "SOUTH KOREA", "KW": "KUWAIT",
+    "KZ": "KAZAKHSTAN", "LA": "LAOS", "LB": "LEBANON", "LC": "SAINT LUCIA", "LI": "LIECHTENSTEIN",
+    "LK": "SRI LANKA", "LR": "LIBERIA", "LS": "LESOTHO", "LT": "LITHUANIA", "LU": "LUXEMBOURG", "LV": "LATVIA",
+    "LY": "LIBYA", "MA": "MOROCCO", "MC": "MONACO", "MD": "MOLDOVA", "ME": "MONTENEGRO", "MG": "MADAGASCAR",
+    "MH": "MARSHALL ISLANDS", "MK": "NORTH MACEDONIA", "ML": "MALI", "MM": "MYANMAR", "MN": "MONGOLIA",
+    "MR": "MAURITANIA", "MT": "MALTA", "MU": "MAURITIUS", "MV": "MALDIVES", "MW": "MALAWI", "MX": "MEXICO",
+    "MY": "MALAYSIA", "MZ": "MOZAMBIQUE", "NA": "NAMIBIA", "NE": "NIGER", "NG": "NIGERIA", "NI": "NICARAGUA",
+    "NL": "NETHERLANDS", "NO": "NORWAY", "NP": "NEPAL", "NR": "NAURU", "NZ": "NEW ZEALAND", "OM": "OMAN",
+    "PA": "PANAMA", "PE": "PERU", "PG": "PAPUA NEW GUINEA", "PH": "PHILIPPINES", "PK": "PAKISTAN",
+    "PL": "POLAND", "PS": "PALESTINE", "PT": "PORTUGAL", "PW": "PALAU", "PY": "PARAGUAY", "QA": "QATAR",
+    "RO": "ROMANIA", "RS": "SERBIA", "RU": "RUSSIA", "RW": "RWANDA", "SA": "SAUDI ARABIA",
+    "SB": "SOLOMON ISLANDS", "SC": "SEYCHELLES", "SD": "SUDAN", "SE": "SWEDEN", "SG": "SINGAPORE",
+    "SI": "SLOVENIA", "SK": "SLOVAKIA", "SL": "SIERRA LEONE", "SM": "SAN MARINO", "SN": "SENEGAL",
+    "SO": "SOMALIA", "SR": "SURINAME", "SS": "SOUTH SUDAN", "ST": "SAO TOME AND PRINCIPE", "SV": "EL SALVADOR",
+    "SY": "SYRIA", "SZ": "ESWATINI", "TD": "CHAD", "TG": "TOGO", "TH": "THAILAND", "TJ": "TAJIKISTAN",
+    "TL": "TIMOR-LESTE", "TM": "TURKMENISTAN", "TN": "TUNISIA", "TO": "TONGA", "TR": "TURKEY",
+    "TT": "TRINIDAD AND TOBAGO", "TV": "TUVALU", "TW": "TAIWAN", "TZ": "TANZANIA", "UA": "UKRAINE",
+    "UG": "UGANDA", "US": "UNITED STATES", "UY": "URUGUAY", "UZ": "UZBEKISTAN", "VA": "VATICAN CITY",
+    "VC": "SAINT VINCENT AND THE GRENADINES", "VE": "VENEZUELA", "VN": "VIETNAM", "VU": "VANUATU",
+    "WS": "SAMOA", "YE": "YEMEN", "ZA": "SOUTH AFRICA", "ZM": "ZAMBIA", "ZW": "ZIMBABWE",
+}
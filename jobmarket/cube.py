@@ -0,0 +1,211 @@
+"""Pre-aggregated KPI cube for the Overview metrics.
+
+On top of the row counts of :class:`~jobmarket.facets.CountCube`, every
+non-empty cube cell keeps a HyperLogLog sketch for a few high-cardinality
+columns (company names).  Any filter selection is a set of cells, so KPI tiles
+become a slice of the count array plus a register-wise max of the selected
+sketches.  Most cells of the cross product are empty, so sketches are stored
+for the cells listed in ``cell_ids`` only.
+
+The cube can be built offline and loaded by the app::
+
+    python -m jobmarket.cube data/AI_DATASET_CLEANED.csv
+
+It records the dataset version it was built from: :func:`load_kpi_cube`
+rebuilds (and re-saves) a stale cube, and callers holding a cube compare its
+version with :func:`~jobmarket.dataset.dataset_version` and fall back to
+exact computation when it is stale.
+"""
+import json
+import os
+import sys
+from functools import lru_cache
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from .dataset import DATA_PATH, dataset_version, read_dataset
+from .facets import CountCube, regrow_cells
+from .index import code_dtype
+
+HLL_PRECISION = 10
+_POWERS_OF_TWO = np.left_shift(np.uint64(1), np.arange(64, dtype=np.uint64))
+
+
+def hll_registers(values, cells, n_cells, precision=HLL_PRECISION):
+    """HyperLogLog registers of ``values`` per cell (``cells[i]`` in ``range(n_cells)``), shape ``(n_cells, 2**precision)``."""
+    values = pd.Series(values).astype("category")
+    hashes = pd.util.hash_array(np.asarray(values.cat.categories, dtype=object))
+    codes = values.cat.codes.to_numpy()
+    present = codes >= 0
+    h = hashes[codes[present]]
+    cells = cells[present]
+
+    tail_bits = 64 - precision
+    bucket = (h >> np.uint64(tail_bits)).astype(np.int64)
+    tail = h & np.uint64((1 << tail_bits) - 1)
+    # Rank = position of the leftmost 1-bit in the tail (tail_bits + 1 if all zero)
+    rank = (tail_bits + 1 - np.searchsorted(_POWERS_OF_TWO, tail, side="right")).astype(np.uint8)
+
+    registers = np.zeros((n_cells, 1 << precision), dtype=np.uint8)
+    np.maximum.at(registers, (cells, bucket), rank)
+    return registers
+
+
+def hll_estimate(registers):
+    """Cardinality estimate of a single merged register array."""
+    m = registers.shape[-1]
+    alpha = 0.7213 / (1 + 1.079 / m)
+    estimate = alpha * m * m / np.sum(np.exp2(-registers.astype(np.float64)))
+    zeros = int(np.count_nonzero(registers == 0))
+    if estimate <= 2.5 * m and zeros:
+        estimate = m * np.log(m / zeros)  # linear counting for small cardinalities
+    return int(round(estimate))
+
+
+class KpiCube(CountCube):
+    """Count cube with a HyperLogLog distinct-count sketch per cell."""
+
+    def __init__(self, df, columns, distinct_columns=(), version=None, precision=HLL_PRECISION):
+        self.distinct_columns = [c for c in distinct_columns if c and c in df.columns]
+        self.precision = precision
+        self.version = version
+        super().__init__(df, columns)
+
+    def _build(self, df, cells):
+        super()._build(df, cells)
+        # One register row per non-empty cell, in ``cell_ids`` order
+        cell_ids, rows = np.unique(cells, return_inverse=True)
+        self.cell_ids = cell_ids.astype(code_dtype(int(np.prod(self.shape))))
+        self.registers = {
+            col: hll_registers(df[col], rows, len(cell_ids), self.precision) for col in self.distinct_columns
+        }
+
+    def _merge(self, delta):
+        old_cells = regrow_cells(self.cell_ids.astype(np.int64), self.shape, delta.shape)
+        super()._merge(delta)
+        new_cells = delta.cell_ids.astype(np.int64)
+        cell_ids = np.union1d(old_cells, new_cells)
+        old_rows, new_rows = np.searchsorted(cell_ids, old_cells), np.searchsorted(cell_ids, new_cells)
+        registers = {}
+        for col, old in self.registers.items():
+            merged = np.zeros((len(cell_ids), old.shape[1]), dtype=old.dtype)
+            merged[old_rows] = old
+            merged[new_rows] = np.maximum(merged[new_rows], delta.registers[col])
+            registers[col] = merged
+        self.cell_ids = cell_ids.astype(code_dtype(int(np.prod(delta.shape))))
+        self.registers = registers
+
+    def is_fresh(self, version):
+        return self.version == version
+
+    def _axis_counts(self, selections, col):
+        """Row count per value of dimension ``col`` under ``selections``."""
+        axis = self.columns.index(col)
+        key = self._key(selections)
+        counts = np.array([self._facet(axis, key[:axis] + (None,) + key[axis + 1:])[v] for v in self.labels[axis]])
+        if key[axis] is not None:
+            own = np.zeros(len(counts), dtype=bool)
+            own[list(key[axis])] = True
+            counts = np.where(own, counts, 0)
+        return counts
+
+    def distinct_labels(self, selections, col):
+        """Exact number of distinct values of a cube dimension under ``selections``."""
+        return int(np.count_nonzero(self._axis_counts(selections, col)))
+
+    def distinct(self, selections, col):
+        """Approximate number of distinct ``col`` values under ``selections``."""
+        selected = self._cell_mask(self._key(selections))[self.cell_ids]
+        merged = self.registers[col][selected].max(axis=0, initial=0)
+        return hll_estimate(merged)
+
+    def top(self, selections, col, n=1):
+        """``[(value, count), ...]`` of the most frequent values of a cube dimension."""
+        axis = self.columns.index(col)
+        counts = self._axis_counts(selections, col)
+        order = np.argsort(-counts, kind="stable")[:n]
+        return [(self.labels[axis][i], int(counts[i])) for i in order if counts[i] > 0]
+
+    def save(self, path):
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        meta = {
+            "columns": self.columns,
+            "distinct_columns": self.distinct_columns,
+            "precision": self.precision,
+            "version": self.version,
+        }
+        arrays = {f"registers_{i}": self.registers[c] for i, c in enumerate(self.distinct_columns)}
+        # Labels keep their dtype (numbers stay numbers); only mixed-type labels are stored as text
+        for i, labels in enumerate(self.labels):
+            values = np.asarray(labels)
+            arrays[f"labels_{i}"] = values.astype(str) if values.dtype == object else values
+        tmp_path = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+        with open(tmp_path, "wb") as f:
+            np.savez(f, meta=np.array(json.dumps(meta)), counts=self.counts, cell_ids=self.cell_ids, **arrays)
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, path):
+        with np.load(path) as data:
+            meta = json.loads(str(data["meta"]))
+            cube = cls.__new__(cls)
+            cube.columns = meta["columns"]
+            cube.labels = [data[f"labels_{i}"].tolist() for i in range(len(cube.columns))]
+            cube.distinct_columns = meta["distinct_columns"]
+            cube.precision = meta["precision"]
+            cube.version = meta["version"]
+            cube.counts = data["counts"]
+            cube.cell_ids = data["cell_ids"]
+            cube.registers = {c: data[f"registers_{i}"] for i, c in enumerate(cube.distinct_columns)}
+        cube.positions = [{v: i for i, v in enumerate(labels)} for labels in cube.labels]
+        cube.shape = cube.counts.shape
+        cube._facet = lru_cache(maxsize=4096)(cube._compute_facet)
+        return cube
+
+
+KPI_DIMENSIONS = ["job_title", "company_location", "experience_level", "remote_ratio"]
+KPI_DISTINCT = ["company_name"]
+
+
+def cube_path_for(path):
+    path = Path(path)
+    cache_dir = path.parent if path.parent.name == ".cache" else path.parent / ".cache"
+    return cache_dir / f"{path.stem}-kpi-cube.npz"
+
+
+def build_kpi_cube(path=DATA_PATH, columns=KPI_DIMENSIONS, distinct_columns=KPI_DISTINCT, df=None):
+    """Build the KPI cube for ``path`` and store it next to the columnar cache."""
+    df = read_dataset(path) if df is None else df
+    cube = KpiCube(df, columns, distinct_columns, version=dataset_version(path))
+    cube.save(cube_path_for(path))
+    return cube
+
+
+def load_kpi_cube(path=DATA_PATH, df=None, version=None):
+    """KPI cube of ``path``: the saved one when it matches ``version``, else rebuilt and re-saved."""
+    path = Path(path)
+    version = dataset_version(path) if version is None else version
+    cube_path = cube_path_for(path)
+    if cube_path.exists():
+        try:
+            cube = KpiCube.load(cube_path)
+        except (OSError, ValueError, KeyError):
+            cube = None  # unreadable or older layout, rebuilt below
+        if cube is not None and cube.is_fresh(version):
+            return cube
+    df = read_dataset(path) if df is None else df
+    cube = KpiCube(df, KPI_DIMENSIONS, KPI_DISTINCT, version=version)
+    try:
+        cube.save(cube_path)
+    except OSError:
+        pass  # read-only checkout: serve the cube without saving it
+    return cube
+
+
+if __name__ == "__main__":
+    source = Path(sys.argv[1]) if len(sys.argv) > 1 else DATA_PATH
+    built = build_kpi_cube(source)
+    print(f"Wrote {cube_path_for(source)} ({built.counts.sum():,} rows, version {built.version})")
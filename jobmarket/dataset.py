@@ -0,0 +1,141 @@
+"""Typed loading of the cleaned job-postings dataset.
+
+The CSV is parsed once and written next to it as an uncompressed Arrow IPC
+file.  Later loads memory-map that file instead of re-parsing the CSV.  The
+cache file name embeds the source size and mtime, so editing the CSV simply
+produces a new cache entry.  An ``.arrow`` path (e.g. a union written by
+:mod:`jobmarket.sources`) is memory-mapped directly.
+
+The typed frame is kept compact: repeated text is dictionary-encoded
+(categoricals with int8/int16 codes), numbers use the smallest dtype that
+holds them and the remaining free text is stored as Arrow strings, never as
+Python ``str`` objects.  :func:`memory_report` shows where the bytes go.
+"""
+import os
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+DATA_PATH = Path("data/AI_DATASET_CLEANED.csv")
+
+# Bump when the typed schema below changes so old cache files are ignored.
+SCHEMA_VERSION = 2
+
+CATEGORY_COLUMNS = [
+    "job_title", "company_location", "experience_level",
+    "remote_ratio", "company_size", "industry",
+    "employment_type", "education_required", "company_name",
+]
+# Integer columns and their preferred dtype (see int_dtype)
+INT_COLUMNS = {"salary_usd": "int32", "years_experience": "int8"}
+FLOAT32_COLUMNS = ["benefits_score"]
+DATE_COLUMNS = ["posting_date", "application_deadline"]
+DATE_FORMAT = "%d-%m-%Y"
+
+# Other text columns are dictionary-encoded when each value repeats at least
+# twice on average; more distinct text is kept as Arrow strings.
+CATEGORY_MAX_RATIO = 0.5
+TEXT_DTYPE = "string[pyarrow]"
+
+
+def _is_text(dtype):
+    return pd.api.types.is_string_dtype(dtype) and not isinstance(dtype, pd.CategoricalDtype)
+
+
+def int_dtype(dtype, low, high, missing=False):
+    """``dtype`` if it holds ``[low, high]`` (else int32), nullable when values are missing."""
+    if np.isfinite(low) and np.isfinite(high):
+        info = np.iinfo(dtype)
+        if low < info.min or high > info.max:
+            dtype = "int32"
+    return dtype.capitalize() if missing else dtype
+
+
+def compact_text(values):
+    """``values`` as a categorical if its values repeat, else as Arrow strings; missing stays missing."""
+    if values.nunique(dropna=True) <= CATEGORY_MAX_RATIO * len(values):
+        return values.astype("category")
+    if isinstance(values.dtype, pd.StringDtype) and values.dtype.storage == "pyarrow":
+        return values
+    try:
+        return values.astype(TEXT_DTYPE)
+    except ImportError:
+        return values
+
+
+def apply_schema(df):
+    """Cast the known columns of a freshly parsed frame to their typed form."""
+    for c in CATEGORY_COLUMNS:
+        if c in df.columns:
+            df[c] = df[c].astype("category")
+    for c, dtype in INT_COLUMNS.items():
+        if c in df.columns:
+            values = pd.to_numeric(df[c], errors="coerce").round()
+            df[c] = values.astype(int_dtype(dtype, values.min(), values.max(), values.isna().any()))
+    for c in FLOAT32_COLUMNS:
+        if c in df.columns:
+            df[c] = pd.to_numeric(df[c], errors="coerce").astype("float32")
+    for c in DATE_COLUMNS:
+        if c in df.columns:
+            df[c] = pd.to_datetime(df[c], format=DATE_FORMAT, errors="coerce")
+    for c in df.columns:
+        if _is_text(df[c].dtype):
+            df[c] = compact_text(df[c])
+    return df
+
+
+def memory_report(df):
+    """Bytes per column of ``df`` (largest first) with its dtype and bytes per row."""
+    sizes = df.memory_usage(index=False, deep=True)
+    report = pd.DataFrame({
+        "Column": sizes.index,
+        "Dtype": [str(df[c].dtype) for c in sizes.index],
+        "MB": sizes.to_numpy() / 2**20,
+        "Bytes/Row": sizes.to_numpy() / max(len(df), 1),
+    })
+    return report.sort_values("MB", ascending=False, kind="stable").reset_index(drop=True)
+
+
+def dataset_version(path):
+    """Token that changes whenever ``path`` or the typed schema changes."""
+    stat = Path(path).stat()
+    return f"v{SCHEMA_VERSION}-{stat.st_size}-{stat.st_mtime_ns}"
+
+
+def cache_path_for(path, cache_dir=None):
+    """Return the columnar cache file that belongs to the current state of ``path``."""
+    path = Path(path)
+    cache_dir = Path(cache_dir) if cache_dir else path.parent / ".cache"
+    return cache_dir / f"{path.stem}-{dataset_version(path)}.arrow"
+
+
+def read_dataset(path=DATA_PATH, cache_dir=None):
+    """Load ``path`` as a typed frame, using (and refreshing) the Arrow cache."""
+    path = Path(path)
+    try:
+        from pyarrow import feather
+    except ImportError:
+        return apply_schema(pd.read_csv(path, low_memory=False))
+
+    if path.suffix == ".arrow":
+        return apply_schema(feather.read_table(path, memory_map=True).to_pandas())
+
+    cache_path = cache_path_for(path, cache_dir)
+    if cache_path.exists():
+        try:
+            return feather.read_table(cache_path, memory_map=True).to_pandas()
+        except OSError:
+            pass  # truncated or unreadable cache, rebuild below
+
+    df = apply_schema(pd.read_csv(path, low_memory=False))
+    try:
+        cache_path.parent.mkdir(parents=True, exist_ok=True)
+        for stale in cache_path.parent.glob(f"{path.stem}-v*.arrow"):
+            stale.unlink(missing_ok=True)
+        tmp_path = cache_path.with_suffix(f".{os.getpid()}.tmp")
+        feather.write_feather(df, tmp_path, compression="uncompressed")
+        os.replace(tmp_path, cache_path)
+    except OSError:
+        pass  # read-only checkout: serve the parsed frame without caching
+    return df
@@ -0,0 +1,411 @@
+"""Headless query engine behind the dashboard and the JSON API.
+
+:class:`Engine` wraps one loaded dataset and the indexes and cubes derived
+from it, and answers the questions the pages ask: which rows match a filter
+state, how many, the overview KPIs, top-N values and salary percentiles.
+Nothing here imports Streamlit, so services can use the engine directly (or
+through :mod:`jobmarket.api`) instead of scraping the dashboard.
+
+Filters are a ``{role: values}`` dict using the roles of
+:mod:`jobmarket.columns` (``job``, ``country``, ``exp``, ``remote``) plus
+``skills`` (rows must require all of them) and ``query`` (substring of the
+job title or company name).  Results are cached per normalized filter state
+and dataset version in a :class:`~jobmarket.cache.ResultCache`.
+"""
+from functools import partial
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from .cache import ResultCache, state_key
+from .catalog import build_catalog
+from .columns import FILTER_ROLES, detect_columns, normalize_text_columns
+from .cube import KPI_DIMENSIONS, KPI_DISTINCT, KpiCube, load_kpi_cube
+from .dataset import DATA_PATH, dataset_version, read_dataset
+from .facets import CountCube
+from .heavy import HeavyHitterCube
+from .index import FilterIndex
+from .metrics import span
+from .salary import SalaryCube, grouped_quantiles, quantile_table
+from .salary_model import SalaryModel, load_salary_model, model_features, model_path_for
+from .search import SortIndex, TextIndex
+from .similar import SimilarityIndex, load_similar_index, similar_path_for
+from .skills import SkillIndex
+from .trends import TrendCube
+
+# Selections matching at least this many rows read salary percentiles from the
+# per-cell histograms instead of sorting the matching rows
+SALARY_SKETCH_MIN_ROWS = 10_000
+
+# Roles ranked by Engine.heavy_hitters, and when their per-cell summaries are
+# trusted: broad selections whose reported counts are within this fraction of
+# the truth and provably include the true top values
+HEAVY_HITTER_ROLES = ("company", "industry")
+HEAVY_HITTER_MIN_ROWS = 10_000
+HEAVY_HITTER_MAX_ERROR = 0.1
+
+# Builders for the objects derived from the frame: ``builder(frame, *args)``
+BUILDERS = {
+    "catalog": build_catalog,
+    "count_cube": CountCube,
+    "filter_index": FilterIndex,
+    "heavy_hitter_cube": HeavyHitterCube,
+    "kpi_cube": lambda frame: KpiCube(frame, KPI_DIMENSIONS, KPI_DISTINCT),
+    "salary_cube": SalaryCube,
+    "salary_model": SalaryModel,
+    "similar_index": SimilarityIndex,
+    "skill_index": lambda frame, column: SkillIndex(frame[column]),
+    "sort_index": SortIndex,
+    "text_index": TextIndex,
+    "trend_cube": TrendCube,
+}
+
+# Derived objects saved next to the dataset: ``loader(frame, *args, path=dataset
+# path)`` reuses the saved copy, extends it with appended rows or rebuilds it
+PERSISTED = {
+    "salary_model": lambda frame, target, features, skills, path: load_salary_model(
+        frame, target, features, skills, model_path_for(path)
+    ),
+    "similar_index": lambda frame, skills, title, path: load_similar_index(
+        frame, skills, title, similar_path_for(path)
+    ),
+}
+
+# How to feed appended rows to an ``append`` method that takes more than the delta frame
+UPDATERS = {
+    "skill_index": lambda index, delta, column: index.append(delta[column]),
+}
+
+
+def persisted_builders(path):
+    """:data:`BUILDERS` with the :data:`PERSISTED` objects of ``path`` (a dataset file or partition root)."""
+    return dict(BUILDERS, **{name: partial(load, path=Path(path)) for name, load in PERSISTED.items()})
+
+
+def normalize_query(query):
+    return " ".join(str(query or "").split()).lower()
+
+
+class Engine:
+    """Filtering and aggregation over one version of a dataset.
+
+    ``derived(name, *args)`` supplies the shared indexes (see
+    :data:`BUILDERS`); by default they are built on first use and kept on the
+    engine; with a dataset ``path`` the :data:`PERSISTED` ones are loaded
+    from (and saved next to) it.  ``kpi_cube`` may be a pre-built (e.g.
+    persisted) KPI cube.
+    """
+
+    def __init__(self, df, version=None, derived=None, kpi_cube=None, cache=None, path=None):
+        self.df = df
+        self.version = version
+        self.columns = detect_columns(df)
+        self.dims = tuple(self.columns[role] for role in FILTER_ROLES)
+        self.cache = cache if cache is not None else ResultCache()
+        self._derived = derived
+        self._builders = persisted_builders(path) if path is not None else BUILDERS
+        self._built = {}
+        self._kpi_cube = kpi_cube
+        self._model_features = None
+
+    @classmethod
+    def from_path(cls, path=DATA_PATH, cache=None):
+        """Engine over ``path`` outside Streamlit, with the saved KPI cube (rebuilt and re-saved when stale)."""
+        path = Path(path)
+        version = dataset_version(path)
+        df = normalize_text_columns(read_dataset(path))
+        return cls(df, version, kpi_cube=load_kpi_cube(path, df, version), cache=cache, path=path)
+
+    # ----- derived objects -----
+
+    def derived(self, name, *args):
+        if self._derived is not None:
+            return self._derived(name, *args)
+        key = (name, args)
+        if key not in self._built:
+            with span(f"build.{name}"):
+                self._built[key] = self._builders[name](self.df, *args)
+        return self._built[key]
+
+    def warm(self):
+        """Build every derived object now; returns ``{(name, args): object}`` of those kept on the engine."""
+        for name in BUILDERS:
+            getattr(self, name)
+        built = dict(self._built)
+        built[("kpi_cube", ())] = self.kpi_cube
+        return built
+
+    def column(self, role):
+        return self.columns.get(role)
+
+    @property
+    def filter_index(self):
+        return self.derived("filter_index", self.dims)
+
+    @property
+    def catalog(self):
+        return self.derived("catalog", self.dims)
+
+    @property
+    def count_cube(self):
+        return self.derived("count_cube", self.dims)
+
+    @property
+    def kpi_cube(self):
+        if self._kpi_cube is None:
+            self._kpi_cube = self.derived("kpi_cube")
+        return self._kpi_cube
+
+    @property
+    def skill_index(self):
+        col = self.column("skills")
+        return self.derived("skill_index", col) if col else None
+
+    @property
+    def heavy_hitter_cube(self):
+        values = tuple(self.column(role) for role in HEAVY_HITTER_ROLES if self.column(role))
+        return self.derived("heavy_hitter_cube", self.dims, values) if values else None
+
+    @property
+    def similar_index(self):
+        skills_col, job_col = self.column("skills"), self.column("job")
+        return self.derived("similar_index", skills_col, job_col) if skills_col and job_col else None
+
+    @property
+    def sort_index(self):
+        return self.derived("sort_index")
+
+    @property
+    def text_index(self):
+        return self.derived("text_index", (self.column("job"), self.column("company")))
+
+    @property
+    def salary_cube(self):
+        col = self.column("salary")
+        return self.derived("salary_cube", self.dims, col) if col else None
+
+    @property
+    def salary_model(self):
+        col = self.column("salary")
+        if not col:
+            return None
+        if self._model_features is None:
+            self._model_features = model_features(self.df)
+        return self.derived("salary_model", col, self._model_features, self.column("skills"))
+
+    @property
+    def trend_cube(self):
+        posted = self.column("posted")
+        if not posted:
+            return None
+        return self.derived(
+            "trend_cube", self.dims, posted, self.column("salary"), self.column("deadline"), self.column("remote")
+        )
+
+    # ----- filter state -----
+
+    def selections(self, filters):
+        """``{column: values}`` of the dimension filters in ``filters``."""
+        return {self.columns[role]: list(filters.get(role) or []) for role in FILTER_ROLES if self.columns[role]}
+
+    def cached(self, kind, filters, compute):
+        """Result of ``compute()`` shared across callers for this filter state (timed as ``kind``)."""
+        with span(kind):
+            return self.cache.get_or_compute(state_key(self.version, kind, filters), compute)
+
+    def select(self, filters):
+        """Row positions matching ``filters``, or ``None`` when nothing is filtered."""
+        filters = dict(filters, query=normalize_query(filters.get("query")))
+        return self.cached("rows", filters, lambda: self._select(filters))
+
+    def _select(self, filters):
+        skill_index = self.skill_index
+        extra = skill_index.mask(filters.get("skills")) if skill_index else None
+        query_bits = self.text_index.mask(filters.get("query"))
+        if query_bits is not None:
+            extra = query_bits if extra is None else np.bitwise_and(extra, query_bits)
+        return self.filter_index.select(list(self.selections(filters).items()), extra=extra)
+
+    def subset(self, filters):
+        """Matching rows as a frame (the full frame when nothing is filtered); read-only."""
+        rows = self.select(filters)
+        if rows is None:
+            return self.df
+        with span("subset"):
+            return self.df.iloc[rows]
+
+    def count(self, filters):
+        rows = self.select(filters)
+        return len(self.df) if rows is None else len(rows)
+
+    # ----- aggregates -----
+
+    def overview(self, filters):
+        """KPI tiles and quick insights for the Overview page."""
+        return self.cached("overview", filters, lambda: self._overview(filters))
+
+    def _overview(self, filters):
+        job_col, country_col, company_col = self.column("job"), self.column("country"), self.column("company")
+        kpi_cube = self.kpi_cube
+        if not filters.get("skills") and not filters.get("query") and kpi_cube.is_fresh(self.version) \
+                and kpi_cube.columns == list(self.dims) \
+                and (not company_col or company_col in kpi_cube.distinct_columns):
+            selections = self.selections(filters)
+            top_job = kpi_cube.top(selections, job_col)
+            top_country = kpi_cube.top(selections, country_col)
+            return {
+                "rows": kpi_cube.total(selections),
+                "titles": kpi_cube.distinct_labels(selections, job_col),
+                "companies": kpi_cube.distinct(selections, company_col) if company_col else 0,
+                "locations": kpi_cube.distinct_labels(selections, country_col),
+                "top_job": top_job[0] if top_job else None,
+                "top_country": top_country[0] if top_country else None,
+                "from_cube": True,
+            }
+
+        # Stale cube or a skills filter: compute exactly from the filtered rows
+        filtered = self.subset(filters)
+        top_job = filtered[job_col].value_counts().head(1) if job_col and not filtered.empty else None
+        top_country = filtered[country_col].value_counts().head(1) if country_col and not filtered.empty else None
+        return {
+            "rows": len(filtered),
+            "titles": int(filtered[job_col].nunique()) if job_col and not filtered.empty else 0,
+            "companies": int(filtered[company_col].nunique()) if company_col and not filtered.empty else 0,
+            "locations": int(filtered[country_col].nunique()) if country_col and not filtered.empty else 0,
+            "top_job": (top_job.index[0], int(top_job.values[0])) if top_job is not None else None,
+            "top_country": (top_country.index[0], int(top_country.values[0])) if top_country is not None else None,
+            "from_cube": False,
+        }
+
+    def top(self, filters, role="job", n=20):
+        """Most frequent values of ``role`` (or required skills) as a ``Value``/``Count`` frame."""
+        return self.cached("top", dict(filters, top_role=role, top_n=n), lambda: self._top(filters, role, n))
+
+    def _top(self, filters, role, n):
+        if role == "skills":
+            if not self.skill_index:
+                raise KeyError(role)
+            return self.skill_index.top(self.select(filters), n=n).rename(columns={"Skill": "Value"})
+        col = self.column(role)
+        if not col:
+            raise KeyError(role)
+        # Counted on the category codes; only the n labels shown become strings
+        counts = self.subset(filters)[col].value_counts()
+        counts = counts[counts > 0].head(n)
+        return pd.DataFrame({"Value": counts.index.astype(str), "Count": counts.to_numpy()})
+
+    def heavy_hitters(self, filters, role="company", n=20):
+        """``(table, approximate, unlisted)``: most frequent companies (or industries).
+
+        ``table`` has ``Value``, ``Count`` and ``Error`` columns; the true
+        count of a value lies in ``[Count, Count + Error]`` and values not in
+        the table have at most ``unlisted`` rows.  Broad selections are
+        answered from the per-cell summaries of :data:`heavy_hitter_cube`
+        when those bounds are tight enough; otherwise (and with skills or
+        text filters) the matching rows are counted exactly.
+        """
+        return self.cached(
+            "heavy_hitters", dict(filters, top_role=role, top_n=n), lambda: self._heavy_hitters(filters, role, n)
+        )
+
+    def _heavy_hitters(self, filters, role, n):
+        col = self.column(role)
+        if role not in HEAVY_HITTER_ROLES or not col:
+            raise KeyError(role)
+        cube = self.heavy_hitter_cube
+        if not filters.get("skills") and not filters.get("query") and self.count(filters) >= HEAVY_HITTER_MIN_ROWS:
+            table, unlisted = cube.top(self.selections(filters), col, n)
+            counts = table["Count"].to_numpy()
+            if len(table) and unlisted <= counts.min() \
+                    and (table["Error"].to_numpy() <= HEAVY_HITTER_MAX_ERROR * counts).all():
+                return table, bool(table["Error"].any()), unlisted
+        # Exact: count the matching rows on the category codes
+        counts = self.subset(filters)[col].value_counts()
+        counts = counts[counts > 0]
+        table = pd.DataFrame({
+            "Value": counts.index[:n].astype(str), "Count": counts.to_numpy()[:n], "Error": 0,
+        })
+        return table, False, int(counts.iloc[n]) if len(counts) > n else 0
+
+    def salary(self, filters, group_role="job"):
+        """``(table, overall, approximate)``: salary percentiles per group and overall.
+
+        Broad selections are answered from the per-cell salary histograms;
+        narrow ones (and skills or text filters, which the cube cannot
+        express) sort the rows.
+        """
+        return self.cached("salary", dict(filters, group=group_role), lambda: self._salary(filters, group_role))
+
+    def _salary(self, filters, group_role):
+        salary_col, group_col = self.column("salary"), self.column(group_role)
+        if not salary_col or group_col not in self.dims:
+            raise KeyError(group_role)
+        filter_index = self.filter_index
+        rows = self.select(filters)
+        n_rows = len(self.df) if rows is None else len(rows)
+        labels = list(filter_index.bitmaps[group_col])
+        if not filters.get("skills") and not filters.get("query") and n_rows >= SALARY_SKETCH_MIN_ROWS:
+            selections = self.selections(filters)
+            counts, quantiles = self.salary_cube.quantiles(selections, group_col)
+            _, overall = self.salary_cube.quantiles(selections)
+            approximate = True
+        else:
+            salaries = self.df[salary_col].to_numpy(dtype=np.float64)
+            codes = filter_index.codes[group_col]
+            if rows is not None:
+                salaries, codes = salaries[rows], codes[rows]
+            counts, quantiles = grouped_quantiles(codes, salaries, len(labels))
+            _, overall = grouped_quantiles(np.zeros(len(salaries), dtype=np.int64), salaries, 1)
+            approximate = False
+        return quantile_table(labels, counts, quantiles, "Group"), overall[0], approximate
+
+    def salary_estimates(self, rows):
+        """Model salary estimates (USD) of row positions ``rows``, precomputed for every row."""
+        model = self.salary_model
+        return model.row_estimates(rows) if model is not None else np.full(len(rows), np.nan)
+
+    def estimate_salary(self, values, skills=()):
+        """Model salary estimate of a hypothetical posting (``{column: value}`` plus skills)."""
+        with span("salary.estimate"):
+            return self.salary_model.estimate(values, skills)
+
+    def trend_source(self, filters):
+        """Trend cube to slice for ``filters`` and the selections to slice it with.
+
+        The shared cube has no skills dimension, so with a skills (or text)
+        filter a small cube is built over the matching rows, keeping only the
+        remote dimension (remote share is computed under the *other* filters).
+        """
+        remote_col = self.column("remote")
+        if not filters.get("skills") and not filters.get("query"):
+            return self.trend_cube, self.selections(filters)
+        others = dict(filters, remote=[])
+
+        def skills_cube():
+            subset = self.subset(others)
+            return TrendCube(subset, [remote_col], self.column("posted"), self.column("salary"),
+                             self.column("deadline"), remote_col)
+
+        return self.cached("trend_cube", others, skills_cube), {remote_col: list(filters.get("remote") or [])}
+
+    # ----- rows -----
+
+    def similar(self, row, k=10):
+        """``(rows, similarity)``: the ``k`` postings most similar to row position ``row``.
+
+        Similarity is the estimated Jaccard similarity of the skills and
+        title words (see :mod:`jobmarket.similar`), highest first.
+        """
+        index = self.similar_index
+        if index is None:
+            return np.zeros(0, dtype=np.int64), np.zeros(0)
+        return self.cached("similar", {"row": int(row), "k": k}, lambda: index.similar(int(row), k))
+
+    def page(self, filters, sort=None, ascending=True, offset=0, limit=None):
+        """Row positions of ``filters`` ordered by column ``sort`` (original order if ``None``)."""
+        rows = self.select(filters)
+        if sort is not None:
+            return self.sort_index.page(rows, sort, ascending, offset, limit)
+        rows = np.arange(len(self.df)) if rows is None else rows
+        return rows[offset:None if limit is None else offset + limit]
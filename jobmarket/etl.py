@@ -0,0 +1,197 @@
+"""Scripted replacement for the cleaning steps in ``Eda.ipynb``.
+
+Turns the raw export (``AI_DATASET.csv``) into the cleaned dataset the app
+reads, in bounded memory::
+
+    python -m jobmarket.etl data/AI_DATASET.csv --out data/AI_DATASET_CLEANED.csv
+
+The raw file is streamed twice in chunks.  The first pass collects the
+distinct values of the categorical columns and an exact integer histogram of
+``salary_usd``, so the IQR bounds can be computed without holding the column.
+The second pass cleans each chunk with vectorized operations and appends it
+to the cleaned CSV and to the typed Arrow IPC artifact that
+:func:`~jobmarket.dataset.read_dataset` memory-maps.  Finally the KPI cube is
+rebuilt for the new dataset version, and the salary model and similarity
+index saved for the old data are removed (they are rebuilt on first use).
+"""
+import argparse
+import os
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from .cube import build_kpi_cube, cube_path_for
+from .dataset import (
+    CATEGORY_COLUMNS, DATA_PATH, DATE_COLUMNS, DATE_FORMAT, FLOAT32_COLUMNS, INT_COLUMNS, cache_path_for, int_dtype,
+)
+from .salary_model import model_path_for
+from .similar import similar_path_for
+
+CHUNK_SIZE = 100_000
+
+CODE_LABELS = {
+    "experience_level": {"EN": "Entry-Level", "MI": "Mid-Level", "SE": "Senior-Level", "EX": "Executive-Level"},
+    "employment_type": {"FT": "Full-Time", "PT": "Part-Time", "CT": "Contract", "FL": "Freelance"},
+    "company_size": {"S": "Small", "M": "Medium", "L": "Large"},
+}
+REMOTE_LABELS = {0: "on-site", 50: "Hybrid", 100: "Fully remote"}
+DROP_COLUMNS = ["job_description_length"]
+
+
+def clean_chunk(chunk):
+    """Apply the notebook's cleaning steps to one raw chunk, without per-row Python."""
+    chunk = chunk.drop(columns=[c for c in DROP_COLUMNS if c in chunk.columns])
+
+    for col in ["job_title", "company_location", "required_skills", "company_name", "industry"]:
+        if col in chunk.columns:
+            chunk[col] = chunk[col].astype("string").str.strip().replace("", pd.NA)
+    if "job_title" in chunk.columns:
+        chunk["job_title"] = chunk["job_title"].str.title()
+    if "company_location" in chunk.columns:
+        chunk["company_location"] = chunk["company_location"].str.upper()
+    if "required_skills" in chunk.columns:
+        chunk["required_skills"] = chunk["required_skills"].str.lower()
+
+    for col, labels in CODE_LABELS.items():
+        if col in chunk.columns:
+            chunk[col] = chunk[col].astype("string").str.strip().replace(labels)
+    if "remote_ratio" in chunk.columns:
+        numeric = pd.to_numeric(chunk["remote_ratio"], errors="coerce")
+        chunk["remote_ratio"] = numeric.map(REMOTE_LABELS).fillna(chunk["remote_ratio"]).astype("string")
+
+    for col in DATE_COLUMNS:
+        if col in chunk.columns:
+            chunk[col] = pd.to_datetime(chunk[col], format=DATE_FORMAT, errors="coerce")
+    if "salary_usd" in chunk.columns:
+        chunk["salary_usd"] = pd.to_numeric(chunk["salary_usd"], errors="coerce")
+    return chunk
+
+
+def _add_histogram(hist, values):
+    counts = np.bincount(values)
+    if len(counts) > len(hist):
+        counts[:len(hist)] += hist
+        return counts
+    hist[:len(counts)] += counts
+    return hist
+
+
+def histogram_quantile(hist, q):
+    """Linearly interpolated quantile of integer values given their histogram."""
+    cum = np.cumsum(hist)
+    pos = q * (cum[-1] - 1)
+    lo, hi = int(np.floor(pos)), int(np.ceil(pos))
+    v_lo = np.searchsorted(cum, lo + 1)
+    v_hi = np.searchsorted(cum, hi + 1)
+    return v_lo + (v_hi - v_lo) * (pos - lo)
+
+
+def profile(raw_path, chunksize=CHUNK_SIZE):
+    """First pass: distinct categorical values, integer ranges and missing counts, salary histogram.
+
+    A column without any value (empty or all missing) has no range.
+    """
+    categories = {}
+    missing = {}
+    ranges = {}
+    hist = np.zeros(1, dtype=np.int64)
+    for chunk in pd.read_csv(raw_path, chunksize=chunksize, low_memory=False):
+        chunk = clean_chunk(chunk)
+        for col in CATEGORY_COLUMNS:
+            if col in chunk.columns:
+                categories.setdefault(col, set()).update(chunk[col].dropna().unique())
+        for col in INT_COLUMNS:
+            if col in chunk.columns:
+                values = pd.to_numeric(chunk[col], errors="coerce").round()
+                missing[col] = missing.get(col, 0) + int(values.isna().sum())
+                if values.notna().any():
+                    low, high = ranges.get(col, (np.inf, -np.inf))
+                    ranges[col] = (min(low, float(values.min())), max(high, float(values.max())))
+        if "salary_usd" in chunk.columns:
+            salary = chunk["salary_usd"].dropna().clip(lower=0).round().astype(np.int64).to_numpy()
+            hist = _add_histogram(hist, salary)
+    return {col: sorted(values) for col, values in categories.items()}, missing, ranges, hist
+
+
+def run(raw_path, out_path=DATA_PATH, chunksize=CHUNK_SIZE):
+    """Clean ``raw_path`` into ``out_path`` plus its Arrow artifact and KPI cube."""
+    import pyarrow as pa
+
+    raw_path, out_path = Path(raw_path), Path(out_path)
+    categories, missing, ranges, hist = profile(raw_path, chunksize)
+    bounds = None
+    if hist.sum():
+        q1, q3 = histogram_quantile(hist, 0.25), histogram_quantile(hist, 0.75)
+        bounds = (q1 - 1.5 * (q3 - q1), q3 + 1.5 * (q3 - q1))
+
+    out_path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_csv = out_path.with_suffix(f".{os.getpid()}.tmp")
+    tmp_arrow = out_path.with_suffix(f".{os.getpid()}.arrow.tmp")
+    writer = None
+    rows = 0
+    try:
+        for i, chunk in enumerate(pd.read_csv(raw_path, chunksize=chunksize, low_memory=False)):
+            chunk = clean_chunk(chunk)
+            if bounds and "salary_usd" in chunk.columns:
+                # Cap IQR outliers (the notebook dropped them; the shipped CSV keeps every row)
+                chunk["salary_usd"] = chunk["salary_usd"].clip(*bounds)
+            chunk.to_csv(tmp_csv, mode="w" if i == 0 else "a", header=(i == 0), index=False, date_format=DATE_FORMAT)
+
+            typed = chunk.copy()
+            for col, values in categories.items():
+                typed[col] = pd.Categorical(typed[col], categories=values)
+            # Same dtypes as dataset.apply_schema, decided for the whole file up front
+            for col, dtype in INT_COLUMNS.items():
+                if col in typed.columns:
+                    # No range (no values at all) keeps the declared dtype
+                    dtype = int_dtype(dtype, *ranges.get(col, (0, 0)), missing=bool(missing.get(col)))
+                    typed[col] = pd.to_numeric(typed[col], errors="coerce").round().astype(dtype)
+            for col in FLOAT32_COLUMNS:
+                if col in typed.columns:
+                    typed[col] = pd.to_numeric(typed[col], errors="coerce").astype("float32")
+            for col in typed.columns:
+                if pd.api.types.is_string_dtype(typed[col].dtype) and not isinstance(typed[col].dtype, pd.CategoricalDtype):
+                    typed[col] = typed[col].astype(object)
+            if writer is None:
+                batch = pa.RecordBatch.from_pandas(typed, preserve_index=False)
+                schema = batch.schema
+                writer = pa.ipc.new_file(str(tmp_arrow), schema)
+            else:
+                batch = pa.RecordBatch.from_pandas(typed, schema=schema, preserve_index=False)
+            writer.write_batch(batch)
+            rows += len(chunk)
+    except BaseException:
+        tmp_csv.unlink(missing_ok=True)
+        tmp_arrow.unlink(missing_ok=True)
+        raise
+    finally:
+        if writer is not None:
+            writer.close()
+
+    os.replace(tmp_csv, out_path)
+    artifact = cache_path_for(out_path)
+    artifact.parent.mkdir(parents=True, exist_ok=True)
+    for stale in artifact.parent.glob(f"{out_path.stem}-v*.arrow"):
+        stale.unlink(missing_ok=True)
+    os.replace(tmp_arrow, artifact)
+    build_kpi_cube(out_path)
+    for stale in (model_path_for(out_path), similar_path_for(out_path)):
+        stale.unlink(missing_ok=True)
+    return {"rows": rows, "csv": out_path, "artifact": artifact, "cube": cube_path_for(out_path), "salary_bounds": bounds}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Clean the raw AI job postings export.")
+    parser.add_argument("raw", type=Path, help="raw export, e.g. data/AI_DATASET.csv")
+    parser.add_argument("--out", type=Path, default=DATA_PATH)
+    parser.add_argument("--chunksize", type=int, default=CHUNK_SIZE)
+    args = parser.parse_args()
+    result = run(args.raw, args.out, args.chunksize)
+    print(f"Wrote {result['rows']:,} rows to {result['csv']}")
+    print(f"  artifact: {result['artifact']}")
+    print(f"  KPI cube: {result['cube']}")
+
+
+if __name__ == "__main__":
+    main()
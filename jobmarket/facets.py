@@ -0,0 +1,155 @@
+"""Faceted counts from a pre-aggregated count cube.
+
+The cube holds the number of rows for every combination of the filter
+dimensions (job title x location x experience x remote), so its size depends
+on the number of distinct values, not on the number of rows.  The count shown
+next to a filter option is the cube sliced by the *other* active filters and
+summed down to that option's dimension.
+"""
+import copy
+from functools import lru_cache
+
+import numpy as np
+import pandas as pd
+
+
+def grow_cells(array, shape):
+    """Zero-pad the leading cube axes of ``array`` to ``shape``.
+
+    Each axis ends with the slot for missing values, which stays last; new
+    values take the slots in between.
+    """
+    old_shape = array.shape[:len(shape)]
+    if old_shape == tuple(shape):
+        return array
+    grown = np.zeros(tuple(shape) + array.shape[len(shape):], dtype=array.dtype)
+    slots = [np.r_[np.arange(old - 1), new - 1] for old, new in zip(old_shape, shape)]
+    grown[np.ix_(*slots)] = array
+    return grown
+
+
+def regrow_cells(cells, old_shape, new_shape):
+    """Flat cell ids of ``old_shape`` renumbered for the grown ``new_shape``."""
+    if tuple(old_shape) == tuple(new_shape):
+        return cells
+    coords = list(np.unravel_index(cells, old_shape))
+    for axis, (old, new) in enumerate(zip(old_shape, new_shape)):
+        coords[axis] = np.where(coords[axis] == old - 1, new - 1, coords[axis])
+    return np.ravel_multi_index(coords, new_shape)
+
+
+class CountCube:
+    """Dense row counts over the cross product of categorical dimensions."""
+
+    def __init__(self, df, columns):
+        self.columns = []
+        labels = []
+        for col in columns:
+            if not col or col in self.columns or col not in df.columns:
+                continue
+            values = df[col]
+            if not isinstance(values.dtype, pd.CategoricalDtype):
+                values = values.astype("category")
+            self.columns.append(col)
+            labels.append(list(values.cat.categories))
+        self._index(df, labels)
+
+    def _index(self, df, labels):
+        """Aggregate ``df`` with the given value labels per dimension."""
+        self.labels = labels
+        self.positions = [{v: i for i, v in enumerate(col_labels)} for col_labels in labels]
+        self.shape = tuple(len(col_labels) + 1 for col_labels in labels)
+        codes = []
+        for col, col_labels in zip(self.columns, labels):
+            col_codes = pd.Categorical(df[col], categories=col_labels).codes.astype(np.int64)
+            # Missing values get their own trailing slot: they are counted
+            # while the dimension is unfiltered but can never be selected.
+            col_codes[col_codes < 0] = len(col_labels)
+            codes.append(col_codes)
+        flat = np.ravel_multi_index(codes, self.shape) if codes else np.zeros(len(df), dtype=np.int64)
+        self._build(df, flat)
+        # Facets are cached per (dimension, selection of the other dimensions),
+        # so changing one filter only recomputes the facets it can affect.
+        self._facet = lru_cache(maxsize=4096)(self._compute_facet)
+
+    def __getstate__(self):
+        # Memoized facets are per process: not pickled, started empty on load
+        state = dict(self.__dict__)
+        state.pop("_facet", None)
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._facet = lru_cache(maxsize=4096)(self._compute_facet)
+
+    def _build(self, df, cells):
+        """Aggregate the rows of ``df`` given the flat cube cell of every row."""
+        self.counts = np.bincount(cells, minlength=int(np.prod(self.shape))).reshape(self.shape)
+
+    def _merge(self, delta):
+        """Combine ``delta`` (built over the grown labels) into this cube's aggregates."""
+        self.counts = grow_cells(self.counts, delta.shape) + delta.counts
+
+    def append(self, df):
+        """Add the rows of ``df``, growing the dimensions for values not seen before.
+
+        Aggregates are replaced rather than updated in place, so a shallow copy
+        of the cube taken before the call is left untouched.
+        """
+        labels = []
+        for col, col_labels in zip(self.columns, self.labels):
+            known = set(col_labels)
+            unseen = [v for v in pd.unique(df[col].dropna()) if v not in known]
+            labels.append(col_labels + sorted(unseen, key=str))
+        delta = copy.copy(self)
+        delta._index(df, labels)
+        self._merge(delta)
+        self.labels, self.positions, self.shape = delta.labels, delta.positions, delta.shape
+        self._facet = lru_cache(maxsize=4096)(self._compute_facet)
+
+    def _key(self, selections):
+        """Canonical, order-independent form of ``{column: values}`` per dimension."""
+        key = []
+        for col, positions in zip(self.columns, self.positions):
+            values = selections.get(col)
+            if not values:
+                key.append(None)
+            else:
+                key.append(tuple(sorted({positions[v] for v in values if v in positions})))
+        return tuple(key)
+
+    def _slice(self, key, keep=None, array=None):
+        sub = self.counts if array is None else array
+        for axis, sel in enumerate(key):
+            if axis != keep and sel is not None:
+                sub = np.take(sub, sel, axis=axis)
+        return sub
+
+    def _cell_mask(self, key):
+        """Flat boolean mask of the cube cells selected by ``key``."""
+        mask = np.ones(self.shape, dtype=bool)
+        for axis, sel in enumerate(key):
+            if sel is not None:
+                own = np.zeros(self.shape[axis], dtype=bool)
+                own[list(sel)] = True
+                mask &= own.reshape([-1 if a == axis else 1 for a in range(len(self.shape))])
+        return mask.ravel()
+
+    def _compute_facet(self, axis, key):
+        sub = self._slice(key, keep=axis)
+        other_axes = tuple(a for a in range(sub.ndim) if a != axis)
+        counts = sub.sum(axis=other_axes)
+        return dict(zip(self.labels[axis], counts[:-1].tolist()))
+
+    def facet_counts(self, selections):
+        """Per-option counts for every dimension given the other dimensions' filters."""
+        key = self._key(selections)
+        result = {}
+        for axis, col in enumerate(self.columns):
+            others = key[:axis] + (None,) + key[axis + 1:]
+            result[col] = self._facet(axis, others)
+        return result
+
+    def total(self, selections):
+        """Number of rows matching all ``selections``."""
+        return int(self._slice(self._key(selections)).sum())
@@ -0,0 +1,147 @@
+"""Most frequent companies and industries per filter-cube cell.
+
+Ranking employers under the active filters with ``value_counts`` touches
+every matching row, and there can be hundreds of thousands of employers.
+:class:`HeavyHitterCube` keeps, for every cell of the filter cube and every
+tracked column, a Space-Saving style summary: the ``capacity`` most frequent
+values of the cell with their counts, plus the cell's *floor*, an upper bound
+on the count of any value the summary leaves out.
+
+Summaries are mergeable.  A filter selection is a set of cells; adding up
+their listed counts gives a lower bound per value, and a value can have at
+most the floor of every selected cell that does not list it on top of that.
+Every reported count therefore comes with an error bound, and a value no
+selected cell lists has at most the summed floor of the selection.  Cells
+with no more than ``capacity`` distinct values are exact (floor 0).
+"""
+import numpy as np
+import pandas as pd
+
+from .facets import CountCube, grow_cells, regrow_cells
+from .index import code_dtype
+
+SKETCH_CAPACITY = 64  # values listed per cell and column
+
+
+def _truncate(cell, item, count, error, n_cells, capacity):
+    """Keep the ``capacity`` largest entries of every cell.
+
+    Returns the kept entries (sorted by cell) and, per cell, the largest
+    possible count (``count + error``) among the dropped ones.
+    """
+    order = np.lexsort((-count, cell))
+    cell, item, count, error = cell[order], item[order], count[order], error[order]
+    starts = np.flatnonzero(np.r_[True, cell[1:] != cell[:-1]]) if len(cell) else np.zeros(0, dtype=np.int64)
+    rank = np.arange(len(cell)) - np.repeat(starts, np.diff(np.r_[starts, len(cell)]))
+    keep = rank < capacity
+    dropped = np.zeros(n_cells, dtype=np.int64)
+    np.maximum.at(dropped, cell[~keep], count[~keep] + error[~keep])
+    return cell[keep], item[keep], count[keep], error[keep], dropped
+
+
+def _pack(cell, item, count, error, floor, shape, n_values):
+    """Entries and floors of one column in compact dtypes."""
+    entries = {
+        "cell": cell.astype(code_dtype(int(np.prod(shape)))),
+        "item": item.astype(code_dtype(n_values)),
+        "count": count.astype(np.int32),
+        "error": error.astype(np.int32),
+    }
+    return entries, floor.astype(np.int32).reshape(shape)
+
+
+class HeavyHitterCube(CountCube):
+    """Count cube with a top-``capacity`` summary per cell for each of ``value_columns``."""
+
+    def __init__(self, df, columns, value_columns, capacity=SKETCH_CAPACITY):
+        self.value_columns = [c for c in value_columns if c and c in df.columns]
+        self.capacity = capacity
+        self.values = {}
+        super().__init__(df, columns)
+
+    def _build(self, df, cells):
+        super()._build(df, cells)
+        n_cells = int(np.prod(self.shape))
+        # A delta built by ``append`` extends (a copy of) the vocabulary of the cube it is merged into
+        values = {}
+        self.entries, self.floors = {}, {}
+        for col in self.value_columns:
+            known = list(self.values.get(col, []))
+            seen = set(known)
+            known += sorted((v for v in pd.unique(df[col].dropna()) if v not in seen), key=str)
+            values[col] = known
+            codes = pd.Categorical(df[col], categories=known).codes.astype(np.int64)
+            present = codes >= 0
+            pairs = pd.Series(cells[present].astype(np.int64) * len(known) + codes[present]).value_counts(sort=False)
+            pair_ids = pairs.index.to_numpy(dtype=np.int64)
+            count = pairs.to_numpy(dtype=np.int64)
+            cell, item, count, error, floor = _truncate(
+                pair_ids // max(len(known), 1), pair_ids % max(len(known), 1), count, np.zeros_like(count),
+                n_cells, self.capacity,
+            )
+            self.entries[col], self.floors[col] = _pack(cell, item, count, error, floor, self.shape, len(known))
+        self.values = values
+
+    def _merge(self, delta):
+        old_shape = self.shape
+        super()._merge(delta)
+        n_cells = int(np.prod(delta.shape))
+        entries, floors = {}, {}
+        for col in self.value_columns:
+            old, new = self.entries[col], delta.entries[col]
+            old_floor = grow_cells(self.floors[col], delta.shape).ravel().astype(np.int64)
+            new_floor = delta.floors[col].ravel().astype(np.int64)
+            n_values = len(delta.values[col])
+            cell = np.concatenate([
+                regrow_cells(old["cell"].astype(np.int64), old_shape, delta.shape), new["cell"].astype(np.int64)
+            ])
+            item = np.concatenate([old["item"].astype(np.int64), new["item"].astype(np.int64)])
+            merged = pd.DataFrame({
+                "key": cell * n_values + item,
+                "count": np.concatenate([old["count"], new["count"]]).astype(np.int64),
+                "error": np.concatenate([old["error"], new["error"]]).astype(np.int64),
+                "side": np.r_[np.ones(len(old["cell"]), dtype=np.int64), np.full(len(new["cell"]), 2)],
+            }).groupby("key", sort=False).sum()
+            key = merged.index.to_numpy(dtype=np.int64)
+            cell, item, side = key // n_values, key % n_values, merged["side"].to_numpy()
+            # A value listed on one side only may have up to the other side's floor there
+            error = merged["error"].to_numpy() + np.where(side == 1, new_floor[cell], 0) \
+                + np.where(side == 2, old_floor[cell], 0)
+            cell, item, count, error, dropped = _truncate(
+                cell, item, merged["count"].to_numpy(), error, n_cells, self.capacity
+            )
+            entries[col], floors[col] = _pack(
+                cell, item, count, error, np.maximum(old_floor + new_floor, dropped), delta.shape, n_values
+            )
+        self.entries, self.floors, self.values = entries, floors, delta.values
+
+    def top(self, selections, col, n=20):
+        """``(table, unlisted)``: the ``n`` most frequent ``col`` values under ``selections``.
+
+        ``table`` has ``Value``, ``Count`` (a lower bound) and ``Error``: the
+        true count lies in ``[Count, Count + Error]``.  No value missing from
+        the table has more than ``unlisted`` rows.
+        """
+        entries = self.entries[col]
+        cells = self._cell_mask(self._key(selections))
+        selected = cells[entries["cell"]]
+        item = entries["item"][selected]
+        n_values = len(self.values[col])
+        floor = self.floors[col].ravel()
+        total_floor = int(floor[cells].sum())
+        count = np.bincount(item, weights=entries["count"][selected], minlength=n_values)
+        error = np.bincount(item, weights=entries["error"][selected], minlength=n_values)
+        listed_floor = np.bincount(item, weights=floor[entries["cell"][selected]], minlength=n_values)
+        error += total_floor - listed_floor
+        order = np.argsort(-count, kind="stable")
+        order = order[count[order] > 0]
+        rest = order[n:]
+        order = order[:n]
+        unlisted = max(total_floor, int((count[rest] + error[rest]).max(initial=0)))
+        labels = self.values[col]
+        table = pd.DataFrame({
+            "Value": [str(labels[i]) for i in order],
+            "Count": count[order].astype(np.int64),
+            "Error": error[order].astype(np.int64),
+        })
+        return table, unlisted
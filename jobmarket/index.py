@@ -0,0 +1,125 @@
+"""Precomputed bitmap index for the multiselect filters.
+
+For every filter column the index keeps one packed bitmap (1 bit per row) per
+distinct value.  A multiselect then becomes an OR of a few bitmaps and the
+filter bar an AND across columns, so a widget click never rescans a column.
+"""
+import numpy as np
+import pandas as pd
+
+
+def code_dtype(n_values):
+    """Smallest signed integer dtype holding the codes ``-1 .. n_values - 1``."""
+    for dtype in (np.int8, np.int16, np.int32):
+        if n_values <= np.iinfo(dtype).max:
+            return dtype
+    return np.int64
+
+
+def append_bits(packed, n_rows, bits):
+    """Packed bitmap of ``n_rows`` rows followed by the boolean array ``bits``.
+
+    Only the last, partially filled byte of ``packed`` is unpacked, so the
+    cost is proportional to ``len(bits)`` plus one copy of ``packed``.
+    """
+    used = n_rows % 8
+    if used == 0:
+        return np.concatenate([packed[:n_rows // 8], np.packbits(bits)])
+    tail = np.unpackbits(packed[-1:])[:used].astype(bool)
+    return np.concatenate([packed[:-1], np.packbits(np.concatenate([tail, bits]))])
+
+
+class FilterIndex:
+    """Packed per-value bitmaps for a fixed set of categorical columns."""
+
+    def __init__(self, df, columns):
+        self.n_rows = len(df)
+        self.bitmaps = {}
+        self.codes = {}
+        for col in columns:
+            if not col or col in self.bitmaps or col not in df.columns:
+                continue
+            values = df[col]
+            if not isinstance(values.dtype, pd.CategoricalDtype):
+                values = values.astype("category")
+            codes = values.cat.codes.to_numpy()
+            # Sorting once groups the rows of each value together, which is
+            # much cheaper than comparing the full column against every value.
+            order = np.argsort(codes, kind="stable")
+            bounds = np.searchsorted(codes[order], np.arange(len(values.cat.categories) + 1))
+            col_maps = {}
+            for i, value in enumerate(values.cat.categories):
+                bits = np.zeros(self.n_rows, dtype=bool)
+                bits[order[bounds[i]:bounds[i + 1]]] = True
+                col_maps[value] = np.packbits(bits)
+            self.bitmaps[col] = col_maps
+            self.codes[col] = codes
+
+    def append(self, df):
+        """Index the rows of ``df`` as if they were appended to the indexed frame.
+
+        New attribute values are created instead of updating arrays in place,
+        so a shallow copy taken before the call keeps seeing the old rows.
+        """
+        bitmaps, all_codes = {}, {}
+        for col, col_maps in self.bitmaps.items():
+            values = list(col_maps)
+            known = set(values)
+            values += sorted((v for v in pd.unique(df[col].dropna()) if v not in known), key=str)
+            codes = pd.Categorical(df[col], categories=values).codes
+            empty = np.zeros((self.n_rows + 7) // 8, dtype=np.uint8)
+            bitmaps[col] = {
+                v: append_bits(col_maps.get(v, empty), self.n_rows, codes == i)
+                for i, v in enumerate(values)
+            }
+            all_codes[col] = np.concatenate([self.codes[col], codes])
+        self.bitmaps, self.codes = bitmaps, all_codes
+        self.n_rows += len(df)
+
+    def mask(self, selections):
+        """AND the OR-ed bitmaps of each ``(column, values)`` pair.
+
+        Returns a packed bitmap, or ``None`` when no selection is active.
+        """
+        result = None
+        for col, values in selections:
+            if not col or not values or col not in self.bitmaps:
+                continue
+            col_maps = self.bitmaps[col]
+            col_bits = np.zeros((self.n_rows + 7) // 8, dtype=np.uint8)
+            for v in values:
+                bits = col_maps.get(v)
+                if bits is not None:
+                    np.bitwise_or(col_bits, bits, out=col_bits)
+            if result is None:
+                result = col_bits
+            else:
+                np.bitwise_and(result, col_bits, out=result)
+        return result
+
+    def select(self, selections, extra=None):
+        """Return the matching row positions, or ``None`` for "all rows".
+
+        ``extra`` is an optional packed bitmap (e.g. from the skill index)
+        that is AND-ed with the column selections.
+        """
+        bits = self.mask(selections)
+        if extra is not None:
+            bits = extra.copy() if bits is None else np.bitwise_and(bits, extra, out=bits)
+        if bits is None:
+            return None
+        return np.flatnonzero(np.unpackbits(bits, count=self.n_rows))
+
+    def facet_counts(self, selections, extra=None):
+        """Per-value row counts of every column given the *other* selections.
+
+        Exact counterpart of :meth:`CountCube.facet_counts` for filters the
+        cube cannot express, such as the multi-valued skills column.
+        """
+        result = {}
+        for col, col_maps in self.bitmaps.items():
+            rows = self.select([(c, v) for c, v in selections if c != col], extra)
+            codes = self.codes[col] if rows is None else self.codes[col][rows]
+            counts = np.bincount(codes[codes >= 0], minlength=len(col_maps))
+            result[col] = dict(zip(col_maps, counts.tolist()))
+        return result
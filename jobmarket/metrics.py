@@ -0,0 +1,214 @@
+"""Timing spans and memory deltas per dashboard rerun (or API request).
+
+Stages are wrapped in :func:`span` (or decorated with :func:`timed`); a run
+groups the spans of one Streamlit rerun::
+
+    RECORDER.start_run()
+    with span("filters"):
+        ...
+    RECORDER.end_run(page="Overview", cache=result_cache.stats())
+
+Each span records its wall time and the change of the process RSS over the
+stage.  Spans nest (``page/filters/select``).  The recorder keeps
+process-wide aggregates per span plus the last runs, and can export every
+finished run as one JSON line and the aggregates in the Prometheus text
+format, to the files named by the environment variables below (unset = no
+export).  Spans outside a run (background threads, the JSON API without
+runs) only feed the aggregates.
+"""
+import json
+import os
+import resource
+import sys
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from functools import wraps
+from pathlib import Path
+
+JSONL_ENV = "JOBMARKET_METRICS_JSONL"  # append one JSON line per run
+PROMETHEUS_ENV = "JOBMARKET_METRICS_PROM"  # rewrite the Prometheus text file after every run
+
+# Upper bounds (seconds) of the span duration histogram buckets
+BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+_PAGE_SIZE = os.sysconf("SC_PAGE_SIZE") if hasattr(os, "sysconf") else 4096
+
+
+def rss_bytes():
+    """Current resident set size (peak RSS where ``/proc`` is unavailable)."""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * _PAGE_SIZE
+    except OSError:
+        rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return rss if sys.platform == "darwin" else rss * 1024
+
+
+class _Stat:
+    __slots__ = ("count", "total", "max", "rss_delta", "buckets")
+
+    def __init__(self):
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+        self.rss_delta = 0
+        self.buckets = [0] * len(BUCKETS)
+
+    def add(self, seconds, rss_delta):
+        self.count += 1
+        self.total += seconds
+        self.max = max(self.max, seconds)
+        self.rss_delta += rss_delta
+        for i, bound in enumerate(BUCKETS):
+            if seconds <= bound:
+                self.buckets[i] += 1
+                break
+
+
+class Recorder:
+    """Thread-safe span aggregates plus the spans of each thread's current run."""
+
+    def __init__(self, jsonl_path=None, prometheus_path=None, history=200):
+        self.jsonl_path = Path(jsonl_path) if jsonl_path else None
+        self.prometheus_path = Path(prometheus_path) if prometheus_path else None
+        self.runs = deque(maxlen=history)
+        self.stats = {}
+        self._local = threading.local()
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_env(cls):
+        return cls(os.environ.get(JSONL_ENV), os.environ.get(PROMETHEUS_ENV))
+
+    # ----- spans -----
+
+    @contextmanager
+    def span(self, name):
+        stack = getattr(self._local, "stack", None)
+        if stack is None:
+            stack = self._local.stack = []
+        path = "/".join(stack + [name])
+        stack.append(name)
+        rss, t0 = rss_bytes(), time.perf_counter()
+        try:
+            yield
+        finally:
+            seconds = time.perf_counter() - t0
+            rss_delta = rss_bytes() - rss
+            stack.pop()
+            with self._lock:
+                self.stats.setdefault(path, _Stat()).add(seconds, rss_delta)
+            spans = getattr(self._local, "spans", None)
+            if spans is not None:
+                spans.append({
+                    "span": path,
+                    "start_ms": round((t0 - self._local.started[0]) * 1000, 3),
+                    "ms": round(seconds * 1000, 3),
+                    "rss_delta_kb": rss_delta // 1024,
+                })
+
+    def timed(self, name):
+        """Decorator running the function inside ``span(name)``."""
+        def decorate(fn):
+            @wraps(fn)
+            def wrapper(*args, **kwargs):
+                with self.span(name):
+                    return fn(*args, **kwargs)
+            return wrapper
+        return decorate
+
+    # ----- runs -----
+
+    def start_run(self):
+        """Start collecting the spans of this thread (drops an unfinished previous run)."""
+        self._local.stack = []
+        self._local.spans = []
+        self._local.started = (time.perf_counter(), rss_bytes())
+
+    def end_run(self, page=None, cache=None):
+        """Finish this thread's run, record it and export it; returns the run record."""
+        spans = getattr(self._local, "spans", None)
+        if spans is None:
+            return None
+        t0, rss = self._local.started
+        seconds = time.perf_counter() - t0
+        now_rss = rss_bytes()
+        self._local.spans = None
+        with self._lock:
+            self.stats.setdefault("run", _Stat()).add(seconds, now_rss - rss)
+        run = {
+            "ts": round(time.time(), 3),
+            "page": page,
+            "ms": round(seconds * 1000, 3),
+            "rss_mb": round(now_rss / 2**20, 1),
+            "spans": sorted(spans, key=lambda s: s["start_ms"]),
+            "cache": cache,
+        }
+        self.runs.append(run)
+        self.export(run, cache)
+        return run
+
+    # ----- reporting -----
+
+    def summary(self):
+        """Aggregates per span path: count, mean/max milliseconds and mean RSS delta."""
+        with self._lock:
+            items = list(self.stats.items())
+        return [
+            {
+                "span": path,
+                "count": stat.count,
+                "mean_ms": stat.total / stat.count * 1000,
+                "max_ms": stat.max * 1000,
+                "total_s": stat.total,
+                "mean_rss_delta_kb": stat.rss_delta / stat.count / 1024,
+            }
+            for path, stat in sorted(items)
+        ]
+
+    def prometheus_text(self, cache=None):
+        """Aggregates (and result-cache counters) in the Prometheus text exposition format."""
+        lines = [
+            "# HELP jobmarket_span_seconds Wall time of instrumented stages.",
+            "# TYPE jobmarket_span_seconds histogram",
+        ]
+        with self._lock:
+            items = sorted(self.stats.items())
+            for path, stat in items:
+                cumulative = 0
+                for bound, n in zip(BUCKETS, stat.buckets):
+                    cumulative += n
+                    lines.append(f'jobmarket_span_seconds_bucket{{span="{path}",le="{bound}"}} {cumulative}')
+                lines.append(f'jobmarket_span_seconds_bucket{{span="{path}",le="+Inf"}} {stat.count}')
+                lines.append(f'jobmarket_span_seconds_sum{{span="{path}"}} {stat.total:.6f}')
+                lines.append(f'jobmarket_span_seconds_count{{span="{path}"}} {stat.count}')
+            lines += ["# HELP jobmarket_span_rss_delta_bytes Summed RSS change over instrumented stages.",
+                      "# TYPE jobmarket_span_rss_delta_bytes gauge"]
+            lines += [f'jobmarket_span_rss_delta_bytes{{span="{path}"}} {stat.rss_delta}' for path, stat in items]
+        lines += ["# HELP jobmarket_rss_bytes Resident set size of the process.",
+                  "# TYPE jobmarket_rss_bytes gauge",
+                  f"jobmarket_rss_bytes {rss_bytes()}"]
+        if cache:
+            for key in ["hits", "misses", "evictions", "expirations"]:
+                lines += [f"# TYPE jobmarket_result_cache_{key}_total counter",
+                          f"jobmarket_result_cache_{key}_total {cache[key]}"]
+            lines += ["# TYPE jobmarket_result_cache_entries gauge",
+                      f"jobmarket_result_cache_entries {cache['entries']}"]
+        return "\n".join(lines) + "\n"
+
+    def export(self, run, cache=None):
+        if self.jsonl_path:
+            with self._lock, open(self.jsonl_path, "a") as f:
+                f.write(json.dumps(run) + "\n")
+        if self.prometheus_path:
+            tmp = self.prometheus_path.with_name(f".{self.prometheus_path.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+            tmp.write_text(self.prometheus_text(cache))
+            os.replace(tmp, self.prometheus_path)
+
+
+# Process-wide recorder used by the dashboard, the engine and the API
+RECORDER = Recorder.from_env()
+span = RECORDER.span
+timed = RECORDER.timed
@@ -0,0 +1,249 @@
+"""Append-only storage of the postings, partitioned by posting month.
+
+Layout of the partition root (``data/partitions`` by default)::
+
+    _manifest.json                          categories, salary bounds, parts
+    _version                                token rewritten after every ingest
+    posting_month=2024-09/part-00000.arrow  typed Arrow IPC file per batch
+
+New postings never rewrite existing files: an ingest cleans the delta, adds
+one part per posting month it touches and bumps the version token::
+
+    python -m jobmarket.partitions init                  # seed from the cleaned CSV
+    python -m jobmarket.partitions ingest data/new.csv   # raw or cleaned export
+
+Category lists in the manifest only ever grow, so the codes of a value are the
+same in every part.  :class:`LiveDataset` polls the token and folds new parts
+into the frame and into every derived index or cube it has handed out.
+"""
+import argparse
+import copy
+import json
+import os
+import threading
+import time
+from collections import namedtuple
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from .dataset import CATEGORY_COLUMNS, DATA_PATH, apply_schema, read_dataset
+from .etl import CHUNK_SIZE, clean_chunk
+
+PARTITIONS_PATH = DATA_PATH.parent / "partitions"
+MANIFEST_NAME = "_manifest.json"
+VERSION_NAME = "_version"
+POLL_INTERVAL = 2.0  # seconds between two reads of the version token
+
+
+def has_partitions(root=PARTITIONS_PATH):
+    return (Path(root) / MANIFEST_NAME).exists()
+
+
+def read_manifest(root=PARTITIONS_PATH):
+    with open(Path(root) / MANIFEST_NAME) as f:
+        return json.load(f)
+
+
+def read_version(root=PARTITIONS_PATH):
+    """Current version token, or ``None`` if the root was never initialized."""
+    try:
+        return (Path(root) / VERSION_NAME).read_text().strip()
+    except FileNotFoundError:
+        return None
+
+
+def version_token(manifest):
+    return f"parts-{manifest['version']}-{sum(p['rows'] for p in manifest['parts'])}"
+
+
+def _replace_file(path, write):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+    write(tmp_path)
+    os.replace(tmp_path, path)
+
+
+def _commit(root, manifest):
+    """Publish ``manifest``: the parts are already on disk, the token goes last."""
+    manifest["version"] += 1
+    _replace_file(root / MANIFEST_NAME, lambda p: p.write_text(json.dumps(manifest, indent=1)))
+    _replace_file(root / VERSION_NAME, lambda p: p.write_text(version_token(manifest)))
+
+
+def align_categories(df, categories):
+    """Give the categorical columns of ``df`` the manifest's category lists."""
+    for col, values in categories.items():
+        if col in df.columns:
+            df[col] = pd.Categorical(df[col], categories=values)
+    return df
+
+
+def _write_parts(root, df, manifest):
+    """Write ``df`` as one new part per posting month and register the parts."""
+    from pyarrow import feather
+
+    if "posting_date" in df.columns:
+        months = df["posting_date"].dt.strftime("%Y-%m").fillna("unknown").to_numpy()
+    else:
+        months = np.full(len(df), "unknown")
+    for month, rows in sorted(pd.Series(months).groupby(months).indices.items()):
+        rel = f"posting_month={month}/part-{manifest['next_part']:05d}.arrow"
+        manifest["next_part"] += 1
+        part = df.iloc[rows].reset_index(drop=True)
+        _replace_file(root / rel, lambda p: feather.write_feather(part, p, compression="uncompressed"))
+        manifest["parts"].append({"path": rel, "month": month, "rows": len(rows)})
+
+
+def init(source=DATA_PATH, root=PARTITIONS_PATH):
+    """Seed an empty partition root with the typed rows of ``source``."""
+    root = Path(root)
+    if has_partitions(root):
+        raise FileExistsError(f"{root} is already initialized")
+    df = read_dataset(source)
+    categories = {
+        c: [str(v) for v in df[c].cat.categories]
+        for c in CATEGORY_COLUMNS if c in df.columns
+    }
+    bounds = None
+    if "salary_usd" in df.columns and df["salary_usd"].notna().any():
+        q1, q3 = np.quantile(df["salary_usd"].dropna().to_numpy(), [0.25, 0.75])
+        bounds = [float(q1 - 1.5 * (q3 - q1)), float(q3 + 1.5 * (q3 - q1))]
+    manifest = {"version": 0, "next_part": 0, "categories": categories, "salary_bounds": bounds, "parts": []}
+    _write_parts(root, align_categories(df, categories), manifest)
+    _commit(root, manifest)
+    return manifest
+
+
+def ingest(raw_path, root=PARTITIONS_PATH, chunksize=CHUNK_SIZE):
+    """Clean ``raw_path`` and append it as new parts; returns the number of rows added."""
+    root = Path(root)
+    manifest = read_manifest(root)
+    categories = manifest["categories"]
+    bounds = manifest["salary_bounds"]
+    rows = 0
+    for chunk in pd.read_csv(raw_path, chunksize=chunksize, low_memory=False):
+        chunk = clean_chunk(chunk)
+        if bounds and "salary_usd" in chunk.columns:
+            # Same caps as the seeded data, so old and new rows stay comparable
+            chunk["salary_usd"] = chunk["salary_usd"].clip(*bounds)
+        for col, values in categories.items():
+            if col in chunk.columns:
+                known = set(values)
+                values.extend(sorted(str(v) for v in chunk[col].dropna().unique() if str(v) not in known))
+        typed = align_categories(apply_schema(chunk), categories)
+        for col in typed.columns:
+            if pd.api.types.is_string_dtype(typed[col].dtype) and not isinstance(typed[col].dtype, pd.CategoricalDtype):
+                typed[col] = typed[col].astype(object)
+        _write_parts(root, typed, manifest)
+        rows += len(typed)
+    if rows:
+        _commit(root, manifest)
+    return rows
+
+
+Snapshot = namedtuple("Snapshot", "version frame derived")
+
+
+class LiveDataset:
+    """Frame over a partition root plus the objects derived from it.
+
+    ``builders`` maps a name to ``builder(frame, *args)``.  After new parts
+    appear, every derived object that has an ``append`` method is updated
+    with the delta rows only (``updaters`` maps a name to
+    ``updater(obj, delta, *args)`` for objects whose ``append`` takes
+    something other than the delta frame); the others are rebuilt.  Updates
+    run on a shallow copy and publish a new :class:`Snapshot`, so readers of
+    the previous snapshot are never affected.
+    """
+
+    def __init__(self, root=PARTITIONS_PATH, builders=None, updaters=None, prepare=None):
+        self.root = Path(root)
+        self.builders = builders or {}
+        self.updaters = updaters or {}
+        self.prepare = prepare or (lambda df: df)
+        self._snapshot = Snapshot(None, None, {})
+        self._n_parts = 0
+        self._checked = 0.0
+        self._lock = threading.Lock()
+
+    def _read_parts(self, parts, categories):
+        from pyarrow import feather
+
+        frames = [feather.read_table(self.root / p["path"], memory_map=True).to_pandas() for p in parts]
+        return self.prepare(align_categories(pd.concat(frames, ignore_index=True), categories))
+
+    def _stamp(self, obj, version):
+        if hasattr(obj, "version"):
+            obj.version = version
+        return obj
+
+    def _update(self, key, obj, frame, delta, version):
+        name, args = key
+        if not hasattr(obj, "append"):
+            return self._stamp(self.builders[name](frame, *args), version)
+        obj = copy.copy(obj)
+        updater = self.updaters.get(name, lambda o, d, *a: o.append(d))
+        updater(obj, delta, *args)
+        return self._stamp(obj, version)
+
+    def refresh(self):
+        """Fold in the parts added since the last refresh; returns the current snapshot."""
+        if time.monotonic() - self._checked < POLL_INTERVAL and self._snapshot.frame is not None:
+            return self._snapshot
+        with self._lock:
+            self._checked = time.monotonic()
+            if read_version(self.root) == self._snapshot.version:
+                return self._snapshot
+            manifest = read_manifest(self.root)
+            version = version_token(manifest)
+            new_parts = manifest["parts"][self._n_parts:]
+            old = self._snapshot
+            if old.frame is None:
+                frame, derived = self._read_parts(new_parts, manifest["categories"]), {}
+            elif not new_parts:
+                frame, derived = old.frame, old.derived
+            else:
+                delta = self._read_parts(new_parts, manifest["categories"])
+                frame = pd.concat([align_categories(old.frame.copy(deep=False), manifest["categories"]), delta],
+                                  ignore_index=True)
+                derived = {key: self._update(key, obj, frame, delta, version) for key, obj in old.derived.items()}
+            self._snapshot = Snapshot(version, frame, derived)
+            self._n_parts = len(manifest["parts"])
+            return self._snapshot
+
+    def derived(self, snapshot, name, args=()):
+        """Object ``name`` built for ``snapshot`` (kept up to date by later refreshes)."""
+        key = (name, tuple(args))
+        obj = snapshot.derived.get(key)
+        if obj is None:
+            with self._lock:
+                obj = snapshot.derived.get(key)
+                if obj is None:
+                    obj = self._stamp(self.builders[name](snapshot.frame, *args), snapshot.version)
+                    snapshot.derived[key] = obj
+        return obj
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Manage the month-partitioned postings store.")
+    parser.add_argument("--root", type=Path, default=PARTITIONS_PATH)
+    commands = parser.add_subparsers(dest="command", required=True)
+    seed = commands.add_parser("init", help="seed the store from the cleaned CSV")
+    seed.add_argument("--source", type=Path, default=DATA_PATH)
+    add = commands.add_parser("ingest", help="append new postings")
+    add.add_argument("raw", type=Path, help="CSV export of new postings (raw or cleaned)")
+    add.add_argument("--chunksize", type=int, default=CHUNK_SIZE)
+    args = parser.parse_args()
+
+    if args.command == "init":
+        manifest = init(args.source, args.root)
+        print(f"Seeded {args.root} with {len(manifest['parts'])} parts ({version_token(manifest)})")
+    else:
+        rows = ingest(args.raw, args.root, args.chunksize)
+        print(f"Appended {rows:,} rows to {args.root} ({read_version(args.root)})")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,352 @@
+"""Salary estimates from a log-linear model of the posting's attributes.
+
+The model is a least-squares fit of ``log(salary)`` on one-hot encoded
+categorical columns (title, location, experience, employment type,
+education, company size, remote ratio, industry), the years of experience
+and the required skills.  Because every feature is either a category, a
+skill or a number, the fitted model is a set of lookup tables: the estimate
+of a posting is ``exp`` of the sum of the weights of its values, so scoring
+never builds a design matrix and a single what-if estimate is a few dict
+lookups.
+
+Training accumulates the normal equations over chunks of rows from the
+non-zero entries of each row (its one-hot values and skills), never a dense
+design matrix, so a chunk costs memory in proportion to its rows, not to the
+number of features.  ``X^T X`` itself is dense: ``8 * n_features**2`` bytes
+(200 MB for 5,000 distinct values and skills, twice that while solving) and
+``O(n_features**3)`` to solve.  A random quarter of the rows is held out to
+report R² and the mean absolute error.  Estimates for every row are computed
+once and kept (in $10 units) next to the model::
+
+    python -m jobmarket.salary_model data/AI_DATASET_CLEANED.csv
+    python -m jobmarket.salary_model data/partitions --retrain
+
+Later processes load the saved model and its estimates.  Rows appended since
+are scored with :meth:`SalaryModel.append` (the model is not refitted until
+``--retrain``); any other change to the scored rows trains a new model.
+"""
+import argparse
+import json
+import os
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from .skills import SkillIndex, normalize_skill
+
+CATEGORICAL_FEATURES = [
+    "job_title", "company_location", "experience_level", "employment_type",
+    "education_required", "company_size", "remote_ratio", "industry",
+]
+NUMERIC_FEATURES = ["years_experience"]
+
+TRAIN_CHUNK = 20_000   # rows per block of the normal equations (memory ~ rows x entries per row²)
+HOLDOUT_SHARE = 0.25   # rows held out to measure the fit
+RIDGE = 1e-6           # relative ridge term; keeps one-hot blocks solvable
+ESTIMATE_UNIT = 10     # stored estimates are multiples of $10 (uint16)
+_SEED = 42
+
+
+def model_path_for(path):
+    """Saved model of a dataset file, or inside a partition root."""
+    path = Path(path)
+    if path.is_dir():
+        return path / "_salary_model.npz"
+    cache_dir = path.parent if path.parent.name == ".cache" else path.parent / ".cache"
+    return cache_dir / f"{path.stem}-salary-model.npz"
+
+
+def model_features(df):
+    """Feature columns of :data:`CATEGORICAL_FEATURES` and :data:`NUMERIC_FEATURES` with values in ``df``."""
+    return tuple(c for c in CATEGORICAL_FEATURES + NUMERIC_FEATURES if c in df.columns and df[c].notna().any())
+
+
+def fingerprint(df, columns):
+    """Order-independent hash of the values of ``columns`` in ``df``."""
+    if not len(df):
+        return "0"
+    hashes = pd.util.hash_pandas_object(df[list(columns)], index=False).to_numpy()
+    return str(int(hashes.sum(dtype=np.uint64)))
+
+
+class SalaryModel:
+    """Log-linear salary model over ``features`` and ``skills``, with an estimate per row of ``df``."""
+
+    def __init__(self, df, target, features, skills=None):
+        self.target = target
+        # Columns without a single value carry no signal (and have no range for what-if inputs)
+        usable = [c for c in features if c in df.columns and df[c].notna().any()]
+        self.categorical = [c for c in CATEGORICAL_FEATURES if c in usable]
+        self.numeric = [c for c in NUMERIC_FEATURES if c in usable]
+        self.skills = skills if skills in df.columns else None
+        self.values = {c: [str(v) for v in pd.unique(df[c].dropna())] for c in self.categorical}
+        self.vocabulary = []
+        self.n_rows = 0
+        self.estimates = np.zeros(0, dtype=np.uint16)
+        self._fit(df)
+        self.append(df)
+
+    # ----- features -----
+
+    @property
+    def input_columns(self):
+        return self.categorical + self.numeric + ([self.skills] if self.skills else []) + [self.target]
+
+    def _codes(self, df, col):
+        """Position of every row's ``col`` value in ``values[col]`` (-1 if unseen or missing)."""
+        values = df[col]
+        if not isinstance(values.dtype, pd.CategoricalDtype):
+            values = values.astype("category")
+        positions = self.positions[col]
+        lookup = np.array([positions.get(str(v), -1) for v in values.cat.categories] + [-1], dtype=np.int64)
+        return lookup[values.cat.codes.to_numpy()]
+
+    def _skill_index(self, df):
+        index = SkillIndex(df[self.skills])
+        ids = {skill: i for i, skill in enumerate(self.vocabulary)}
+        remap = np.array([ids.get(skill, -1) for skill in index.vocabulary] + [-1], dtype=np.int64)
+        return remap[index.indices.astype(np.int64)], np.diff(index.indptr)
+
+    def _entries(self, df):
+        """Non-zero design-matrix entries of ``df`` as ``(rows, columns, values)``, ordered by row.
+
+        Columns are the intercept, the numbers, the one-hot categories and the
+        skills; every entry but the numbers is a 1.
+        """
+        positions = np.arange(len(df))
+        rows, columns, values = [positions], [np.zeros(len(df), dtype=np.int64)], [np.ones(len(df))]
+        offset = 1
+        for col in self.numeric:
+            rows.append(positions)
+            columns.append(np.full(len(df), offset, dtype=np.int64))
+            values.append(np.nan_to_num(df[col].to_numpy(dtype=np.float64, na_value=np.nan)))
+            offset += 1
+        for col in self.categorical:
+            codes = self._codes(df, col)
+            seen = codes >= 0
+            rows.append(positions[seen])
+            columns.append(offset + codes[seen])
+            values.append(np.ones(int(seen.sum())))
+            offset += len(self.values[col])
+        if self.skills:
+            ids, lengths = self._skill_index(df)
+            owners = np.repeat(positions, lengths)
+            # A skill listed twice is still one indicator
+            width = max(len(self.vocabulary), 1)
+            cells = np.unique(owners[ids >= 0] * width + ids[ids >= 0])
+            rows.append(cells // width)
+            columns.append(offset + cells % width)
+            values.append(np.ones(len(cells)))
+        rows = np.concatenate(rows)
+        order = np.argsort(rows, kind="stable")
+        return rows[order], np.concatenate(columns)[order], np.concatenate(values)[order]
+
+    def _accumulate(self, df, log_salary, xtx, xty):
+        """Add the rows of ``df`` to the normal equations ``xtx``/``xty`` without building their design matrix.
+
+        Each row contributes the outer product of its few non-zero entries, so
+        the work and memory grow with the squared number of entries per row,
+        not with the number of features.
+        """
+        rows, columns, values = self._entries(df)
+        xty += np.bincount(columns, weights=values * log_salary[rows], minlength=self.n_features)
+        lengths = np.bincount(rows, minlength=len(df))
+        starts = np.cumsum(lengths) - lengths
+        # Every entry paired with every entry of its row (``within`` counts 0.. along each entry's run)
+        repeat = lengths[rows]
+        left = np.repeat(np.arange(len(rows)), repeat)
+        within = np.arange(len(left)) - np.repeat(np.cumsum(repeat) - repeat, repeat)
+        right = np.repeat(starts[rows], repeat) + within
+        np.add.at(xtx.reshape(-1), columns[left] * self.n_features + columns[right], values[left] * values[right])
+
+    @property
+    def n_features(self):
+        return 1 + len(self.numeric) + sum(len(v) for v in self.values.values()) + len(self.vocabulary)
+
+    # ----- training -----
+
+    def _fit(self, df):
+        if self.skills:
+            self.vocabulary = SkillIndex(df[self.skills]).vocabulary
+        self._index_tables()
+        salary = df[self.target].to_numpy(dtype=np.float64, na_value=np.nan)
+        usable = np.flatnonzero(np.isfinite(salary) & (salary > 0))
+        holdout = np.random.default_rng(_SEED).random(len(usable)) < HOLDOUT_SHARE
+        train, test = usable[~holdout], usable[holdout]
+
+        # Normal equations, accumulated a chunk of rows at a time
+        xtx = np.zeros((self.n_features, self.n_features))
+        xty = np.zeros(self.n_features)
+        for start in range(0, len(train), TRAIN_CHUNK):
+            rows = train[start:start + TRAIN_CHUNK]
+            self._accumulate(df.iloc[rows], np.log(salary[rows]), xtx, xty)
+        ridge = RIDGE * max(np.trace(xtx) / max(self.n_features, 1), 1.0)
+        xtx[np.diag_indices_from(xtx)] += ridge  # in place: no second n_features² matrix
+        coef = np.linalg.solve(xtx, xty)
+
+        # The model is kept as lookup tables: intercept, numbers, one table per category, skills
+        self.intercept = float(coef[0])
+        offset = 1
+        self.numeric_weights = {}
+        for col in self.numeric:
+            self.numeric_weights[col] = float(coef[offset])
+            offset += 1
+        self.weights = {}
+        for col in self.categorical:
+            self.weights[col] = coef[offset:offset + len(self.values[col])]
+            offset += len(self.values[col])
+        self.skill_weights = coef[offset:]
+
+        predicted = self.predict(df.iloc[test]) if len(test) else np.zeros(0)
+        actual = salary[test]
+        residual = ((actual - predicted) ** 2).sum()
+        spread = ((actual - actual.mean()) ** 2).sum() if len(test) else 0.0
+        self.metrics = {
+            "train_rows": int(len(train)),
+            "test_rows": int(len(test)),
+            "r2": float(1 - residual / spread) if spread else float("nan"),
+            "mae": float(np.abs(actual - predicted).mean()) if len(test) else float("nan"),
+        }
+
+    @property
+    def informative(self):
+        """Whether the model beats predicting the mean salary on the held-out rows (R² > 0)."""
+        return bool(self.metrics["r2"] > 0)
+
+    def _index_tables(self):
+        self.positions = {col: {v: i for i, v in enumerate(values)} for col, values in self.values.items()}
+        self.skill_ids = {skill: i for i, skill in enumerate(self.vocabulary)}
+
+    # ----- scoring -----
+
+    def predict(self, df):
+        """Estimated salary of every row of ``df`` (vectorized, in USD)."""
+        log_salary = np.full(len(df), self.intercept)
+        for col, weight in self.numeric_weights.items():
+            log_salary += weight * np.nan_to_num(df[col].to_numpy(dtype=np.float64, na_value=np.nan))
+        for col, weights in self.weights.items():
+            codes = self._codes(df, col)
+            # Unseen or missing values (code -1) add nothing
+            log_salary += np.r_[weights, 0.0][codes]
+        if self.skills and len(df):
+            ids, lengths = self._skill_index(df)
+            owners = np.repeat(np.arange(len(df)), lengths)
+            log_salary += np.bincount(owners, weights=np.r_[self.skill_weights, 0.0][ids], minlength=len(df))
+        return np.exp(log_salary)
+
+    def estimate(self, values, skills=()):
+        """Estimated salary of one posting given as ``{column: value}`` plus its skills."""
+        log_salary = self.intercept
+        for col, weight in self.numeric_weights.items():
+            log_salary += weight * float(values.get(col) or 0)
+        for col, weights in self.weights.items():
+            i = self.positions[col].get(str(values.get(col)))
+            log_salary += weights[i] if i is not None else 0.0
+        for skill in {normalize_skill(s) for s in skills}:
+            i = self.skill_ids.get(skill)
+            log_salary += self.skill_weights[i] if i is not None else 0.0
+        return float(np.exp(log_salary))
+
+    def append(self, df):
+        """Score the rows of ``df`` appended after the scored ones (the model itself is unchanged)."""
+        scored = np.clip(np.rint(self.predict(df) / ESTIMATE_UNIT), 0, np.iinfo(np.uint16).max)
+        self.estimates = np.concatenate([self.estimates, scored.astype(np.uint16)])
+        self.n_rows += len(df)
+
+    def row_estimates(self, rows=None):
+        """Estimated salaries (USD) of row positions ``rows`` (all rows if ``None``)."""
+        estimates = self.estimates if rows is None else self.estimates[rows]
+        return estimates.astype(np.float64) * ESTIMATE_UNIT
+
+    def matches(self, df):
+        """Whether ``df`` starts with the rows scored by this model."""
+        return len(df) >= self.n_rows and fingerprint(df.iloc[:self.n_rows], self.input_columns) == self.fingerprint
+
+    # ----- persistence -----
+
+    def save(self, path, df):
+        """Save the model and its estimates; ``df`` is the frame whose first rows were scored."""
+        self.fingerprint = fingerprint(df.iloc[:self.n_rows], self.input_columns)
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        meta = {
+            "target": self.target, "categorical": self.categorical, "numeric": self.numeric,
+            "skills": self.skills, "values": self.values, "vocabulary": self.vocabulary,
+            "intercept": self.intercept, "numeric_weights": self.numeric_weights, "metrics": self.metrics,
+            "n_rows": self.n_rows, "fingerprint": self.fingerprint,
+        }
+        arrays = {f"weights_{i}": self.weights[c] for i, c in enumerate(self.categorical)}
+        tmp_path = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+        with open(tmp_path, "wb") as f:
+            np.savez(f, meta=np.array(json.dumps(meta)), skill_weights=self.skill_weights,
+                     estimates=self.estimates, **arrays)
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, path):
+        with np.load(path) as data:
+            meta = json.loads(str(data["meta"]))
+            model = cls.__new__(cls)
+            for name in ("target", "categorical", "numeric", "skills", "values", "vocabulary", "intercept",
+                         "numeric_weights", "metrics", "n_rows", "fingerprint"):
+                setattr(model, name, meta[name])
+            model.weights = {c: data[f"weights_{i}"] for i, c in enumerate(model.categorical)}
+            model.skill_weights = data["skill_weights"]
+            model.estimates = data["estimates"]
+        model._index_tables()
+        return model
+
+
+def load_salary_model(df, target, features, skills, path, retrain=False):
+    """Model and estimates of ``df`` from the file at ``path``, scored or trained (and saved) when out of date."""
+    path = Path(path)
+    model = None
+    if path.exists() and not retrain:
+        try:
+            model = SalaryModel.load(path)
+        except (OSError, ValueError, KeyError):
+            model = None  # unreadable or older layout, retrain below
+    if model is not None and (
+        model.target != target or model.skills != skills
+        or model.categorical + model.numeric != [c for c in CATEGORICAL_FEATURES + NUMERIC_FEATURES if c in features]
+        or not model.matches(df)
+    ):
+        model = None
+    if model is not None and model.n_rows == len(df):
+        return model
+    if model is None:
+        model = SalaryModel(df, target, features, skills)
+    else:
+        model.append(df.iloc[model.n_rows:])
+    try:
+        model.save(path, df)
+    except OSError:
+        pass  # read-only checkout: serve the model without saving it
+    return model
+
+
+def main():
+    from .columns import detect_columns, normalize_text_columns
+    from .dataset import DATA_PATH, read_dataset
+    from .partitions import LiveDataset, has_partitions
+
+    parser = argparse.ArgumentParser(description="Train the salary model and precompute the estimates.")
+    parser.add_argument("source", type=Path, nargs="?", default=DATA_PATH, help="dataset file or partition root")
+    parser.add_argument("--retrain", action="store_true", help="refit even if the saved model is current")
+    args = parser.parse_args()
+
+    if has_partitions(args.source):
+        frame = LiveDataset(args.source, prepare=normalize_text_columns).refresh().frame
+    else:
+        frame = normalize_text_columns(read_dataset(args.source))
+    roles = detect_columns(frame)
+    model = load_salary_model(frame, roles["salary"], model_features(frame), roles["skills"],
+                              model_path_for(args.source), retrain=args.retrain)
+    metrics = model.metrics
+    print(f"Wrote {model_path_for(args.source)} ({model.n_rows:,} rows scored; held-out R² {metrics['r2']:.3f}, "
+          f"MAE ${metrics['mae']:,.0f} on {metrics['test_rows']:,} rows)")
+
+
+if __name__ == "__main__":
+    main()
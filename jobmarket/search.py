@@ -0,0 +1,169 @@
+"""Sorting, pagination and free-text search for the Job Search table.
+
+* :class:`SortIndex` keeps one stable argsort permutation per column and
+  direction, computed on first use.  A page of any sort order is a slice of
+  the permutation restricted to the selected rows, so only the visible rows
+  are ever materialized: the permutation is scanned only until the page is
+  full, and small selections are ordered by their rank in it instead.
+* :class:`TextIndex` is a trigram index over the *distinct* values of the
+  searchable columns (job titles, company names).  A query resolves to a set
+  of value ids first and is then mapped onto rows through the value codes.
+"""
+import numpy as np
+import pandas as pd
+
+from .index import code_dtype
+
+
+def _members(block, rows):
+    """Entries of ``block`` found in the sorted array ``rows``, in ``block`` order."""
+    # Binary searches in ascending order touch ``rows`` far more locally
+    order = np.argsort(block)
+    needles = block[order]
+    found = np.zeros(len(block), dtype=bool)
+    found[order] = rows[np.minimum(np.searchsorted(rows, needles), len(rows) - 1)] == needles
+    return block[found]
+
+
+def _sorted_codes(values):
+    """Integer codes that sort like ``values`` (missing values as ``-1``)."""
+    codes, _ = pd.factorize(values, sort=True)
+    return codes
+
+
+class SortIndex:
+    """Lazily built stable sort permutations per (column, direction)."""
+
+    def __init__(self, df):
+        self.df = df
+        self.n_rows = len(df)
+        self._perms = {}
+        self._ranks = {}
+
+    def permutation(self, col, ascending=True):
+        key = (col, ascending)
+        if key not in self._perms:
+            codes = _sorted_codes(self.df[col])
+            n = int(codes.max()) + 1 if len(codes) else 0
+            # Missing values sort last in both directions
+            order_key = codes if ascending else n - 1 - codes
+            order_key = np.where(codes < 0, n, order_key)
+            self._perms[key] = np.argsort(order_key, kind="stable")
+        return self._perms[key]
+
+    def rank(self, col, ascending=True):
+        """Position of every row in ``permutation(col, ascending)``."""
+        key = (col, ascending)
+        if key not in self._ranks:
+            rank = np.empty(self.n_rows, dtype=code_dtype(self.n_rows))
+            rank[self.permutation(col, ascending)] = np.arange(self.n_rows)
+            self._ranks[key] = rank
+        return self._ranks[key]
+
+    def page(self, rows, col, ascending=True, offset=0, limit=50):
+        """Row positions of one page of ``rows`` (ascending positions, ``None`` = all) ordered by ``col``.
+
+        ``limit=None`` returns every row from ``offset`` on.
+        """
+        perm = self.permutation(col, ascending)
+        if rows is None:
+            return perm[offset:None if limit is None else offset + limit]
+        stop = len(rows) if limit is None else min(offset + limit, len(rows))
+        if offset >= stop:
+            return perm[:0]
+        expected = stop * self.n_rows // len(rows)  # permutation entries scanned to fill the page
+        if expected <= len(rows):
+            # Dense selection: walk the permutation in growing blocks until the page is full
+            found, n_found, start, step = [], 0, 0, expected + expected // 4 + 64
+            while n_found < stop and start < self.n_rows:
+                hit = _members(perm[start:start + step], rows)
+                found.append(hit)
+                n_found += len(hit)
+                start, step = start + step, step * 2
+            return np.concatenate(found)[offset:stop]
+        # Sparse selection: order just the selected rows by their rank
+        ranks = self.rank(col, ascending)[rows]
+        first = np.argpartition(ranks, stop - 1)[:stop] if stop < len(rows) else np.arange(len(rows))
+        first = first[np.argsort(ranks[first])]
+        return rows[first[offset:stop]]
+
+
+def _trigrams(text):
+    return {text[i:i + 3] for i in range(len(text) - 2)}
+
+
+def _add_values(values, ids, grams, uniques):
+    """Extend the value list, value->id map and trigram postings in place."""
+    for value in uniques:
+        i = ids[value] = len(values)
+        values.append(str(value).lower())
+        for gram in _trigrams(values[i]):
+            grams.setdefault(gram, set()).add(i)
+    return values, ids, grams
+
+
+class TextIndex:
+    """Substring search over a few low-cardinality text columns."""
+
+    def __init__(self, df, columns):
+        self.n_rows = len(df)
+        self.columns = []
+        self.values = {}
+        self.ids = {}
+        self.codes = {}
+        self.grams = {}
+        for col in columns:
+            if not col or col in self.values or col not in df.columns:
+                continue
+            codes, uniques = pd.factorize(df[col], sort=True)
+            self.columns.append(col)
+            self.values[col], self.ids[col], self.grams[col] = _add_values([], {}, {}, uniques)
+            self.codes[col] = codes.astype(code_dtype(len(uniques)))
+
+    def append(self, df):
+        """Index the rows of ``df`` appended after the indexed ones.
+
+        Lookup tables are copied before they grow, so a shallow copy taken
+        before the call keeps seeing the old rows.
+        """
+        values, ids, grams, all_codes = {}, {}, {}, {}
+        for col in self.columns:
+            col_ids = self.ids[col]
+            unseen = [v for v in pd.unique(df[col].dropna()) if v not in col_ids]
+            values[col], ids[col], grams[col] = _add_values(
+                list(self.values[col]),
+                dict(col_ids),
+                {gram: set(value_ids) for gram, value_ids in self.grams[col].items()},
+                unseen,
+            )
+            codes = df[col].map(ids[col]).fillna(-1).to_numpy(dtype=np.int64)
+            all_codes[col] = np.concatenate([self.codes[col], codes]).astype(code_dtype(len(values[col])))
+        self.values, self.ids, self.grams, self.codes = values, ids, grams, all_codes
+        self.n_rows += len(df)
+
+    def matching_values(self, col, query):
+        """Ids of the distinct values of ``col`` containing ``query``."""
+        values = self.values[col]
+        if len(query) < 3:
+            candidates = range(len(values))
+        else:
+            candidates = None
+            for gram in _trigrams(query):
+                ids = self.grams[col].get(gram, set())
+                candidates = ids if candidates is None else candidates & ids
+                if not candidates:
+                    return []
+        return [i for i in candidates if query in values[i]]
+
+    def mask(self, query):
+        """Packed bitmap of rows where any indexed column contains ``query``."""
+        query = " ".join(str(query or "").split()).lower()
+        if not query:
+            return None
+        hits = np.zeros(self.n_rows, dtype=bool)
+        for col in self.columns:
+            lookup = np.zeros(len(self.values[col]) + 1, dtype=bool)
+            lookup[self.matching_values(col, query)] = True
+            # Missing values have code -1 and map to the always-False last slot
+            hits |= lookup[self.codes[col]]
+        return np.packbits(hits)
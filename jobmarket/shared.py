@@ -0,0 +1,211 @@
+"""One copy of the dataset and its indexes for every server process of a host.
+
+Each dashboard or API process normally loads the frame and builds the derived
+indexes itself, so a host running N workers holds N copies.  In shared mode a
+single loader publishes them to a snapshot file, and the workers memory-map
+it read-only::
+
+    python -m jobmarket.shared --watch                  # loader, republishes on new data
+    JOBMARKET_SHARED_DIR=/dev/shm/jobmarket-$(id -u) streamlit run app.py
+
+A snapshot is the :class:`~jobmarket.partitions.Snapshot` (version, frame,
+derived objects) pickled with protocol 5: the array buffers are written
+out-of-band, 64-byte aligned, after the pickle stream, and a worker rebuilds
+the objects around views of the mapping.  Category codes, numeric columns,
+Arrow strings and index arrays are therefore shared through the page cache
+(a tmpfs such as ``/dev/shm`` keeps them off disk); only the small Python
+structures (category labels, value->position dicts, datetime blocks) are
+copied into each worker.  Attaching costs milliseconds.
+
+Shared arrays are read-only: writing to one raises instead of corrupting
+other workers.  A new snapshot is written to a temporary file and renamed
+over the old one; workers notice the new file within ``POLL_INTERVAL`` and
+remap, while runs still using the old mapping keep it until they finish.
+
+Attaching unpickles the file, so a snapshot is only trusted from a directory
+and file owned by the current user that nobody else can write to; the
+directory is created with mode 0700 and anything else is refused.
+"""
+import argparse
+import mmap
+import os
+import pickle
+import stat
+import struct
+import threading
+import time
+from pathlib import Path
+
+import numpy as np
+
+from .dataset import DATA_PATH, dataset_version
+from .partitions import POLL_INTERVAL, Snapshot, has_partitions, read_version
+
+SHARED_DIR_ENV = "JOBMARKET_SHARED_DIR"  # directory of the published snapshots (unset = no shared mode)
+DEFAULT_SHARED_DIR = (
+    Path("/dev/shm") / f"jobmarket-{os.getuid()}" if Path("/dev/shm").is_dir() and hasattr(os, "getuid")
+    else DATA_PATH.parent / ".cache"
+)
+MAGIC = b"JMSNAP01"
+HEADER = struct.Struct("<8sQQ")  # magic, pickle stream bytes, number of buffers
+ALIGN = 64
+
+
+def shared_dir():
+    """Snapshot directory set through :data:`SHARED_DIR_ENV`, or ``None``."""
+    directory = os.environ.get(SHARED_DIR_ENV)
+    return Path(directory) if directory else None
+
+
+def shared_path_for(directory, path):
+    """Snapshot file of the dataset ``path`` in ``directory``."""
+    return Path(directory) / f"{Path(path).stem}.snapshot"
+
+
+def _check_private(info, path):
+    """Refuse ``path`` (``info`` = its stat) unless this user owns it and nobody else can write to it."""
+    if not hasattr(os, "getuid"):
+        return
+    if stat.S_ISLNK(info.st_mode) or info.st_uid != os.getuid() or info.st_mode & 0o022:
+        raise PermissionError(f"{path} must be owned by uid {os.getuid()} and not writable by group or others")
+
+
+def _aligned(offset):
+    return -(-offset // ALIGN) * ALIGN
+
+
+def publish(snapshot, file):
+    """Write ``snapshot`` to ``file`` (atomically replaced); returns its size in bytes."""
+    file = Path(file)
+    buffers = []
+    stream = pickle.dumps(snapshot, protocol=5, buffer_callback=buffers.append)
+    raws = [b.raw() for b in buffers]
+    sizes = np.array([r.nbytes for r in raws], dtype=np.uint64)
+    offset = _aligned(HEADER.size + 16 * len(raws) + len(stream))
+    offsets = np.zeros(len(raws), dtype=np.uint64)
+    for i, size in enumerate(sizes):
+        offsets[i] = offset
+        offset = _aligned(offset + int(size))
+
+    file.parent.mkdir(mode=0o700, parents=True, exist_ok=True)
+    _check_private(os.lstat(file.parent), file.parent)
+    tmp_file = file.with_name(f".{file.name}.{os.getpid()}.tmp")
+    tmp_file.unlink(missing_ok=True)
+    with open(os.open(tmp_file, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o600), "wb") as f:
+        f.write(HEADER.pack(MAGIC, len(stream), len(raws)))
+        f.write(np.stack([offsets, sizes], axis=1).tobytes() if len(raws) else b"")
+        f.write(stream)
+        for raw, start in zip(raws, offsets):
+            f.seek(int(start))
+            f.write(raw)
+        f.truncate(offset)
+    os.replace(tmp_file, file)
+    return offset
+
+
+def attach(file):
+    """The :class:`~jobmarket.partitions.Snapshot` published in ``file``, backed by a read-only mapping."""
+    file = Path(file)
+    _check_private(os.lstat(file.parent), file.parent)
+    with open(os.open(file, os.O_RDONLY | getattr(os, "O_NOFOLLOW", 0)), "rb") as f:
+        _check_private(os.fstat(f.fileno()), file)
+        mapping = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    view = memoryview(mapping)
+    magic, n_stream, n_buffers = HEADER.unpack_from(view)
+    if magic != MAGIC:
+        raise ValueError(f"{file} is not a published snapshot")
+    table = np.frombuffer(view, dtype=np.uint64, count=2 * n_buffers, offset=HEADER.size).reshape(-1, 2)
+    start = HEADER.size + table.nbytes
+    buffers = [view[int(o):int(o + n)] for o, n in table]
+    return pickle.loads(view[start:start + n_stream], buffers=buffers)
+
+
+class SharedDataset:
+    """Snapshots published to ``file`` by a loader process, remapped when the file is replaced.
+
+    Same interface as :class:`~jobmarket.partitions.LiveDataset`.  Objects
+    the loader did not publish are built locally with ``builders`` (and so
+    are not shared).
+    """
+
+    def __init__(self, file, builders=None):
+        self.file = Path(file)
+        self.builders = builders or {}
+        self._snapshot = Snapshot(None, None, {})
+        self._file_id = None
+        self._checked = 0.0
+        self._lock = threading.Lock()
+
+    def refresh(self):
+        """Snapshot currently published (remapped if the file was replaced since the last check)."""
+        if time.monotonic() - self._checked < POLL_INTERVAL and self._snapshot.frame is not None:
+            return self._snapshot
+        with self._lock:
+            self._checked = time.monotonic()
+            info = self.file.stat()
+            file_id = (info.st_ino, info.st_mtime_ns)
+            if file_id != self._file_id:
+                self._snapshot, self._file_id = attach(self.file), file_id
+            return self._snapshot
+
+    def derived(self, snapshot, name, args=()):
+        """Object ``name`` of ``snapshot``: the published one, else built in this process."""
+        key = (name, tuple(args))
+        obj = snapshot.derived.get(key)
+        if obj is None:
+            with self._lock:
+                obj = snapshot.derived.get(key)
+                if obj is None:
+                    obj = snapshot.derived[key] = self.builders[name](snapshot.frame, *args)
+        return obj
+
+
+def _current_version(path):
+    root = path.parent / "partitions"
+    return read_version(root) if has_partitions(root) else dataset_version(path)
+
+
+def build_snapshot(path=DATA_PATH):
+    """Frame of ``path`` (or of its partitions) with every derived object the engine uses."""
+    from .columns import normalize_text_columns
+    from .engine import UPDATERS, Engine, persisted_builders
+    from .partitions import LiveDataset
+
+    path = Path(path)
+    root = path.parent / "partitions"
+    if has_partitions(root):
+        snapshot = LiveDataset(root, persisted_builders(root), UPDATERS, prepare=normalize_text_columns).refresh()
+        engine = Engine(snapshot.frame, snapshot.version, path=root)
+    else:
+        engine = Engine.from_path(path)
+    return Snapshot(engine.version, engine.df, engine.warm())
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Publish the dataset and its indexes for the server workers.")
+    parser.add_argument("--data", type=Path, action="append", help="dataset file (repeatable, default: the cleaned CSV)")
+    parser.add_argument("--out", type=Path, default=shared_dir() or DEFAULT_SHARED_DIR,
+                        help=f"snapshot directory (point {SHARED_DIR_ENV} of the workers here)")
+    parser.add_argument("--watch", action="store_true", help="republish whenever the data changes")
+    args = parser.parse_args()
+
+    published = {}
+    while True:
+        for path in args.data or [DATA_PATH]:
+            version = _current_version(path)
+            if published.get(path) == version:
+                continue
+            start = time.perf_counter()
+            snapshot = build_snapshot(path)
+            file = shared_path_for(args.out, path)
+            size = publish(snapshot, file)
+            published[path] = snapshot.version
+            print(f"Published {file} ({snapshot.version}, {len(snapshot.frame):,} rows, "
+                  f"{len(snapshot.derived)} indexes, {size / 2**20:.1f} MB) in {time.perf_counter() - start:.1f}s")
+        if not args.watch:
+            break
+        time.sleep(POLL_INTERVAL)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,272 @@
+""""Similar jobs": MinHash signatures with LSH banding over skills and titles.
+
+A posting is described by a token set: its required skills plus the words of
+its job title.  Postings with the same skill list and title share one set, so
+everything below works on the *distinct* sets and maps them onto rows.
+
+* Every set gets a MinHash signature of :data:`NUM_PERM` 32-bit minima; the
+  share of equal components estimates the Jaccard similarity of two sets.
+* The signature is cut into :data:`BANDS` bands.  Per band, the sets are
+  sorted by a hash of their band, so the sets sharing a band with a query are
+  one binary search away.  Two sets with Jaccard similarity ``s`` share at
+  least one band with probability ``1 - (1 - s**r)**b`` (``r`` rows per band),
+  about 50% at ``s = 0.5`` and 99% at ``s = 0.8`` with the defaults.
+
+Neighbours of a posting are ranked by their estimated similarity, so a query
+costs a few binary searches plus a comparison against the candidate sets only.
+
+The index is saved next to the dataset and reused by later processes::
+
+    python -m jobmarket.similar data/AI_DATASET_CLEANED.csv
+
+A saved index is checked against the rows it was built from (by the hashes
+of their token sets); rows appended since are indexed with :meth:`append`
+instead of rebuilding, and any other change rebuilds it.
+"""
+import json
+import os
+import sys
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from .index import code_dtype
+
+NUM_PERM = 64         # MinHash components per signature
+BANDS = 16            # LSH bands (NUM_PERM / BANDS components each)
+MAX_CANDIDATES = 2_000  # sets taken from one band bucket per query
+CHUNK_SETS = 10_000   # sets hashed at a time while building signatures
+
+_SEED = 0x5EED
+_M1 = np.uint64(0xBF58476D1CE4E5B9)
+_M2 = np.uint64(0x94D049BB133111EB)
+
+
+def _mix(x):
+    """splitmix64 finalizer, element-wise on uint64 arrays (wrapping arithmetic)."""
+    x = x ^ (x >> np.uint64(30))
+    x = x * _M1
+    x = x ^ (x >> np.uint64(27))
+    x = x * _M2
+    return x ^ (x >> np.uint64(31))
+
+
+def _set_keys(df, skills_column, title_column):
+    """64-bit hash of every row's (skills, title) pair; equal pairs give equal keys."""
+    return pd.util.hash_pandas_object(df[[skills_column, title_column]], index=False).to_numpy()
+
+
+def _tokens(skills, titles):
+    """``(set_ids, tokens)`` of the skill and title-word tokens of each set."""
+    skill_tokens = pd.Series(skills, dtype=object).astype("string").str.lower().str.split(",").explode()
+    title_tokens = pd.Series(titles, dtype=object).astype("string").str.lower().str.split().explode()
+    skill_tokens = skill_tokens.str.strip().str.replace(r"\s+", " ", regex=True)
+    # Title words are a namespace of their own ("r" the skill is not "R" in a title)
+    tokens = pd.concat([skill_tokens, "title:" + title_tokens])
+    tokens = tokens[tokens.notna() & (tokens != "") & (tokens != "title:")]
+    return tokens.index.to_numpy(dtype=np.int64), tokens.to_numpy(dtype=object)
+
+
+def minhash(skills, titles, num_perm=NUM_PERM):
+    """MinHash signatures, shape ``(len(skills), num_perm)``; empty sets get all-ones rows."""
+    set_ids, tokens = _tokens(skills, titles)
+    pairs = np.unique(set_ids * (1 << 32) + (pd.util.hash_array(tokens) >> np.uint64(32)).astype(np.int64))
+    set_ids = pairs >> 32
+    hashes = _mix((pairs & 0xFFFFFFFF).astype(np.uint64))
+    seeds = _mix(np.arange(_SEED, _SEED + num_perm, dtype=np.uint64))
+    signatures = np.full((len(skills), num_perm), np.iinfo(np.uint32).max, dtype=np.uint32)
+    starts = np.flatnonzero(np.r_[True, set_ids[1:] != set_ids[:-1]]) if len(set_ids) else np.zeros(0, dtype=int)
+    for first in range(0, len(starts), CHUNK_SETS):
+        lo = starts[first]
+        hi = starts[first + CHUNK_SETS] if first + CHUNK_SETS < len(starts) else len(set_ids)
+        values = (_mix(hashes[lo:hi, None] ^ seeds[None, :]) >> np.uint64(32)).astype(np.uint32)
+        chunk_starts = starts[first:first + CHUNK_SETS] - lo
+        signatures[set_ids[lo + chunk_starts]] = np.minimum.reduceat(values, chunk_starts, axis=0)
+    return signatures
+
+
+def band_keys(signatures, bands=BANDS):
+    """32-bit hash of every band of every signature, shape ``(bands, n_sets)``."""
+    rows = signatures.shape[1] // bands
+    parts = signatures[:, :bands * rows].reshape(len(signatures), bands, rows).astype(np.uint64)
+    key = np.zeros(parts.shape[:2], dtype=np.uint64)
+    for j in range(rows):
+        key = _mix(key ^ parts[:, :, j])
+    return (key >> np.uint64(32)).astype(np.uint32).T
+
+
+def similar_path_for(path):
+    """Saved index of a dataset file, or inside a partition root."""
+    path = Path(path)
+    if path.is_dir():
+        return path / "_similar.npz"
+    cache_dir = path.parent if path.parent.name == ".cache" else path.parent / ".cache"
+    return cache_dir / f"{path.stem}-similar.npz"
+
+
+class SimilarityIndex:
+    """MinHash/LSH index of the (skills, title) token sets of a frame's rows."""
+
+    def __init__(self, df, skills_column, title_column, num_perm=NUM_PERM, bands=BANDS):
+        self.skills_column, self.title_column = skills_column, title_column
+        self.num_perm, self.bands = num_perm, bands
+        self.n_rows = 0
+        self.keys = np.zeros(0, dtype=np.uint64)          # set key per set id
+        self.signatures = np.zeros((0, num_perm), dtype=np.uint32)
+        self.band_keys = np.zeros((bands, 0), dtype=np.uint32)  # sorted per band
+        self.band_sets = np.zeros((bands, 0), dtype=np.uint32)  # set id of each sorted entry
+        self.row_sets = np.zeros(0, dtype=np.int8)        # set id per row
+        self.set_ptr = np.zeros(1, dtype=np.int64)        # rows of set s: set_rows[set_ptr[s]:set_ptr[s + 1]]
+        self.set_rows = np.zeros(0, dtype=np.uint32)
+        self.append(df)
+
+    def append(self, df):
+        """Index the rows of ``df`` appended after the indexed ones.
+
+        Arrays are replaced, never modified, so a shallow copy taken before
+        the call keeps seeing the old rows.
+        """
+        keys = _set_keys(df, self.skills_column, self.title_column)
+        # Sets seen before keep their id; new ones are numbered after them
+        order = np.argsort(self.keys, kind="stable")
+        pos = np.searchsorted(self.keys[order], keys)
+        known = pos < len(order)
+        known[known] = self.keys[order[pos[known]]] == keys[known]
+        unknown = np.flatnonzero(~known)
+        new_keys, first, inverse = np.unique(keys[unknown], return_index=True, return_inverse=True)
+        row_sets = np.empty(len(keys), dtype=np.int64)
+        row_sets[known] = order[pos[known]]
+        row_sets[unknown] = len(self.keys) + inverse
+
+        # Signatures and band buckets of the new sets only
+        new_rows = unknown[first]
+        signatures = minhash(
+            df[self.skills_column].to_numpy(dtype=object)[new_rows],
+            df[self.title_column].to_numpy(dtype=object)[new_rows],
+            self.num_perm,
+        )
+        new_band_keys = band_keys(signatures, self.bands)
+        n_sets = len(self.keys) + len(new_keys)
+        all_band_keys, all_band_sets = [], []
+        for b in range(self.bands):
+            by_key = np.argsort(new_band_keys[b], kind="stable")
+            at = np.searchsorted(self.band_keys[b], new_band_keys[b][by_key], side="right")
+            all_band_keys.append(np.insert(self.band_keys[b], at, new_band_keys[b][by_key]))
+            all_band_sets.append(np.insert(self.band_sets[b], at, (len(self.keys) + by_key).astype(np.uint32)))
+
+        # Appended rows go after the existing rows of their set
+        delta_counts = np.bincount(row_sets, minlength=n_sets)
+        by_set = np.argsort(row_sets, kind="stable")
+        at = np.r_[self.set_ptr[1:], np.full(len(new_keys), self.set_ptr[-1])][row_sets[by_set]]
+        self.set_rows = np.insert(self.set_rows, at, (self.n_rows + by_set).astype(np.uint32))
+        self.set_ptr = np.r_[self.set_ptr, np.full(len(new_keys), self.set_ptr[-1])] \
+            + np.r_[0, np.cumsum(delta_counts)]
+        self.band_keys, self.band_sets = np.stack(all_band_keys), np.stack(all_band_sets)
+        self.keys = np.concatenate([self.keys, new_keys])
+        self.signatures = np.concatenate([self.signatures, signatures])
+        self.row_sets = np.concatenate([self.row_sets, row_sets]).astype(code_dtype(n_sets))
+        self.n_rows += len(keys)
+
+    def similar(self, row, k=10):
+        """``(rows, similarity)``: up to ``k`` postings most similar to row position ``row``.
+
+        Similarity is the estimated Jaccard similarity of the token sets;
+        postings identical to ``row`` in skills and title come first.
+        """
+        query = int(self.row_sets[row])
+        signature = self.signatures[query]
+        if (signature == np.iinfo(np.uint32).max).all():
+            return np.zeros(0, dtype=np.int64), np.zeros(0)
+        keys = band_keys(signature[None, :], self.bands)[:, 0]
+        candidates = [np.array([query])]
+        for b in range(self.bands):
+            lo = np.searchsorted(self.band_keys[b], keys[b], side="left")
+            hi = np.searchsorted(self.band_keys[b], keys[b], side="right")
+            candidates.append(self.band_sets[b][lo:min(hi, lo + MAX_CANDIDATES)])
+        sets = np.unique(np.concatenate(candidates).astype(np.int64))
+        score = (self.signatures[sets] == signature).mean(axis=1)
+        # Ties go to the set seen first, so the order does not depend on how the index grew
+        order = np.lexsort((self.set_rows[self.set_ptr[sets]], -score))
+        rows, similarity, found = [], [], 0
+        for s, value in zip(sets[order], score[order]):
+            members = self.set_rows[self.set_ptr[s]:self.set_ptr[s + 1]]
+            members = members[members != row][:k - found]
+            rows.append(members)
+            similarity.append(np.full(len(members), value))
+            found += len(members)
+            if found >= k:
+                break
+        return np.concatenate(rows).astype(np.int64), np.concatenate(similarity)
+
+    def matches(self, df):
+        """Whether ``df`` starts with the rows this index was built from."""
+        if len(df) < self.n_rows:
+            return False
+        keys = _set_keys(df.iloc[:self.n_rows], self.skills_column, self.title_column)
+        return bool(np.array_equal(self.keys[self.row_sets], keys))
+
+    def save(self, path):
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        meta = {"columns": [self.skills_column, self.title_column], "num_perm": self.num_perm,
+                "bands": self.bands, "n_rows": self.n_rows}
+        tmp_path = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+        with open(tmp_path, "wb") as f:
+            np.savez(f, meta=np.array(json.dumps(meta)), keys=self.keys, signatures=self.signatures,
+                     band_keys=self.band_keys, band_sets=self.band_sets, row_sets=self.row_sets,
+                     set_ptr=self.set_ptr, set_rows=self.set_rows)
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, path):
+        with np.load(path) as data:
+            meta = json.loads(str(data["meta"]))
+            index = cls.__new__(cls)
+            index.skills_column, index.title_column = meta["columns"]
+            index.num_perm, index.bands, index.n_rows = meta["num_perm"], meta["bands"], meta["n_rows"]
+            for name in ("keys", "signatures", "band_keys", "band_sets", "row_sets", "set_ptr", "set_rows"):
+                setattr(index, name, data[name])
+        return index
+
+
+def load_similar_index(df, skills_column, title_column, path):
+    """Index of ``df`` from the file at ``path``, extended or rebuilt (and saved) when out of date."""
+    path = Path(path)
+    index = None
+    if path.exists():
+        try:
+            index = SimilarityIndex.load(path)
+        except (OSError, ValueError, KeyError):
+            index = None  # unreadable or older layout, rebuild below
+    if index is not None and (
+        [index.skills_column, index.title_column] != [skills_column, title_column]
+        or (index.num_perm, index.bands) != (NUM_PERM, BANDS) or not index.matches(df)
+    ):
+        index = None
+    if index is not None and index.n_rows == len(df):
+        return index
+    if index is None:
+        index = SimilarityIndex(df, skills_column, title_column)
+    else:
+        index.append(df.iloc[index.n_rows:])
+    try:
+        index.save(path)
+    except OSError:
+        pass  # read-only checkout: serve the index without saving it
+    return index
+
+
+if __name__ == "__main__":
+    from .columns import detect_columns, normalize_text_columns
+    from .dataset import DATA_PATH, read_dataset
+    from .partitions import LiveDataset, has_partitions
+
+    source = Path(sys.argv[1]) if len(sys.argv) > 1 else DATA_PATH
+    if has_partitions(source):
+        frame = LiveDataset(source, prepare=normalize_text_columns).refresh().frame
+    else:
+        frame = normalize_text_columns(read_dataset(source))
+    roles = detect_columns(frame)
+    built = load_similar_index(frame, roles["skills"], roles["job"], similar_path_for(source))
+    print(f"Wrote {similar_path_for(source)} ({built.n_rows:,} rows, {len(built.keys):,} distinct token sets)")
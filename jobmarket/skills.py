@@ -0,0 +1,111 @@
+"""Tokenized storage and inverted index for the ``required_skills`` column.
+
+Skill lists such as ``"python, computer vision, r, docker"`` are split once
+into a normalized vocabulary.  Two views are kept:
+
+* a CSR layout (``indptr``/``indices``) mapping each row to its skill ids,
+  used to count skills over any subset of rows with a single ``bincount``;
+* an inverted index mapping each skill to a packed bitmap of the rows that
+  require it, so "python AND kubernetes" is a bitwise AND.
+"""
+import numpy as np
+import pandas as pd
+
+from .index import append_bits, code_dtype
+
+
+def normalize_skill(skill):
+    return " ".join(str(skill).split()).lower()
+
+
+def _ptr_dtype(n_entries):
+    return np.int32 if n_entries < np.iinfo(np.int32).max else np.int64
+
+
+class SkillIndex:
+    """Skill vocabulary with CSR row->skills and skill->rows bitmaps."""
+
+    def __init__(self, skills):
+        skills = pd.Series(skills).reset_index(drop=True)
+        self.n_rows = len(skills)
+
+        # Parse every distinct skill list once; rows refer to it by code
+        row_codes, lists = pd.factorize(skills)
+        tokens = pd.Series(lists).astype("string").str.split(",").explode().str.strip().str.lower()
+        tokens = tokens.str.replace(r"\s+", " ", regex=True)
+        tokens = tokens[tokens.notna() & (tokens != "")]
+        codes, vocab = pd.factorize(tokens, sort=True)
+        # A list naming the same skill twice still requires it only once
+        pairs = np.unique(tokens.index.to_numpy(dtype=np.int64) * len(vocab) + codes)
+        list_ids, list_skills = np.divmod(pairs, len(vocab)) if len(vocab) else (pairs, pairs)
+        list_ptr = np.concatenate([[0], np.cumsum(np.bincount(list_ids, minlength=len(lists)))])
+
+        # Row r gets the skills of its list: list_skills[list_ptr[c]:list_ptr[c + 1]]
+        lengths = np.where(row_codes >= 0, np.diff(list_ptr)[np.maximum(row_codes, 0)], 0)
+        indptr = np.concatenate([[0], np.cumsum(lengths)]).astype(np.int64)
+        firsts = np.repeat(list_ptr[np.maximum(row_codes, 0)] - indptr[:-1], lengths)
+        self.vocabulary = [str(v) for v in vocab]
+        self.ids = {skill: i for i, skill in enumerate(self.vocabulary)}
+        self.indices = list_skills[firsts + np.arange(indptr[-1])].astype(code_dtype(len(vocab)))
+        self.indptr = indptr.astype(_ptr_dtype(indptr[-1]))
+
+        # Sorting the entries by skill groups the rows of each skill together
+        entry_rows = np.repeat(np.arange(self.n_rows), lengths)
+        order = np.argsort(self.indices, kind="stable")
+        bounds = np.searchsorted(self.indices[order], np.arange(len(vocab) + 1))
+        self.bitmaps = []
+        for i in range(len(self.vocabulary)):
+            bits = np.zeros(self.n_rows, dtype=bool)
+            bits[entry_rows[order[bounds[i]:bounds[i + 1]]]] = True
+            self.bitmaps.append(np.packbits(bits))
+
+    def append(self, skills):
+        """Index the skill lists of rows appended after the indexed ones."""
+        delta = SkillIndex(skills)
+        vocabulary = self.vocabulary + [v for v in delta.vocabulary if v not in self.ids]
+        ids = {skill: i for i, skill in enumerate(vocabulary)}
+        remap = np.array([ids[v] for v in delta.vocabulary], dtype=np.int32)
+
+        empty = np.zeros((self.n_rows + 7) // 8, dtype=np.uint8)
+        no_rows = np.zeros(delta.n_rows, dtype=bool)
+        bitmaps = []
+        for skill in vocabulary:
+            own = self.bitmaps[self.ids[skill]] if skill in self.ids else empty
+            new = delta.ids.get(skill)
+            bits = np.unpackbits(delta.bitmaps[new], count=delta.n_rows).astype(bool) if new is not None else no_rows
+            bitmaps.append(append_bits(own, self.n_rows, bits))
+
+        indptr = np.concatenate([self.indptr, delta.indptr[1:].astype(np.int64) + int(self.indptr[-1])])
+        self.indptr = indptr.astype(_ptr_dtype(indptr[-1]))
+        self.indices = np.concatenate([self.indices, remap[delta.indices]]).astype(code_dtype(len(vocabulary)))
+        self.vocabulary, self.ids, self.bitmaps = vocabulary, ids, bitmaps
+        self.n_rows += delta.n_rows
+
+    def row_skills(self, row):
+        """Skills required by row position ``row``."""
+        return [self.vocabulary[i] for i in self.indices[self.indptr[row]:self.indptr[row + 1]]]
+
+    def mask(self, skills):
+        """Packed bitmap of rows requiring *all* ``skills``, or ``None`` if none given."""
+        result = None
+        for skill in skills or []:
+            i = self.ids.get(normalize_skill(skill))
+            bits = self.bitmaps[i] if i is not None else np.zeros((self.n_rows + 7) // 8, dtype=np.uint8)
+            result = bits.copy() if result is None else np.bitwise_and(result, bits, out=result)
+        return result
+
+    def counts(self, rows=None):
+        """Number of rows requiring each skill, over all rows or the given row positions."""
+        if rows is None:
+            ids = self.indices
+        else:
+            selected = np.zeros(self.n_rows, dtype=bool)
+            selected[rows] = True
+            ids = self.indices[np.repeat(selected, np.diff(self.indptr))]
+        return pd.Series(np.bincount(ids, minlength=len(self.vocabulary)), index=self.vocabulary)
+
+    def top(self, rows=None, n=20):
+        """Most frequently required skills as a ``Skill``/``Count`` frame."""
+        counts = self.counts(rows)
+        counts = counts[counts > 0].sort_values(ascending=False, kind="stable").head(n)
+        return counts.rename_axis("Skill").reset_index(name="Count")
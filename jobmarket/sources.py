@@ -0,0 +1,225 @@
+"""Source adapters mapping every shipped dataset onto one canonical schema.
+
+The canonical schema is the one of the cleaned dataset (``job_title``,
+``salary_usd``, ``company_location``, ...) plus a few columns only some
+sources fill (``salary_min``/``salary_max``, ``city``, ``tools_preferred``)
+and a ``source`` tag.  An adapter renames a source's columns and converts its
+values with vectorized string operations, one chunk at a time, so a source of
+any size is parsed in bounded memory.  Sources inside a zip archive are
+streamed from the archive member without extracting it.
+
+A dataset is a list of :class:`Source` entries (see :data:`DATASETS`).  Its
+union is written once to a typed Arrow file under ``data/.cache`` that
+:func:`~jobmarket.dataset.read_dataset` memory-maps like any other cache::
+
+    python -m jobmarket.sources "All sources"
+"""
+import hashlib
+import os
+import re
+import sys
+import zipfile
+from collections import namedtuple
+from pathlib import Path
+
+import pandas as pd
+
+from .countries import COUNTRY_NAMES
+from .dataset import DATA_PATH, DATE_FORMAT, SCHEMA_VERSION, dataset_version
+
+CHUNK_SIZE = 100_000
+ADAPTER_VERSION = 2  # bump when an adapter's output changes, so unions are rewritten
+
+# Canonical column -> storage kind ("str", "float" or "date")
+CANONICAL_COLUMNS = {
+    "job_title": "str",
+    "salary_usd": "float",
+    "salary_min": "float",
+    "salary_max": "float",
+    "experience_level": "str",
+    "employment_type": "str",
+    "company_location": "str",
+    "city": "str",
+    "company_size": "str",
+    "remote_ratio": "str",
+    "required_skills": "str",
+    "tools_preferred": "str",
+    "education_required": "str",
+    "years_experience": "float",
+    "posting_date": "date",
+    "application_deadline": "date",
+    "company_name": "str",
+    "industry": "str",
+    "benefits_score": "float",
+    "source": "str",
+}
+
+
+def conform(chunk, source):
+    """Reorder/complete ``chunk`` to the canonical columns with their storage dtypes."""
+    chunk = chunk.reindex(columns=list(CANONICAL_COLUMNS))
+    for col, kind in CANONICAL_COLUMNS.items():
+        if kind == "float":
+            chunk[col] = pd.to_numeric(chunk[col], errors="coerce").astype("float64")
+        elif kind == "date":
+            chunk[col] = pd.to_datetime(chunk[col], errors="coerce").astype("datetime64[ns]")
+        else:
+            chunk[col] = chunk[col].astype("string").str.strip().replace("", pd.NA).astype(object)
+    chunk["source"] = source
+    return chunk
+
+
+def parse_salary_range(values):
+    """Split ``"92860-109598"`` style ranges into ``(min, max, midpoint)`` series."""
+    parts = values.astype("string").str.replace(",", "", regex=False).str.extract(
+        r"^\s*\$?\s*(\d+(?:\.\d+)?)\s*(?:[-–]\s*\$?\s*(\d+(?:\.\d+)?))?\s*$"
+    )
+    low = pd.to_numeric(parts[0], errors="coerce")
+    high = pd.to_numeric(parts[1], errors="coerce").fillna(low)
+    return low, high, (low + high) / 2
+
+
+def parse_location(values):
+    """Split ``"City, ST"`` into ``(city, region)``; a value without a comma is a region."""
+    parts = values.astype("string").str.extract(r"^\s*(?:(.*?)\s*,\s*)?([^,]*?)\s*$")
+    return parts[0], parts[1].str.upper()
+
+
+class CleanedAdapter:
+    """The cleaned postings export (``AI_DATASET_CLEANED.csv``); already canonical."""
+
+    name = "cleaned"
+    signature = {"job_title", "salary_usd", "company_location", "required_skills"}
+
+    def transform(self, chunk):
+        for col in ["posting_date", "application_deadline"]:
+            if col in chunk.columns:
+                chunk[col] = pd.to_datetime(chunk[col], format=DATE_FORMAT, errors="coerce")
+        return chunk
+
+
+class AiJobMarketAdapter:
+    """``ai_job_market.csv``: salary ranges, "City, CC" locations (ISO country codes), short level codes."""
+
+    name = "ai_job_market"
+    signature = {"job_title", "salary_range_usd", "location", "skills_required"}
+
+    EXPERIENCE = {"Entry": "Entry-Level", "Mid": "Mid-Level", "Senior": "Senior-Level"}
+    COMPANY_SIZE = {"Startup": "Small", "Mid": "Medium", "Large": "Large"}
+
+    def transform(self, chunk):
+        out = pd.DataFrame(index=chunk.index)
+        out["job_title"] = chunk["job_title"].astype("string").str.strip().str.title()
+        out["salary_min"], out["salary_max"], out["salary_usd"] = parse_salary_range(chunk["salary_range_usd"])
+        out["experience_level"] = chunk["experience_level"].astype("string").str.strip().replace(self.EXPERIENCE)
+        employment = chunk["employment_type"].astype("string").str.strip().str.title()
+        out["employment_type"] = employment
+        # "Remote" is an employment type in this source; it is the only remote signal
+        out["remote_ratio"] = employment.map({"Remote": "Fully remote"}).astype("string")
+        out["city"], country = parse_location(chunk["location"])
+        # Full upper-case names, as in the cleaned dataset; unknown codes are kept as they are
+        out["company_location"] = country.map(COUNTRY_NAMES).fillna(country)
+        out["company_size"] = chunk["company_size"].astype("string").str.strip().replace(self.COMPANY_SIZE)
+        out["required_skills"] = chunk["skills_required"].astype("string").str.lower()
+        out["tools_preferred"] = chunk["tools_preferred"].astype("string").str.lower()
+        out["posting_date"] = pd.to_datetime(chunk["posted_date"], format="%Y-%m-%d", errors="coerce")
+        out["company_name"] = chunk["company_name"]
+        out["industry"] = chunk["industry"]
+        return out
+
+
+ADAPTERS = {adapter.name: adapter for adapter in [CleanedAdapter(), AiJobMarketAdapter()]}
+
+Source = namedtuple("Source", "adapter path member", defaults=(None,))
+
+ARCHIVE_PATH = Path("archive.zip")
+
+# Datasets offered by the dashboard.  ``None`` is the cleaned CSV as-is.
+DATASETS = {
+    "AI postings (cleaned)": None,
+    "AI job market": [Source("ai_job_market", ARCHIVE_PATH, "ai_job_market.csv")],
+    "All sources": [
+        Source("cleaned", DATA_PATH),
+        Source("ai_job_market", ARCHIVE_PATH, "ai_job_market.csv"),
+    ],
+}
+
+
+def detect_adapter(columns):
+    """Name of the adapter whose signature columns are all present, or ``None``."""
+    for name, adapter in ADAPTERS.items():
+        if adapter.signature <= set(columns):
+            return name
+    return None
+
+
+def read_source(source, chunksize=CHUNK_SIZE):
+    """Yield canonical chunks of ``source``, streaming zip members in place."""
+    adapter = ADAPTERS[source.adapter]
+    if zipfile.is_zipfile(source.path):
+        with zipfile.ZipFile(source.path) as archive:
+            member = source.member or next(n for n in archive.namelist() if n.endswith(".csv"))
+            with archive.open(member) as f:
+                for chunk in pd.read_csv(f, chunksize=chunksize, low_memory=False):
+                    yield conform(adapter.transform(chunk), source.adapter)
+        return
+    for chunk in pd.read_csv(source.path, chunksize=chunksize, low_memory=False):
+        yield conform(adapter.transform(chunk), source.adapter)
+
+
+def _arrow_schema():
+    import pyarrow as pa
+
+    types = {"str": pa.string(), "float": pa.float64(), "date": pa.timestamp("ns")}
+    return pa.schema([(col, types[kind]) for col, kind in CANONICAL_COLUMNS.items()])
+
+
+def _slug(name):
+    return "".join(c if c.isalnum() else "-" for c in name.lower()).strip("-")
+
+
+def union_path(name, cache_dir=None):
+    """Arrow file holding the union of dataset ``name`` for the current state of its inputs."""
+    sources = DATASETS[name]
+    token = hashlib.sha1(repr([SCHEMA_VERSION, ADAPTER_VERSION] + [
+        (s.adapter, str(s.path), s.member, dataset_version(s.path)) for s in sources
+    ]).encode()).hexdigest()[:12]
+    cache_dir = Path(cache_dir) if cache_dir else DATA_PATH.parent / ".cache"
+    return cache_dir / f"{_slug(name)}-{token}.arrow"
+
+
+def materialize(name, cache_dir=None, chunksize=CHUNK_SIZE):
+    """Write the union of dataset ``name`` chunk by chunk (if stale); returns its path."""
+    import pyarrow as pa
+
+    out = union_path(name, cache_dir)
+    if out.exists():
+        return out
+    out.parent.mkdir(parents=True, exist_ok=True)
+    tmp = out.with_suffix(f".{os.getpid()}.tmp")
+    schema = _arrow_schema()
+    try:
+        with pa.ipc.new_file(str(tmp), schema) as writer:
+            for source in DATASETS[name]:
+                for chunk in read_source(source, chunksize):
+                    writer.write_batch(pa.RecordBatch.from_pandas(chunk, schema=schema, preserve_index=False))
+    except BaseException:
+        tmp.unlink(missing_ok=True)
+        raise
+    # Older unions and everything saved for them (KPI cube, salary model, similarity index)
+    token_file = re.compile(rf"{re.escape(_slug(name))}-[0-9a-f]{{12}}[.-]")
+    for stale in out.parent.iterdir():
+        if token_file.match(stale.name) and not stale.name.startswith(out.stem):
+            stale.unlink(missing_ok=True)
+    os.replace(tmp, out)
+    return out
+
+
+def dataset_path(name):
+    """Path to hand to the dataset store for dataset ``name``."""
+    return DATA_PATH if DATASETS[name] is None else materialize(name)
+
+
+if __name__ == "__main__":
+    for dataset in sys.argv[1:] or [n for n, s in DATASETS.items() if s is not None]:
+        print(f"{dataset}: {materialize(dataset)}")
@@ -0,0 +1,144 @@
+"""Process-wide dataset store shared by every page and session.
+
+The normalized frame is loaded once per dataset version through
+``st.cache_resource`` and so are the indexes and cubes derived from it.
+Pages import the getters below instead of reading the CSV themselves, which
+keeps a single copy of the data in memory per process.  Everything handed out
+here is shared: treat it as read-only.
+
+When ``data/partitions`` has been initialized (see :mod:`jobmarket.partitions`)
+the frame comes from the month partitions instead of the CSV.  The version
+token is polled on every ``get_dataset`` call, and new partitions are folded
+into the frame and the derived objects without a restart.
+
+When ``JOBMARKET_SHARED_DIR`` is set and a loader has published a snapshot of
+the dataset there (see :mod:`jobmarket.shared`), the frame and indexes are
+mapped from that snapshot instead, so every worker of the host shares one copy.
+"""
+import threading
+from pathlib import Path
+
+import streamlit as st
+
+from .cache import ResultCache
+from .columns import normalize_text_columns
+from .cube import load_kpi_cube
+from .dataset import DATA_PATH, dataset_version, read_dataset
+from .engine import UPDATERS, Engine, persisted_builders
+from .metrics import span
+from .partitions import LiveDataset, has_partitions
+from .shared import SharedDataset, shared_dir, shared_path_for
+
+# Snapshot pinned by the last get_dataset() call of the current script run
+_pinned = threading.local()
+
+
+@st.cache_resource(max_entries=2)
+def _frame(path, version):
+    with span("build.frame"):
+        return normalize_text_columns(read_dataset(path))
+
+
+@st.cache_resource(max_entries=32)
+def _derived(path, version, name, args):
+    frame = _frame(path, version)
+    with span(f"build.{name}"):
+        return persisted_builders(path)[name](frame, *args)
+
+
+@st.cache_resource(max_entries=2)
+def _kpi_cube(path, version):
+    return load_kpi_cube(path, _frame(path, version), version)
+
+
+@st.cache_resource
+def _live(root):
+    return LiveDataset(root, persisted_builders(root), UPDATERS, prepare=normalize_text_columns)
+
+
+@st.cache_resource
+def _shared(file, path):
+    return SharedDataset(file, persisted_builders(path))
+
+
+def _source(path):
+    """Published snapshot or partition root serving ``path``; ``None`` to read the file itself."""
+    directory = shared_dir()
+    if directory is not None and shared_path_for(directory, path).exists():
+        return _shared(shared_path_for(directory, path), path)
+    root = path.parent / "partitions"
+    return _live(root) if has_partitions(root) else None
+
+
+def _snapshot(path):
+    """Snapshot pinned for this run, so the frame and its indexes always match."""
+    pinned = getattr(_pinned, "snapshot", None)
+    if pinned is not None and _pinned.path == path:
+        return pinned
+    return _source(path).refresh()
+
+
+def get_dataset(path=DATA_PATH):
+    """The shared, normalized frame for the current version of ``path``."""
+    path = Path(path)
+    source = _source(path)
+    if source is not None:
+        _pinned.path, _pinned.snapshot = path, source.refresh()
+        return _pinned.snapshot.frame
+    return _frame(path, dataset_version(path))
+
+
+def get_version(path=DATA_PATH):
+    """Version token of the data behind ``get_dataset(path)``."""
+    path = Path(path)
+    if _source(path) is not None:
+        return _snapshot(path).version
+    return dataset_version(path)
+
+
+def get_derived(name, *args, path=DATA_PATH):
+    """Shared index/cube ``name`` (see ``engine.BUILDERS``) for the current dataset version.
+
+    Objects in ``engine.PERSISTED`` are read from (and saved next to) the dataset.
+    """
+    path = Path(path)
+    source = _source(path)
+    if source is not None:
+        return source.derived(_snapshot(path), name, args)
+    return _derived(path, dataset_version(path), name, args)
+
+
+def get_kpi_cube(path=DATA_PATH):
+    """KPI cube saved by ``python -m jobmarket.cube``, (re)built and saved on first use if missing or stale."""
+    path = Path(path)
+    source = _source(path)
+    if source is not None:
+        return source.derived(_snapshot(path), "kpi_cube")
+    return _kpi_cube(path, dataset_version(path))
+
+
+@st.cache_resource
+def get_result_cache(maxsize=1024, ttl=600.0):
+    """Process-wide :class:`~jobmarket.cache.ResultCache` shared by every session."""
+    return ResultCache(maxsize, ttl)
+
+
+@st.cache_resource(max_entries=4)
+def _engine(path, version, _cache):
+    source = _source(path)
+    if source is not None:
+        snapshot = _snapshot(path)
+        return Engine(snapshot.frame, version, lambda name, *args: source.derived(snapshot, name, args),
+                      kpi_cube=source.derived(snapshot, "kpi_cube"), cache=_cache)
+    return Engine(_frame(path, version), version, lambda name, *args: _derived(path, version, name, args),
+                  kpi_cube=_kpi_cube(path, version), cache=_cache)
+
+
+def get_engine(path=DATA_PATH, cache=None):
+    """Shared :class:`~jobmarket.engine.Engine` over the current version of ``path``.
+
+    Call :func:`get_dataset` first in partitioned or shared mode so the engine matches
+    the snapshot pinned for this run.
+    """
+    path = Path(path)
+    return _engine(path, get_version(path), cache if cache is not None else get_result_cache())
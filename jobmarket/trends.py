@@ -0,0 +1,212 @@
+"""Pre-bucketed posting-date aggregates for the Trends page.
+
+:class:`TrendCube` extends the filter cube with a time axis.  Rows are
+aggregated once into ``(cell, posting day, salary bin)`` entries; only the
+combinations that occur are stored, so the table is bounded by the number of
+rows and in practice much smaller.  A trend under the active filters is a
+boolean mask over the cube cells, one gather and one ``bincount``: no date
+parsing or resampling per rerun.  Weeks and months are both derived from the
+same day entries.
+
+Posting-to-deadline durations are kept the same way, as ``(cell, days)``
+entries.
+"""
+from functools import lru_cache
+
+import numpy as np
+import pandas as pd
+
+from .facets import CountCube, regrow_cells
+from .index import code_dtype
+from .salary import SALARY_BIN_WIDTH, histogram_quantiles
+
+FREQUENCIES = {"Week": "W", "Month": "M"}
+_EPOCH = np.datetime64("1970-01-01", "D")
+
+
+def is_remote(label):
+    """Whether a remote-ratio label means fully remote work."""
+    text = str(label).strip().lower()
+    return text == "100" or ("remote" in text and "hybrid" not in text)
+
+
+def _days(values):
+    """Whole days since the epoch (``-1`` for missing dates)."""
+    days = pd.to_datetime(values, errors="coerce").to_numpy(dtype="datetime64[D]")
+    out = (days - _EPOCH).astype(np.int64)
+    out[np.isnat(days)] = -1
+    return out
+
+
+def _bucket_starts(days, freq):
+    """Start day (since the epoch) of the week (Monday) or month containing ``days``."""
+    if freq == "W":
+        # 1970-01-01 was a Thursday
+        return (days + 3) // 7 * 7 - 3
+    months = (_EPOCH + days).astype("datetime64[M]")
+    return (months.astype("datetime64[D]") - _EPOCH).astype(np.int64)
+
+
+class TrendCube(CountCube):
+    """Count cube with sparse per-cell posting-day and duration aggregates."""
+
+    def __init__(self, df, columns, date_column, salary_column=None, deadline_column=None,
+                 remote_column=None, bin_width=SALARY_BIN_WIDTH):
+        self.date_column = date_column
+        self.salary_column = salary_column
+        self.deadline_column = deadline_column
+        self.remote_column = remote_column
+        self.bin_width = bin_width
+        super().__init__(df, columns)
+
+    def _build(self, df, cells):
+        super()._build(df, cells)
+        days = _days(df[self.date_column])
+        dated = days >= 0
+        if self.salary_column:
+            salary = pd.to_numeric(df[self.salary_column], errors="coerce").to_numpy(dtype=np.float64)
+        else:
+            salary = np.full(len(df), np.nan)
+        has_salary = ~np.isnan(salary) & (salary >= 0)
+        bins = np.where(has_salary, np.nan_to_num(salary) // self.bin_width, -1).astype(np.int64)
+
+        # One entry per distinct (cell, day, salary bin); bin -1 = no salary
+        entries = pd.DataFrame({"cell": cells[dated], "day": days[dated], "bin": bins[dated]})
+        entries = entries.value_counts(sort=False).reset_index(name="count")
+        self.entry_cell = entries["cell"].to_numpy(dtype=np.int64)
+        self.entry_day = entries["day"].to_numpy(dtype=np.int64)
+        self.entry_bin = entries["bin"].to_numpy(dtype=np.int64)
+        self.entry_count = entries["count"].to_numpy(dtype=np.int64)
+
+        if self.deadline_column:
+            duration = _days(df[self.deadline_column]) - days
+            valid = dated & (duration >= 0) & (_days(df[self.deadline_column]) >= 0)
+            durations = pd.DataFrame({"cell": cells[valid], "days": duration[valid]})
+            durations = durations.value_counts(sort=False).reset_index(name="count")
+        else:
+            durations = pd.DataFrame({"cell": [], "days": [], "count": []})
+        self.duration_cell = durations["cell"].to_numpy(dtype=np.int64)
+        self.duration_days = durations["days"].to_numpy(dtype=np.int64)
+        self.duration_count = durations["count"].to_numpy(dtype=np.int64)
+        self._compact()
+        self._bucket_cache = {}
+        self._trend = lru_cache(maxsize=256)(self._compute_trend)
+
+    def __getstate__(self):
+        state = super().__getstate__()
+        state.pop("_trend", None)
+        state["_bucket_cache"] = {}
+        return state
+
+    def __setstate__(self, state):
+        super().__setstate__(state)
+        self._trend = lru_cache(maxsize=256)(self._compute_trend)
+
+    def _merge(self, delta):
+        old_shape = self.shape
+        super()._merge(delta)
+        self.entry_cell = np.concatenate([regrow_cells(self.entry_cell, old_shape, delta.shape), delta.entry_cell])
+        self.entry_day = np.concatenate([self.entry_day, delta.entry_day])
+        self.entry_bin = np.concatenate([self.entry_bin, delta.entry_bin])
+        self.entry_count = np.concatenate([self.entry_count, delta.entry_count])
+        self.duration_cell = np.concatenate(
+            [regrow_cells(self.duration_cell, old_shape, delta.shape), delta.duration_cell]
+        )
+        self.duration_days = np.concatenate([self.duration_days, delta.duration_days])
+        self.duration_count = np.concatenate([self.duration_count, delta.duration_count])
+        self._compact()
+        self._bucket_cache = {}
+
+    def _compact(self):
+        # The entry tables grow with the rows; store them in the narrowest dtypes
+        cell_dtype = code_dtype(int(np.prod(self.shape)))
+        self.entry_cell = self.entry_cell.astype(cell_dtype, copy=False)
+        self.entry_day = self.entry_day.astype(np.int32, copy=False)
+        self.entry_bin = self.entry_bin.astype(code_dtype(int(self.entry_bin.max(initial=0)) + 1), copy=False)
+        self.entry_count = self.entry_count.astype(np.int32, copy=False)
+        self.duration_cell = self.duration_cell.astype(cell_dtype, copy=False)
+        self.duration_days = self.duration_days.astype(np.int32, copy=False)
+        self.duration_count = self.duration_count.astype(np.int32, copy=False)
+
+    def append(self, df):
+        super().append(df)
+        self._trend = lru_cache(maxsize=256)(self._compute_trend)
+
+    def _remote_cells(self):
+        """Flat boolean mask of the cells whose remote label is fully remote."""
+        if self.remote_column not in self.columns:
+            return None
+        axis = self.columns.index(self.remote_column)
+        return self._cell_mask(tuple(
+            tuple(i for i, label in enumerate(self.labels[axis]) if is_remote(label)) if a == axis else None
+            for a in range(len(self.columns))
+        ))
+
+    def _buckets(self, freq):
+        """Sorted bucket start days and the bucket of every day entry."""
+        if freq not in self._bucket_cache:
+            self._bucket_cache[freq] = np.unique(_bucket_starts(self.entry_day, freq), return_inverse=True)
+        return self._bucket_cache[freq]
+
+    def _compute_trend(self, key, freq):
+        starts, bucket = self._buckets(freq)
+        n_buckets = len(starts)
+        selected = self._cell_mask(key)[self.entry_cell]
+        postings = np.bincount(bucket[selected], weights=self.entry_count[selected], minlength=n_buckets)
+
+        salaried = selected & (self.entry_bin >= 0)
+        n_bins = int(self.entry_bin.max()) + 1 if len(self.entry_bin) else 1
+        hist = np.bincount(
+            bucket[salaried] * n_bins + self.entry_bin[salaried],
+            weights=self.entry_count[salaried], minlength=n_buckets * n_bins,
+        ).reshape(n_buckets, n_bins)
+        _, median = histogram_quantiles(hist, self.bin_width, (0.5,))
+
+        frame = pd.DataFrame({
+            "Postings": postings.astype(np.int64),
+            "Median Salary": median[:, 0],
+        }, index=pd.DatetimeIndex(_EPOCH + starts, name="Period"))
+
+        remote = self._remote_cells()
+        if remote is not None:
+            # Remote share ignores the remote filter itself, like a facet count
+            axis = self.columns.index(self.remote_column)
+            base = self._cell_mask(key[:axis] + (None,) + key[axis + 1:])[self.entry_cell]
+            remote_entries = base & remote[self.entry_cell]
+            total = np.bincount(bucket[base], weights=self.entry_count[base], minlength=n_buckets)
+            remote_total = np.bincount(bucket[remote_entries], weights=self.entry_count[remote_entries],
+                                       minlength=n_buckets)
+            frame["Remote Share"] = np.divide(remote_total, total, out=np.full(n_buckets, np.nan), where=total > 0)
+
+        # Drop the empty periods before the first and after the last matching posting
+        active = np.flatnonzero(postings)
+        return frame.iloc[active[0]:active[-1] + 1] if len(active) else frame.iloc[:0]
+
+    def trend(self, selections, freq="M"):
+        """Postings, median salary and remote share per week (``"W"``) or month (``"M"``)."""
+        return self._trend(self._key(selections), freq).copy()
+
+    def durations(self, selections):
+        """Number of postings per posting-to-deadline duration in days."""
+        selected = self._cell_mask(self._key(selections))[self.duration_cell]
+        counts = np.bincount(self.duration_days[selected], weights=self.duration_count[selected])
+        days = np.flatnonzero(counts)
+        return pd.Series(counts[days].astype(np.int64), index=pd.Index(days, name="Days"), name="Postings")
+
+
+def rolling(trend, window):
+    """Trailing ``window``-bucket averages of a :meth:`TrendCube.trend` frame.
+
+    Postings are averaged per bucket; median salary and remote share are
+    weighted by each bucket's postings.
+    """
+    if window <= 1:
+        return trend
+    weights = trend["Postings"].astype(np.float64)
+    out = pd.DataFrame(index=trend.index)
+    out["Postings"] = weights.rolling(window, min_periods=1).mean()
+    for col in trend.columns.drop("Postings"):
+        weighted = (trend[col] * weights).fillna(0).rolling(window, min_periods=1).sum()
+        counted = weights.where(trend[col].notna(), 0).rolling(window, min_periods=1).sum()
+        out[col] = (weighted / counted).where(counted > 0)
+    return out
@@ -0,0 +1,40 @@
+"""Bounded views of the dataset for the Data Explorer.
+
+``st.dataframe`` serializes whatever it is given to Arrow and ships it to the
+browser in one message.  These helpers cut the frame down to a row window (or
+a random sample) and a column projection first, so the payload per
+interaction is bounded by the window size, not by the dataset size.
+"""
+import numpy as np
+
+WINDOW_SIZES = [100, 500, 1000, 5000]
+
+
+def _column_positions(df, columns):
+    if columns is None:
+        return list(range(df.shape[1]))
+    return [df.columns.get_loc(c) for c in columns]
+
+
+def window(df, start=0, size=WINDOW_SIZES[0], columns=None):
+    """Rows ``[start, start + size)`` of ``df`` restricted to ``columns``."""
+    start = int(min(max(start, 0), max(len(df) - 1, 0)))
+    return df.iloc[start:start + size, _column_positions(df, columns)]
+
+
+def sample(df, size=WINDOW_SIZES[0], seed=0, columns=None):
+    """``size`` random rows of ``df`` (kept in dataset order) restricted to ``columns``."""
+    rng = np.random.default_rng(seed)
+    rows = np.sort(rng.choice(len(df), size=min(size, len(df)), replace=False))
+    return df.iloc[rows, _column_positions(df, columns)]
+
+
+def arrow_payload_bytes(frame):
+    """Size of ``frame`` as the Arrow IPC stream that ``st.dataframe`` sends."""
+    import pyarrow as pa
+
+    table = pa.Table.from_pandas(frame)
+    sink = pa.BufferOutputStream()
+    with pa.ipc.new_stream(sink, table.schema) as writer:
+        writer.write_table(table)
+    return sink.getvalue().size
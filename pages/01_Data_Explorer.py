@@ -1,6 +1,8 @@
 import streamlit as st
-import pandas as pd
-from pathlib import Path
+
+from jobmarket.sources import DATASETS, dataset_path
+from jobmarket.store import get_dataset
+from jobmarket.viewer import WINDOW_SIZES, sample, window
 
 st.subheader("🔍 Dataset Health Check")
 
@@ -30,17 +32,40 @@ This dataset provides a comprehensive view of the global artificial intelligence
 )
 
 # ------------------ Load Dataset ------------------
-data_path = Path("data") / "AI_DATASET_CLEANED.csv"
-
+# Shared with the dashboard: no re-parse and no extra copy per page or session
+dataset_name = st.sidebar.selectbox("🗂️ Dataset", list(DATASETS), key="dataset")
 try:
-    df = pd.read_csv(data_path)
-except FileNotFoundError:
-    st.error(f"Could not find data file at `{data_path}`.")
+    df = get_dataset(dataset_path(dataset_name))
+except FileNotFoundError as exc:
+    # The file that is missing: the cleaned CSV, or one source of a union
+    st.error(f"Could not find data file at `{exc.filename}`." if exc.filename
+             else f"Could not load the `{dataset_name}` dataset: {exc}")
     st.stop()
 
 # ------------------ Display Raw Data ------------------
+# Only a window (or sample) of the selected columns is sent to the browser
 st.subheader("Raw Dataset")
-st.dataframe(df, use_container_width=True)
+
+view_col1, view_col2, view_col3 = st.columns([2, 1, 1])
+with view_col1:
+    columns = st.multiselect("Columns", df.columns.tolist(), default=df.columns.tolist())
+with view_col2:
+    mode = st.radio("View", ["Browse rows", "Random sample"], horizontal=True)
+with view_col3:
+    size = st.selectbox("Rows per view", WINDOW_SIZES)
+
+if not columns:
+    st.warning("⚠️ Please select at least one column to display")
+elif mode == "Browse rows":
+    n_windows = max(1, -(-len(df) // size))
+    page = st.number_input(f"Window (of {n_windows})", min_value=1, step=1)
+    start = (min(int(page), n_windows) - 1) * size
+    st.caption(f"Rows {start + 1:,}–{min(start + size, len(df)):,} of {len(df):,}")
+    st.dataframe(window(df, start, size, columns), use_container_width=True)
+else:
+    seed = st.number_input("Sample seed", min_value=0, step=1)
+    st.caption(f"{min(size, len(df)):,} random rows of {len(df):,}")
+    st.dataframe(sample(df, size, int(seed), columns), use_container_width=True)
 
 
 #Footer